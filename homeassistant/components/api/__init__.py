@@ -113,7 +113,10 @@ class APIEventStream(HomeAssistantView):
             if event.event_type == EVENT_HOMEASSISTANT_STOP:
                 data = stop_obj
             else:
-                data = json.dumps(event, cls=JSONEncoder)
+                try:
+                    data = event.as_dict_json
+                except (ValueError, TypeError):
+                    data = json.dumps(event, cls=JSONEncoder)
 
             await to_write.put(data)
 
@@ -1,12 +1,14 @@
 """Provide pre-made queries on top of the recorder component."""
 from __future__ import annotations
 
+import asyncio
 from collections.abc import Iterable
+from contextlib import suppress
 from datetime import datetime as dt, timedelta
 from http import HTTPStatus
 import logging
 import time
-from typing import cast
+from typing import Any, cast
 
 from aiohttp import web
 from sqlalchemy import not_, or_
@@ -15,33 +17,48 @@ import voluptuous as vol
 from homeassistant.components import websocket_api
 from homeassistant.components.http import HomeAssistantView
 from homeassistant.components.recorder import history, models as history_models
+from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.statistics import (
     list_statistic_ids,
     statistics_during_period,
 )
 from homeassistant.components.recorder.util import session_scope
+from homeassistant.components.websocket_api import messages
 from homeassistant.const import CONF_DOMAINS, CONF_ENTITIES, CONF_EXCLUDE, CONF_INCLUDE
-from homeassistant.core import HomeAssistant
+from homeassistant.core import Event, HomeAssistant, State, callback
+from homeassistant.helpers import significant_change
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.deprecation import deprecated_class, deprecated_function
 from homeassistant.helpers.entityfilter import (
     CONF_ENTITY_GLOBS,
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
+    convert_include_exclude_filter,
 )
+from homeassistant.helpers.event import async_track_state_change_event
+from homeassistant.helpers.json import JSON_DUMP
 import homeassistant.util.dt as dt_util
 
+from .cache import HistoryCache, HistoryQuery
+
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "history"
 CONF_ORDER = "use_include_order"
+DATA_ENTITIES_FILTER = "history_entities_filter"
+DATA_HISTORY_CACHE = "history_cache"
+
+# Seconds to wait for the recorder to commit before reading the history
+RECORDER_COMMIT_TIMEOUT = 10
 
 GLOB_TO_SQL_CHARS = {
     42: "%",  # *
     46: "_",  # .
 }
 
+MAX_POINTS_SCHEMA = vol.All(vol.Coerce(int), vol.Range(min=1))
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA.extend(
@@ -93,10 +110,15 @@ async def async_setup(hass, config):
     conf = config.get(DOMAIN, {})
 
     filters = sqlalchemy_filter_from_include_exclude_conf(conf)
+    if filters is not None:
+        hass.data[DATA_ENTITIES_FILTER] = convert_include_exclude_filter(conf)
 
     use_include_order = conf.get(CONF_ORDER)
 
-    hass.http.register_view(HistoryPeriodView(filters, use_include_order))
+    history_cache = hass.data[DATA_HISTORY_CACHE] = HistoryCache(filters)
+    hass.http.register_view(
+        HistoryPeriodView(filters, use_include_order, history_cache)
+    )
     hass.components.frontend.async_register_built_in_panel(
         "history", "history", "hass:chart-box"
     )
@@ -104,6 +126,7 @@ async def async_setup(hass, config):
         ws_get_statistics_during_period
     )
     hass.components.websocket_api.async_register_command(ws_get_list_statistic_ids)
+    hass.components.websocket_api.async_register_command(ws_stream)
 
     return True
 
@@ -175,6 +198,187 @@ async def ws_get_list_statistic_ids(
     connection.send_result(msg["id"], statistic_ids)
 
 
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "history/stream",
+        vol.Required("start_time"): str,
+        vol.Required("entity_ids"): cv.entity_ids,
+        vol.Optional("minimal_response", default=False): bool,
+        vol.Optional("significant_changes_only", default=True): bool,
+        vol.Optional("compressed_state_format", default=False): bool,
+        vol.Optional("max_points"): MAX_POINTS_SCHEMA,
+    }
+)
+@websocket_api.async_response
+async def ws_stream(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Handle history stream websocket command.
+
+    The states since start_time are read from the database once, the state
+    changes of the entities are sent as they happen afterwards.
+    """
+    if start_time := dt_util.parse_datetime(msg["start_time"]):
+        start_time = dt_util.as_utc(start_time)
+    else:
+        connection.send_error(msg["id"], "invalid_start_time", "Invalid start_time")
+        return
+
+    entity_ids = msg["entity_ids"]
+    if (entities_filter := hass.data.get(DATA_ENTITIES_FILTER)) is not None:
+        entity_ids = [
+            entity_id for entity_id in entity_ids if entities_filter(entity_id)
+        ]
+    minimal_response = msg["minimal_response"]
+    significant_changes_only = msg["significant_changes_only"]
+    compressed_state_format = msg["compressed_state_format"]
+
+    checker = await significant_change.create_checker(hass, DOMAIN)
+    last_sent_states: dict[str, Any] = {}
+    last_sent_attributes: dict[str, Any] = {}
+    # The live state changes are held back until the history is sent
+    pending_events: list[Event] | None = []
+
+    @callback
+    def _async_send_state_change(event: Event) -> None:
+        """Send the new state of a live state change."""
+        if (new_state := event.data["new_state"]) is None:
+            return
+        if (
+            state := _live_history_state(
+                new_state,
+                last_sent_states,
+                checker,
+                minimal_response,
+                significant_changes_only,
+            )
+        ) is None:
+            return
+        entity_id = new_state.entity_id
+        if not compressed_state_format:
+            entity_states: Any = [state]
+        elif isinstance(state, State):
+            # Like in the history, attributes are only sent when they change
+            entity_states = history.compress_states([state])
+            if state.attributes == last_sent_attributes.get(entity_id):
+                entity_states[history.COMPRESSED_STATE_ATTRIBUTES] = []
+            last_sent_attributes[entity_id] = state.attributes
+        else:
+            entity_states = {
+                history.COMPRESSED_STATE_STATE: [new_state.state],
+                history.COMPRESSED_STATE_LAST_UPDATED: [
+                    new_state.last_changed.timestamp()
+                ],
+                history.COMPRESSED_STATE_ATTRIBUTES: [],
+            }
+        connection.send_message(
+            JSON_DUMP(
+                messages.event_message(
+                    msg["id"], {"states": {entity_id: entity_states}}
+                )
+            )
+        )
+
+    @callback
+    def _async_forward_state_change(event: Event) -> None:
+        """Forward a live state change."""
+        if pending_events is None:
+            _async_send_state_change(event)
+        else:
+            pending_events.append(event)
+
+    end_time = dt_util.utcnow()
+    connection.subscriptions[msg["id"]] = async_track_state_change_event(
+        hass, entity_ids, _async_forward_state_change
+    )
+    connection.send_result(msg["id"])
+
+    # Make sure the state changes before subscribing are in the database
+    with suppress(asyncio.TimeoutError):
+        await asyncio.wait_for(
+            hass.data[DATA_INSTANCE].async_commit(), RECORDER_COMMIT_TIMEOUT
+        )
+
+    def send_history() -> None:
+        """Fetch the history and send it."""
+        with session_scope(hass=hass) as session:
+            result = history.get_significant_states_with_session(
+                hass,
+                session,
+                start_time,
+                end_time,
+                entity_ids,
+                None,
+                True,
+                significant_changes_only,
+                minimal_response,
+                compressed_state_format,
+                msg.get("max_points"),
+            )
+        for entity_id, states in result.items():
+            if not compressed_state_format:
+                last_sent_states[entity_id] = states[-1]
+                continue
+            last_sent_states[entity_id] = State(
+                entity_id, states[history.COMPRESSED_STATE_STATE][-1]
+            )
+            if attributes := states[history.COMPRESSED_STATE_ATTRIBUTES]:
+                last_sent_attributes[entity_id] = attributes[-1][1]
+        payload = JSON_DUMP(messages.event_message(msg["id"], {"states": result}))
+        hass.loop.call_soon_threadsafe(connection.send_message, payload)
+
+    if entity_ids:
+        await hass.async_add_executor_job(send_history)
+
+    for event in pending_events:
+        _async_send_state_change(event)
+    pending_events = None
+
+
+def _live_history_state(
+    new_state: State,
+    last_sent_states: dict[str, Any],
+    checker: significant_change.SignificantlyChangedChecker,
+    minimal_response: bool,
+    significant_changes_only: bool,
+) -> State | dict[str, Any] | None:
+    """Return how to send a live state change in the history, or None to skip it.
+
+    Attribute changes are only significant for the SIGNIFICANT_DOMAINS, like in
+    the database queries, and only if the significant change platform of the
+    domain considers them significant.
+    """
+    if significant_changes_only:
+        if new_state.domain in history.SIGNIFICANT_DOMAINS:
+            significant = checker.async_is_significant_change(new_state)
+        else:
+            significant = False
+        if not significant and new_state.last_changed != new_state.last_updated:
+            return None
+
+    entity_id = new_state.entity_id
+    last_sent_state = last_sent_states.get(entity_id)
+    last_sent_states[entity_id] = new_state
+    if (
+        not minimal_response
+        or new_state.domain in history.NEED_ATTRIBUTE_DOMAINS
+        or last_sent_state is None
+    ):
+        return new_state
+
+    # With minimal response attribute changes are
+    # skipped and only the state and last_changed sent
+    if last_sent_state.state == new_state.state:
+        last_sent_states[entity_id] = last_sent_state
+        return None
+    return {
+        history.STATE_KEY: new_state.state,
+        history.LAST_CHANGED_KEY: history_models.process_timestamp_to_utc_isoformat(
+            new_state.last_changed
+        ),
+    }
+
+
 class HistoryPeriodView(HomeAssistantView):
     """Handle history period requests."""
 
@@ -182,10 +386,11 @@ class HistoryPeriodView(HomeAssistantView):
     name = "api:history:view-period"
     extra_urls = ["/api/history/period/{datetime}"]
 
-    def __init__(self, filters, use_include_order):
+    def __init__(self, filters, use_include_order, history_cache):
         """Initialize the history period view."""
         self.filters = filters
         self.use_include_order = use_include_order
+        self.history_cache = history_cache
 
     async def get(
         self, request: web.Request, datetime: str | None = None
@@ -198,13 +403,16 @@ class HistoryPeriodView(HomeAssistantView):
         now = dt_util.utcnow()
 
         one_day = timedelta(days=1)
+        compressed_state_format = "compressed_state_format" in request.query
+        # The compressed states are keyed by entity_id
+        empty_result: dict | list = {} if compressed_state_format else []
         if datetime_:
             start_time = dt_util.as_utc(datetime_)
         else:
             start_time = now - one_day
 
         if start_time > now:
-            return self.json([])
+            return self.json(empty_result)
 
         if end_time_str := request.query.get("end_time"):
             if end_time := dt_util.parse_datetime(end_time_str):
@@ -224,6 +432,13 @@ class HistoryPeriodView(HomeAssistantView):
 
         minimal_response = "minimal_response" in request.query
 
+        max_points = None
+        if (max_points_str := request.query.get("max_points")) is not None:
+            try:
+                max_points = MAX_POINTS_SCHEMA(max_points_str)
+            except vol.Invalid:
+                return self.json_message("Invalid max_points", HTTPStatus.BAD_REQUEST)
+
         hass = request.app["hass"]
 
         if (
@@ -231,47 +446,51 @@ class HistoryPeriodView(HomeAssistantView):
             and entity_ids
             and not _entities_may_have_state_changes_after(hass, entity_ids, start_time)
         ):
-            return self.json([])
-
+            return self.json(empty_result)
+
+        query = HistoryQuery.from_request(
+            entity_ids,
+            start_time,
+            end_time,
+            include_start_time_state,
+            significant_changes_only,
+            minimal_response,
+            compressed_state_format,
+            max_points,
+        )
         return cast(
             web.Response,
             await hass.async_add_executor_job(
-                self._sorted_significant_states_json,
-                hass,
-                start_time,
-                end_time,
-                entity_ids,
-                include_start_time_state,
-                significant_changes_only,
-                minimal_response,
+                self._sorted_significant_states_json, hass, query
             ),
         )
 
-    def _sorted_significant_states_json(
-        self,
-        hass,
-        start_time,
-        end_time,
-        entity_ids,
-        include_start_time_state,
-        significant_changes_only,
-        minimal_response,
-    ):
+    def _sorted_significant_states_json(self, hass, query):
         """Fetch significant stats from the database as json."""
         timer_start = time.perf_counter()
 
-        with session_scope(hass=hass) as session:
-            result = history.get_significant_states_with_session(
-                hass,
-                session,
-                start_time,
-                end_time,
-                entity_ids,
-                self.filters,
-                include_start_time_state,
-                significant_changes_only,
-                minimal_response,
-            )
+        result = self.history_cache.get_significant_states(hass, query)
+
+        if query.compressed_state_format:
+            if _LOGGER.isEnabledFor(logging.DEBUG):
+                elapsed = time.perf_counter() - timer_start
+                _LOGGER.debug(
+                    "Extracted %d states in %fs",
+                    sum(
+                        len(states[history.COMPRESSED_STATE_STATE])
+                        for states in result.values()
+                    ),
+                    elapsed,
+                )
+            if self.filters and self.use_include_order:
+                sorted_states = {
+                    order_entity: result.pop(order_entity)
+                    for order_entity in self.filters.included_entities
+                    if order_entity in result
+                }
+                sorted_states.update(result)
+                result = sorted_states
+            return self.json(result)
 
         result = list(result.values())
         if _LOGGER.isEnabledFor(logging.DEBUG):
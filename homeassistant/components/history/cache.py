@@ -0,0 +1,301 @@
+"""Cache the results of history queries."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+import threading
+from typing import Any, NamedTuple
+
+from homeassistant.components.recorder import history
+from homeassistant.components.recorder.const import DATA_INSTANCE
+from homeassistant.components.recorder.models import (
+    process_timestamp_to_utc_isoformat,
+)
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.core import HomeAssistant, State, split_entity_id
+
+# The number of history queries kept in the cache
+HISTORY_CACHE_SIZE = 16
+
+# The number of states kept in the cache across the queries
+HISTORY_CACHE_MAX_ROWS = 20000
+
+# States are fetched after a point in time, fetch them
+# from right before it to include the states at that time
+ONE_MICROSECOND = timedelta(microseconds=1)
+
+
+class HistoryQuery(NamedTuple):
+    """The normalized parameters of a history query."""
+
+    entity_ids: tuple[str, ...] | None
+    start_time: datetime
+    end_time: datetime
+    include_start_time_state: bool
+    significant_changes_only: bool
+    minimal_response: bool
+    compressed_state_format: bool
+    max_points: int | None
+
+    @classmethod
+    def from_request(cls, entity_ids: Iterable[str] | None, *args: Any) -> HistoryQuery:
+        """Create a query, leaving out duplicate entity_ids."""
+        return cls(
+            tuple(dict.fromkeys(entity_ids)) if entity_ids is not None else None,
+            *args,
+        )
+
+    @property
+    def tail_can_be_fetched(self) -> bool:
+        """Return if the states after a point in time can be fetched separately.
+
+        Downsampled states depend on the whole period and the
+        compressed states can not be extended.
+        """
+        return self.max_points is None and not self.compressed_state_format
+
+
+class HistoryCacheEntry(NamedTuple):
+    """The cached states of a query up to a point in time."""
+
+    states: dict[str, Any]
+    until: datetime
+    # The purge_generation of the recorder when the states were fetched
+    purge_generation: int
+    rows: int
+
+
+class HistoryCache:
+    """Keep the results of recent history queries.
+
+    The states recorded before the last commit of the recorder do not
+    change until they are purged, so the cached states up to it are
+    reused and only the states recorded after it are fetched again.
+    The cached states are dropped once the recorder purged rows.
+    """
+
+    def __init__(
+        self,
+        filters: Any,
+        max_size: int = HISTORY_CACHE_SIZE,
+        max_rows: int = HISTORY_CACHE_MAX_ROWS,
+    ) -> None:
+        """Initialize the history cache."""
+        self.filters = filters
+        self.max_size = max_size
+        self.max_rows = max_rows
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[HistoryQuery, HistoryCacheEntry] = OrderedDict()
+        self._rows = 0
+        # The queries run in the executor
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the number of cached queries."""
+        return len(self._entries)
+
+    def get_significant_states(
+        self, hass: HomeAssistant, query: HistoryQuery
+    ) -> dict[str, Any]:
+        """Return the significant states of a query, using the cache when possible."""
+        instance = hass.data[DATA_INSTANCE]
+        committed_until = instance.committed_until
+        purge_generation = instance.purge_generation
+        with session_scope(hass=hass) as session:
+
+            def fetch(
+                start_time: datetime,
+                end_time: datetime,
+                include_start_time_state: bool,
+            ) -> dict[str, Any]:
+                return history.get_significant_states_with_session(
+                    hass,
+                    session,
+                    start_time,
+                    end_time,
+                    list(query.entity_ids) if query.entity_ids is not None else None,
+                    self.filters,
+                    include_start_time_state,
+                    query.significant_changes_only,
+                    query.minimal_response,
+                    query.compressed_state_format,
+                    query.max_points,
+                )
+
+            states = self._get_states(query, committed_until, purge_generation, fetch)
+
+        if query.entity_ids is None:
+            # The cached states are shared
+            return dict(states)
+        # States of entities first seen in the tail were added last
+        return {
+            entity_id: states[entity_id]
+            for entity_id in query.entity_ids
+            if entity_id in states
+        }
+
+    def _get_states(
+        self,
+        query: HistoryQuery,
+        committed_until: datetime | None,
+        purge_generation: int,
+        fetch: Callable[[datetime, datetime, bool], dict[str, Any]],
+    ) -> dict[str, Any]:
+        """Return the states of a query from the cache and the database."""
+        with self._lock:
+            if (entry := self._entries.get(query)) is not None:
+                if entry.purge_generation != purge_generation:
+                    # The cached states may have been purged
+                    self._rows -= self._entries.pop(query).rows
+                    entry = None
+                else:
+                    self._entries.move_to_end(query)
+            if entry is not None and (
+                entry.until == query.end_time or query.tail_can_be_fetched
+            ):
+                self.hits += 1
+            else:
+                entry = None
+                self.misses += 1
+
+        until = query.end_time
+        if committed_until is not None:
+            until = min(until, committed_until)
+
+        if entry is not None:
+            if until > entry.until:
+                entry = self._set_entry(
+                    query,
+                    _merge_states(
+                        entry.states,
+                        _fetch_after(fetch, entry.until, until),
+                        query.minimal_response,
+                    ),
+                    until,
+                    purge_generation,
+                )
+        else:
+            if (
+                committed_until is None
+                or until <= query.start_time
+                or (until < query.end_time and not query.tail_can_be_fetched)
+            ):
+                # The states can not be cached yet
+                return fetch(
+                    query.start_time, query.end_time, query.include_start_time_state
+                )
+            entry = self._set_entry(
+                query,
+                fetch(query.start_time, until, query.include_start_time_state),
+                until,
+                purge_generation,
+            )
+
+        if entry.until == query.end_time:
+            return entry.states
+        return _merge_states(
+            entry.states,
+            _fetch_after(fetch, entry.until, query.end_time),
+            query.minimal_response,
+        )
+
+    def _set_entry(
+        self,
+        query: HistoryQuery,
+        states: dict[str, Any],
+        until: datetime,
+        purge_generation: int,
+    ) -> HistoryCacheEntry:
+        """Store the cached states of a query, evicting the least recently used.
+
+        The states of a query with more than max_rows states are not stored.
+        """
+        entry = HistoryCacheEntry(
+            states,
+            until,
+            purge_generation,
+            _count_rows(query, states),
+        )
+        with self._lock:
+            if (replaced := self._entries.pop(query, None)) is not None:
+                self._rows -= replaced.rows
+            if entry.rows > self.max_rows:
+                return entry
+            self._entries[query] = entry
+            self._rows += entry.rows
+            while len(self._entries) > self.max_size or self._rows > self.max_rows:
+                self._rows -= self._entries.popitem(last=False)[1].rows
+        return entry
+
+
+def _count_rows(query: HistoryQuery, states: dict[str, Any]) -> int:
+    """Return the number of states in the result of a query."""
+    if query.compressed_state_format:
+        # The compressed states of an entity are kept in parallel lists
+        return sum(
+            len(ent_states[history.COMPRESSED_STATE_STATE])
+            for ent_states in states.values()
+        )
+    return sum(len(ent_states) for ent_states in states.values())
+
+
+def _fetch_after(
+    fetch: Callable[[datetime, datetime, bool], dict[str, Any]],
+    start_time: datetime,
+    end_time: datetime,
+) -> dict[str, Any]:
+    """Fetch the states recorded from start_time on."""
+    return fetch(start_time - ONE_MICROSECOND, end_time, False)
+
+
+def _merge_states(
+    states: dict[str, Any], tail: dict[str, Any], minimal_response: bool
+) -> dict[str, Any]:
+    """Return the states followed by the states recorded after them.
+
+    The cached states are shared, so they are copied before being extended.
+    """
+    merged = {entity_id: list(ent_states) for entity_id, ent_states in states.items()}
+    for entity_id, tail_states in tail.items():
+        if not (ent_states := merged.get(entity_id)):
+            merged[entity_id] = list(tail_states)
+        elif (
+            not minimal_response
+            or split_entity_id(entity_id)[0] in history.NEED_ATTRIBUTE_DOMAINS
+        ):
+            ent_states.extend(tail_states)
+        else:
+            _merge_minimal_states(ent_states, tail_states)
+    return merged
+
+
+def _merge_minimal_states(ent_states: list, tail_states: list) -> None:
+    """Extend the minimal states of an entity as if they were fetched at once.
+
+    Only the first and the last state are full states and
+    unchanged states are left out.
+    """
+    last_state = ent_states[-1]
+    if tail_states[0].state == last_state.state:
+        tail_states = tail_states[1:]
+    if not tail_states:
+        return
+    if len(ent_states) > 1:
+        ent_states[-1] = _minimal_state(last_state)
+    ent_states.extend(
+        _minimal_state(state) if isinstance(state, State) else state
+        for state in tail_states[:-1]
+    )
+    ent_states.append(tail_states[-1])
+
+
+def _minimal_state(state: State) -> dict[str, str]:
+    """Return the minimal response of a full state."""
+    return {
+        history.STATE_KEY: state.state,
+        history.LAST_CHANGED_KEY: process_timestamp_to_utc_isoformat(
+            state.last_changed
+        ),
+    }
@@ -0,0 +1,23 @@
+"""Provide info to system health."""
+from homeassistant.components import system_health
+from homeassistant.core import HomeAssistant, callback
+
+from . import DATA_HISTORY_CACHE
+
+
+@callback
+def async_register(
+    hass: HomeAssistant, register: system_health.SystemHealthRegistration
+) -> None:
+    """Register system health callbacks."""
+    register.async_register_info(system_health_info, "/history")
+
+
+async def system_health_info(hass):
+    """Get info for the info page."""
+    history_cache = hass.data[DATA_HISTORY_CACHE]
+    return {
+        "cache_hits": history_cache.hits,
+        "cache_misses": history_cache.misses,
+        "cached_queries": len(history_cache),
+    }
@@ -1,26 +1,37 @@
 """Event parser and human readable log generator."""
+from __future__ import annotations
+
+import asyncio
 from contextlib import suppress
-from datetime import timedelta
+from datetime import datetime as dt, timedelta
 from http import HTTPStatus
-from itertools import groupby
+from itertools import groupby, islice
 import json
 import re
+import threading
+from typing import NamedTuple
 
+from aiohttp import web
 import sqlalchemy
 from sqlalchemy.orm import aliased
 from sqlalchemy.sql.expression import literal
 import voluptuous as vol
 
+from homeassistant.components import websocket_api
 from homeassistant.components.automation import EVENT_AUTOMATION_TRIGGERED
 from homeassistant.components.history import sqlalchemy_filter_from_include_exclude_conf
 from homeassistant.components.http import HomeAssistantView
+from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.models import (
     Events,
+    StateAttributes,
     States,
     process_timestamp_to_utc_isoformat,
+    state_attributes_json,
 )
 from homeassistant.components.recorder.util import session_scope
 from homeassistant.components.script import EVENT_SCRIPT_STARTED
+from homeassistant.components.websocket_api import messages
 from homeassistant.const import (
     ATTR_DOMAIN,
     ATTR_ENTITY_ID,
@@ -28,6 +39,8 @@ from homeassistant.const import (
     ATTR_ICON,
     ATTR_NAME,
     ATTR_SERVICE,
+    ATTR_UNIT_OF_MEASUREMENT,
+    CONTENT_TYPE_JSON,
     EVENT_CALL_SERVICE,
     EVENT_HOMEASSISTANT_START,
     EVENT_HOMEASSISTANT_STOP,
@@ -42,9 +55,11 @@ from homeassistant.helpers.entityfilter import (
     convert_include_exclude_filter,
     generate_filter,
 )
+from homeassistant.helpers.event import async_track_state_change_event
 from homeassistant.helpers.integration_platform import (
     async_process_integration_platforms,
 )
+from homeassistant.helpers.json import JSON_DUMP, json_bytes
 from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
@@ -57,9 +72,23 @@ ATTR_MESSAGE = "message"
 CONTINUOUS_DOMAINS = ["proximity", "sensor"]
 
 DOMAIN = "logbook"
+DATA_FILTERS = "logbook_filters"
 
 GROUP_BY_MINUTES = 15
 
+# Number of entries encoded and sent at once when streaming
+STREAM_BATCH_SIZE = 1000
+
+# Number of encoded chunks queued ahead of the HTTP response
+STREAM_CHUNKS_AHEAD = 4
+
+# Contexts are looked up by the events they cause shortly after,
+# only the most recent ones are kept to bound the memory of long periods
+CONTEXT_LOOKUP_MAX_SIZE = 10000
+
+# Seconds to wait for the recorder to commit before reading the history
+RECORDER_COMMIT_TIMEOUT = 10
+
 EMPTY_JSON_OBJECT = "{}"
 UNIT_OF_MEASUREMENT_JSON = '"unit_of_measurement":'
 
@@ -80,11 +109,6 @@ ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED = [
     *HOMEASSISTANT_EVENTS,
 ]
 
-ALL_EVENT_TYPES = [
-    EVENT_STATE_CHANGED,
-    *ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED,
-]
-
 EVENT_COLUMNS = [
     Events.event_type,
     Events.event_data,
@@ -157,7 +181,10 @@ async def async_setup(hass, config):
         filters = None
         entities_filter = None
 
+    hass.data[DATA_FILTERS] = (filters, entities_filter)
     hass.http.register_view(LogbookView(conf, filters, entities_filter))
+    websocket_api.async_register_command(hass, ws_get_events)
+    websocket_api.async_register_command(hass, ws_event_stream)
 
     hass.services.async_register(DOMAIN, "log", log_message, schema=LOG_MESSAGE_SCHEMA)
 
@@ -230,10 +257,15 @@ class LogbookView(HomeAssistantView):
                 "Can't combine entity with context_id", HTTPStatus.BAD_REQUEST
             )
 
-        def json_events():
-            """Fetch events and generate JSON."""
-            return self.json(
-                _get_events(
+        # The chunks, then None once all of them were queued or the error
+        chunks = asyncio.Queue()
+        chunks_ahead = threading.Semaphore(STREAM_CHUNKS_AHEAD)
+        stopped = threading.Event()
+
+        def stream_json_events():
+            """Fetch events and queue them as JSON while the cursor advances."""
+            try:
+                entries = _stream_events(
                     hass,
                     start_day,
                     end_day,
@@ -243,9 +275,315 @@ class LogbookView(HomeAssistantView):
                     entity_matches_only,
                     context_id,
                 )
+                for chunk in _json_array_chunks(entries):
+                    chunks_ahead.acquire()
+                    if stopped.is_set():
+                        return
+                    hass.loop.call_soon_threadsafe(chunks.put_nowait, chunk)
+            except Exception as err:  # pylint: disable=broad-except
+                hass.loop.call_soon_threadsafe(chunks.put_nowait, err)
+            else:
+                hass.loop.call_soon_threadsafe(chunks.put_nowait, None)
+
+        hass.async_add_executor_job(stream_json_events)
+        try:
+            # Only answer once the query returned its first entries, so a
+            # failing query is answered with an error status
+            if isinstance(chunk := await chunks.get(), Exception):
+                raise chunk
+            response = web.StreamResponse()
+            response.content_type = CONTENT_TYPE_JSON
+            response.enable_compression()
+            await response.prepare(request)
+            while chunk is not None:
+                if isinstance(chunk, Exception):
+                    # The response ends without its last chunk, which
+                    # tells the client it is incomplete
+                    raise chunk
+                await response.write(chunk)
+                chunks_ahead.release()
+                chunk = await chunks.get()
+        finally:
+            stopped.set()
+            chunks_ahead.release()
+        await response.write_eof()
+        return response
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "logbook/get_events",
+        vol.Required("start_time"): str,
+        vol.Optional("end_time"): str,
+        vol.Exclusive("entity_ids", "entity_or_context"): cv.entity_ids,
+        vol.Exclusive("context_id", "entity_or_context"): str,
+        vol.Optional("entity_matches_only", default=False): bool,
+    }
+)
+@websocket_api.async_response
+async def ws_get_events(hass, connection, msg):
+    """Handle logbook get events websocket command.
+
+    The entries are sent in event messages of up to STREAM_BATCH_SIZE entries
+    while the cursor advances, the result is sent once all of them were sent.
+    """
+    if start_time := dt_util.parse_datetime(msg["start_time"]):
+        start_time = dt_util.as_utc(start_time)
+    else:
+        connection.send_error(msg["id"], "invalid_start_time", "Invalid start_time")
+        return
+
+    if (end_time_str := msg.get("end_time")) is None:
+        end_time = start_time + timedelta(days=1)
+    elif end_time := dt_util.parse_datetime(end_time_str):
+        end_time = dt_util.as_utc(end_time)
+    else:
+        connection.send_error(msg["id"], "invalid_end_time", "Invalid end_time")
+        return
+
+    filters, entities_filter = hass.data[DATA_FILTERS]
+
+    def send_events():
+        """Fetch events and send them while the cursor advances."""
+        entries = _stream_events(
+            hass,
+            start_time,
+            end_time,
+            msg.get("entity_ids"),
+            filters,
+            entities_filter,
+            msg["entity_matches_only"],
+            msg.get("context_id"),
+        )
+        for batch in _batched(entries):
+            # Encode in the executor, the event loop only queues the message
+            payload = JSON_DUMP(messages.event_message(msg["id"], {"events": batch}))
+            hass.loop.call_soon_threadsafe(connection.send_message, payload)
+
+    await hass.async_add_executor_job(send_events)
+    connection.send_result(msg["id"])
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "logbook/event_stream",
+        vol.Required("start_time"): str,
+        vol.Exclusive("entity_ids", "entity_or_context"): cv.entity_ids,
+        vol.Exclusive("context_id", "entity_or_context"): str,
+        vol.Optional("entity_matches_only", default=False): bool,
+    }
+)
+@websocket_api.async_response
+async def ws_event_stream(hass, connection, msg):
+    """Handle logbook event stream websocket command.
+
+    The entries since start_time are read from the database and the events
+    the recorder has not committed yet, the entries of the events fired
+    afterwards are sent as they happen.
+    """
+    if start_time := dt_util.parse_datetime(msg["start_time"]):
+        start_time = dt_util.as_utc(start_time)
+    else:
+        connection.send_error(msg["id"], "invalid_start_time", "Invalid start_time")
+        return
+
+    filters, entities_filter = hass.data[DATA_FILTERS]
+    entity_ids = msg.get("entity_ids")
+    context_id = msg.get("context_id")
+    entity_matches_only = msg["entity_matches_only"]
+    if entity_ids is not None:
+        entities_filter = generate_filter([], entity_ids, [], [])
+
+    entity_attr_cache = EntityAttributeCache(hass)
+    context_lookup = {}
+    # The live events are held back until the historical entries are sent
+    pending_events = []
+
+    @callback
+    def _async_send_events(events):
+        """Send the entries of events fired on the bus."""
+        lazy_events = []
+        for event in events:
+            if (lazy_event := _lazy_event_from_live_event(event)) is None:
+                continue
+            _register_context(context_lookup, lazy_event)
+            if _keep_live_event(
+                hass, lazy_event, entity_ids, entities_filter, entity_matches_only
+            ):
+                lazy_events.append(lazy_event)
+        if entries := list(
+            humanify(hass, lazy_events, entity_attr_cache, context_lookup)
+        ):
+            connection.send_message(
+                JSON_DUMP(messages.event_message(msg["id"], {"events": entries}))
+            )
+
+    @callback
+    def _async_forward_event(event):
+        """Forward a live event matching the requested context."""
+        if context_id is not None and event.context.id != context_id:
+            return
+        if pending_events is None:
+            _async_send_events((event,))
+        else:
+            pending_events.append(event)
+
+    event_types = (
+        *ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED,
+        *hass.data.get(DOMAIN, {}),
+    )
+    if entity_ids is not None:
+        # Only the events of the requested entities are routed here
+        unsubs = [
+            async_track_state_change_event(hass, entity_ids, _async_forward_event),
+            *(
+                hass.bus.async_listen_keyed(
+                    event_type, entity_ids, _async_forward_event
+                )
+                for event_type in event_types
+            ),
+        ]
+    else:
+        unsubs = [
+            hass.bus.async_listen(event_type, _async_forward_event)
+            for event_type in (EVENT_STATE_CHANGED, *event_types)
+        ]
+    subscribed_at = dt_util.utcnow()
+
+    @callback
+    def _async_unsub():
+        """Stop forwarding live events."""
+        for unsub in unsubs:
+            unsub()
+
+    connection.subscriptions[msg["id"]] = _async_unsub
+    connection.send_result(msg["id"])
+
+    instance = hass.data[DATA_INSTANCE]
+    # The recorder has not seen the events fired right before subscribing
+    # while its listener waits on the loop, it runs before this task resumes
+    await asyncio.sleep(0)
+    if (uncommitted := instance.async_uncommitted_events()) is not None:
+        # The database has the events fired before end_time, the recorder
+        # still holds the ones fired since
+        end_time, uncommitted_events = uncommitted
+        # The events fired since subscribing are held back already
+        uncommitted_ids = {id(event) for event in uncommitted_events}
+        pending_events[:] = [
+            event for event in pending_events if id(event) not in uncommitted_ids
+        ]
+    else:
+        # The recorder holds too many events to keep them in memory, make
+        # sure the ones fired before subscribing are in the database
+        end_time = subscribed_at
+        uncommitted_events = []
+        with suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(instance.async_commit(), RECORDER_COMMIT_TIMEOUT)
+
+    def send_historical_events():
+        """Fetch events and send them while the cursor advances."""
+        entries = _stream_events(
+            hass,
+            start_time,
+            end_time,
+            entity_ids,
+            filters,
+            entities_filter,
+            entity_matches_only,
+            context_id,
+            entity_attr_cache,
+            context_lookup,
+        )
+        for batch in _batched(entries):
+            payload = JSON_DUMP(messages.event_message(msg["id"], {"events": batch}))
+            hass.loop.call_soon_threadsafe(connection.send_message, payload)
+
+    await hass.async_add_executor_job(send_historical_events)
+
+    _async_send_events(
+        event
+        for event in uncommitted_events
+        if event.time_fired > start_time
+        and (context_id is None or event.context.id == context_id)
+    )
+    _async_send_events(pending_events)
+    pending_events = None
+
+
+def _lazy_event_from_live_event(event):
+    """Return a lazy event for an event fired on the bus, or None if not logged."""
+    if event.event_type != EVENT_STATE_CHANGED:
+        try:
+            event_data = JSON_DUMP(event.data)
+        except (TypeError, ValueError):
+            return None
+        return LazyEventPartialState(
+            LiveEventRow(
+                event_type=event.event_type,
+                event_data=event_data,
+                time_fired=event.time_fired,
+                context_id=event.context.id,
+                context_user_id=event.context.user_id,
+                context_parent_id=event.context.parent_id,
             )
+        )
+
+    # Mirror the filters of the states query
+    old_state = event.data.get("old_state")
+    new_state = event.data.get("new_state")
+    if old_state is None or new_state is None or old_state.state == new_state.state:
+        return None
+    if (
+        new_state.domain in CONTINUOUS_DOMAINS
+        and ATTR_UNIT_OF_MEASUREMENT in new_state.attributes
+    ):
+        return None
+    return LazyEventPartialState(
+        LiveEventRow(
+            event_type=EVENT_STATE_CHANGED,
+            event_data=None,
+            time_fired=new_state.last_updated,
+            context_id=event.context.id,
+            context_user_id=event.context.user_id,
+            context_parent_id=event.context.parent_id,
+            state=new_state.state,
+            entity_id=new_state.entity_id,
+            domain=new_state.domain,
+            shared_attrs=state_attributes_json(new_state),
+        )
+    )
 
-        return await hass.async_add_executor_job(json_events)
+
+def _keep_live_event(hass, event, entity_ids, entities_filter, entity_matches_only):
+    """Return if the entry of a live event belongs in the stream."""
+    if event.event_type == EVENT_STATE_CHANGED:
+        return entities_filter is None or entities_filter(event.entity_id)
+    if event.event_type == EVENT_CALL_SERVICE:
+        return False
+    if entity_ids is not None and entity_matches_only:
+        event_data = event._row.event_data  # pylint: disable=protected-access
+        if not any(
+            ENTITY_ID_JSON_TEMPLATE.format(entity_id) in event_data
+            for entity_id in entity_ids
+        ):
+            return False
+    return _keep_event(hass, event, entities_filter)
+
+
+def _batched(entries):
+    """Split the entries into lists of up to STREAM_BATCH_SIZE entries."""
+    entries = iter(entries)
+    while batch := list(islice(entries, STREAM_BATCH_SIZE)):
+        yield batch
+
+
+def _json_array_chunks(entries):
+    """Encode the entries as a JSON array in chunks of STREAM_BATCH_SIZE entries."""
+    separator = b"["
+    for batch in _batched(entries):
+        yield separator + b",".join(json_bytes(entry) for entry in batch)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
 
 
 def humanify(hass, events, entity_attr_cache, context_lookup):
@@ -412,18 +750,51 @@ def _get_events(
     context_id=None,
 ):
     """Get events for a period of time."""
+    return list(
+        _stream_events(
+            hass,
+            start_day,
+            end_day,
+            entity_ids,
+            filters,
+            entities_filter,
+            entity_matches_only,
+            context_id,
+        )
+    )
+
+
+def _stream_events(
+    hass,
+    start_day,
+    end_day,
+    entity_ids=None,
+    filters=None,
+    entities_filter=None,
+    entity_matches_only=False,
+    context_id=None,
+    entity_attr_cache=None,
+    context_lookup=None,
+):
+    """Yield the logbook entries for a period of time as the cursor advances.
+
+    The database session stays open until the generator is exhausted or closed,
+    so it has to be consumed from a single thread.
+    """
     assert not (
         entity_ids and context_id
     ), "can't pass in both entity_ids and context_id"
 
-    entity_attr_cache = EntityAttributeCache(hass)
-    context_lookup = {None: None}
+    if entity_attr_cache is None:
+        entity_attr_cache = EntityAttributeCache(hass)
+    if context_lookup is None:
+        context_lookup = {}
 
     def yield_events(query):
         """Yield Events that are not filtered away."""
-        for row in query.yield_per(1000):
+        for row in query.yield_per(STREAM_BATCH_SIZE):
             event = LazyEventPartialState(row)
-            context_lookup.setdefault(event.context_id, event)
+            _register_context(context_lookup, event)
             if event.event_type == EVENT_CALL_SERVICE:
                 continue
             if event.event_type == EVENT_STATE_CHANGED or _keep_event(
@@ -437,94 +808,90 @@ def _get_events(
     with session_scope(hass=hass) as session:
         old_state = aliased(States, name="old_state")
 
+        query = _generate_events_query(session)
+        query = _apply_event_time_filter(query, start_day, end_day)
+        query = _apply_event_types_filter(
+            hass, query, ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED
+        )
+        states_query = _generate_states_query(session, start_day, end_day, old_state)
+
         if entity_ids is not None:
-            query = _generate_events_query_without_states(session)
-            query = _apply_event_time_filter(query, start_day, end_day)
-            query = _apply_event_types_filter(
-                hass, query, ALL_EVENT_TYPES_EXCEPT_STATE_CHANGED
-            )
             if entity_matches_only:
                 # When entity_matches_only is provided, contexts and events that do not
                 # contain the entity_ids are not included in the logbook response.
                 query = _apply_event_entity_id_matchers(query, entity_ids)
-
-            query = query.union_all(
-                _generate_states_query(
-                    session, start_day, end_day, old_state, entity_ids
-                )
-            )
-        else:
-            query = _generate_events_query(session)
-            query = _apply_event_time_filter(query, start_day, end_day)
-            query = _apply_events_types_and_states_filter(
-                hass, query, old_state
-            ).filter(
-                (States.last_updated == States.last_changed)
-                | (Events.event_type != EVENT_STATE_CHANGED)
+            states_query = states_query.filter(States.entity_id.in_(entity_ids))
+        elif filters:
+            states_query = states_query.filter(filters.entity_filter())
+
+        if context_id is not None:
+            query = query.filter(Events.context_id == context_id)
+            states_query = states_query.filter(
+                (States.context_id == context_id) | (Events.context_id == context_id)
             )
-            if filters:
-                query = query.filter(
-                    filters.entity_filter() | (Events.event_type != EVENT_STATE_CHANGED)
-                )
 
-            if context_id is not None:
-                query = query.filter(Events.context_id == context_id)
+        query = query.union_all(states_query).order_by(Events.time_fired)
 
-        query = query.order_by(Events.time_fired)
-
-        return list(
-            humanify(hass, yield_events(query), entity_attr_cache, context_lookup)
+        yield from humanify(
+            hass, yield_events(query), entity_attr_cache, context_lookup
         )
 
 
-def _generate_events_query(session):
-    return session.query(
-        *EVENT_COLUMNS,
-        States.state,
-        States.entity_id,
-        States.domain,
-        States.attributes,
-    )
+def _register_context(context_lookup, event):
+    """Remember the first event of a context to describe the events it caused."""
+    if event.context_id is None or event.context_id in context_lookup:
+        return
+    context_lookup[event.context_id] = event
+    if len(context_lookup) > CONTEXT_LOOKUP_MAX_SIZE:
+        del context_lookup[next(iter(context_lookup))]
 
 
-def _generate_events_query_without_states(session):
+def _generate_events_query(session):
     return session.query(
         *EVENT_COLUMNS,
         literal(value=None, type_=sqlalchemy.String).label("state"),
         literal(value=None, type_=sqlalchemy.String).label("entity_id"),
         literal(value=None, type_=sqlalchemy.String).label("domain"),
         literal(value=None, type_=sqlalchemy.Text).label("attributes"),
+        literal(value=None, type_=sqlalchemy.Text).label("shared_attrs"),
     )
 
 
-def _generate_states_query(session, start_day, end_day, old_state, entity_ids):
+def _generate_states_query(session, start_day, end_day, old_state):
+    # Older states keep their context on the state_changed
+    # event they are linked to, newer states carry it themselves
     return (
-        _generate_events_query(session)
+        session.query(
+            literal(value=EVENT_STATE_CHANGED, type_=sqlalchemy.String).label(
+                "event_type"
+            ),
+            literal(value=None, type_=sqlalchemy.Text).label("event_data"),
+            States.last_updated.label("time_fired"),
+            sqlalchemy.func.coalesce(States.context_id, Events.context_id).label(
+                "context_id"
+            ),
+            sqlalchemy.func.coalesce(
+                States.context_user_id, Events.context_user_id
+            ).label("context_user_id"),
+            sqlalchemy.func.coalesce(
+                States.context_parent_id, Events.context_parent_id
+            ).label("context_parent_id"),
+            States.state,
+            States.entity_id,
+            States.domain,
+            States.attributes,
+            StateAttributes.shared_attrs,
+        )
         .outerjoin(Events, (States.event_id == Events.event_id))
         .outerjoin(old_state, (States.old_state_id == old_state.state_id))
+        .outerjoin(
+            StateAttributes, (States.attributes_id == StateAttributes.attributes_id)
+        )
         .filter(_missing_state_matcher(old_state))
         .filter(_continuous_entity_matcher())
         .filter((States.last_updated > start_day) & (States.last_updated < end_day))
-        .filter(
-            (States.last_updated == States.last_changed)
-            & States.entity_id.in_(entity_ids)
-        )
-    )
-
-
-def _apply_events_types_and_states_filter(hass, query, old_state):
-    events_query = (
-        query.outerjoin(States, (Events.event_id == States.event_id))
-        .outerjoin(old_state, (States.old_state_id == old_state.state_id))
-        .filter(
-            (Events.event_type != EVENT_STATE_CHANGED)
-            | _missing_state_matcher(old_state)
-        )
-        .filter(
-            (Events.event_type != EVENT_STATE_CHANGED) | _continuous_entity_matcher()
-        )
+        .filter(States.last_updated == States.last_changed)
     )
-    return _apply_event_types_filter(hass, events_query, ALL_EVENT_TYPES)
 
 
 def _missing_state_matcher(old_state):
@@ -543,9 +910,13 @@ def _continuous_entity_matcher():
     # Prefilter out continuous domains that have
     # ATTR_UNIT_OF_MEASUREMENT as its much faster in sql.
     #
+    # Only one of the attributes columns is set, the other one is NULL
     return sqlalchemy.or_(
         sqlalchemy.not_(States.domain.in_(CONTINUOUS_DOMAINS)),
         sqlalchemy.not_(States.attributes.contains(UNIT_OF_MEASUREMENT_JSON)),
+        sqlalchemy.not_(
+            StateAttributes.shared_attrs.contains(UNIT_OF_MEASUREMENT_JSON)
+        ),
     )
 
 
@@ -661,6 +1032,22 @@ def _entity_name_from_event(entity_id, event, entity_attr_cache):
     ) or split_entity_id(entity_id)[1].replace("_", " ")
 
 
+class LiveEventRow(NamedTuple):
+    """The columns of a logbook query row for an event fired on the bus."""
+
+    event_type: str
+    event_data: str | None
+    time_fired: dt
+    context_id: str | None
+    context_user_id: str | None
+    context_parent_id: str | None
+    state: str | None = None
+    entity_id: str | None = None
+    domain: str | None = None
+    attributes: str | None = None
+    shared_attrs: str | None = None
+
+
 class LazyEventPartialState:
     """A lazy version of core Event with limited State joined in."""
 
@@ -700,7 +1087,9 @@ class LazyEventPartialState:
         if self._attributes:
             return self._attributes.get(ATTR_ICON)
 
-        result = ICON_JSON_EXTRACT.search(self._row.attributes)
+        result = ICON_JSON_EXTRACT.search(
+            self._row.shared_attrs or self._row.attributes
+        )
         return result and result.group(1)
 
     @property
@@ -725,13 +1114,11 @@ class LazyEventPartialState:
     def attributes(self):
         """State attributes."""
         if not self._attributes:
-            if (
-                self._row.attributes is None
-                or self._row.attributes == EMPTY_JSON_OBJECT
-            ):
+            source = self._row.shared_attrs or self._row.attributes
+            if source is None or source == EMPTY_JSON_OBJECT:
                 self._attributes = {}
             else:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(source)
         return self._attributes
 
     @property
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections import OrderedDict, deque
 from collections.abc import Callable, Iterable
 import concurrent.futures
 from datetime import datetime, timedelta
@@ -30,7 +31,7 @@ from homeassistant.const import (
     EVENT_TIME_CHANGED,
     MATCH_ALL,
 )
-from homeassistant.core import CoreState, HomeAssistant, callback
+from homeassistant.core import CoreState, Event, HomeAssistant, callback
 import homeassistant.helpers.config_validation as cv
 from homeassistant.helpers.entityfilter import (
     INCLUDE_EXCLUDE_BASE_FILTER_SCHEMA,
@@ -52,6 +53,7 @@ from homeassistant.loader import bind_hass
 import homeassistant.util.dt as dt_util
 
 from . import history, migration, purge, statistics, websocket_api
+from .bulk import BULK_INSERT_DIALECTS, BulkInserter
 from .const import (
     CONF_DB_INTEGRITY_CHECK,
     DATA_INSTANCE,
@@ -59,15 +61,18 @@ from .const import (
     MAX_QUEUE_BACKLOG,
     SQLITE_URL_PREFIX,
 )
+from .journal import CommitJournal, SpillQueue, uncommitted_events
 from .models import (
     Base,
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
     StatisticsRuns,
     process_timestamp,
 )
-from .pool import RecorderPool
+from .pool import DEFAULT_READ_POOL_SIZE, RecorderPool
+from .serializer import EventSerializer
 from .util import (
     dburl_to_path,
     end_incomplete_runs,
@@ -117,20 +122,38 @@ DEFAULT_DB_INTEGRITY_CHECK = True
 DEFAULT_DB_MAX_RETRIES = 10
 DEFAULT_DB_RETRY_WAIT = 3
 DEFAULT_COMMIT_INTERVAL = 1
+# The page cache of each connection reading a SQLite database, in KiB
+DEFAULT_DB_READ_CACHE_SIZE = 8192
+# The events not fitting in the queue are spilled to this file
+QUEUE_JOURNAL_FILE = "home-assistant_v2.db-queue"
+# The events accepted since the last commit are journaled to this file
+COMMIT_JOURNAL_FILE = "home-assistant_v2.db-uncommitted"
 KEEPALIVE_TIME = 30
+# The number of events not committed yet kept in memory for the readers
+UNCOMMITTED_EVENTS_MAX_SIZE = 10000
 
 # Controls how often we clean up
 # States and Events objects
 EXPIRE_AFTER_COMMITS = 120
 
+# The number of recently used shared attributes
+# to keep the attributes_id of in memory
+STATE_ATTRIBUTES_ID_CACHE_SIZE = 2048
+
 CONF_AUTO_PURGE = "auto_purge"
+CONF_BULK_INSERT = "bulk_insert"
+CONF_COMMIT_JOURNAL = "commit_journal"
 CONF_DB_URL = "db_url"
 CONF_DB_MAX_RETRIES = "db_max_retries"
 CONF_DB_RETRY_WAIT = "db_retry_wait"
+CONF_DB_READ_POOL_SIZE = "db_read_pool_size"
+CONF_DB_READ_CACHE_SIZE = "db_read_cache_size"
+CONF_DB_READ_MMAP_SIZE = "db_read_mmap_size"
 CONF_PURGE_KEEP_DAYS = "purge_keep_days"
 CONF_PURGE_INTERVAL = "purge_interval"
 CONF_EVENT_TYPES = "event_types"
 CONF_COMMIT_INTERVAL = "commit_interval"
+CONF_QUEUE_MAX_SIZE = "queue_max_size"
 
 INVALIDATED_ERR = "Database connection invalidated"
 CONNECTIVITY_ERR = "Error in database connectivity during commit"
@@ -168,6 +191,18 @@ CONFIG_SCHEMA = vol.Schema(
                     vol.Optional(
                         CONF_DB_INTEGRITY_CHECK, default=DEFAULT_DB_INTEGRITY_CHECK
                     ): cv.boolean,
+                    vol.Optional(CONF_BULK_INSERT, default=False): cv.boolean,
+                    vol.Optional(CONF_COMMIT_JOURNAL, default=False): cv.boolean,
+                    vol.Optional(
+                        CONF_DB_READ_POOL_SIZE, default=DEFAULT_READ_POOL_SIZE
+                    ): cv.positive_int,
+                    vol.Optional(
+                        CONF_DB_READ_CACHE_SIZE, default=DEFAULT_DB_READ_CACHE_SIZE
+                    ): cv.positive_int,
+                    vol.Optional(CONF_DB_READ_MMAP_SIZE, default=0): cv.positive_int,
+                    vol.Optional(CONF_QUEUE_MAX_SIZE): vol.All(
+                        vol.Coerce(int), vol.Range(min=1)
+                    ),
                 }
             ),
         )
@@ -257,6 +292,12 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
         db_retry_wait=db_retry_wait,
         entity_filter=entity_filter,
         exclude_t=exclude_t,
+        bulk_insert=conf[CONF_BULK_INSERT],
+        db_read_pool_size=conf[CONF_DB_READ_POOL_SIZE],
+        db_read_cache_size=conf[CONF_DB_READ_CACHE_SIZE],
+        db_read_mmap_size=conf[CONF_DB_READ_MMAP_SIZE],
+        queue_max_size=conf.get(CONF_QUEUE_MAX_SIZE),
+        commit_journal=conf[CONF_COMMIT_JOURNAL],
     )
     instance.async_initialize()
     instance.start()
@@ -370,6 +411,12 @@ class WaitTask:
     """An object to insert into the recorder queue to tell it set the _queue_watch event."""
 
 
+class CommitTask(NamedTuple):
+    """An object to insert into the recorder queue to commit the event session."""
+
+    done: asyncio.Event
+
+
 class Recorder(threading.Thread):
     """A threaded recorder class."""
 
@@ -384,6 +431,12 @@ class Recorder(threading.Thread):
         db_retry_wait: int,
         entity_filter: Callable[[str], bool],
         exclude_t: list[str],
+        bulk_insert: bool = False,
+        db_read_pool_size: int = DEFAULT_READ_POOL_SIZE,
+        db_read_cache_size: int = DEFAULT_DB_READ_CACHE_SIZE,
+        db_read_mmap_size: int = 0,
+        queue_max_size: int | None = None,
+        commit_journal: bool = False,
     ) -> None:
         """Initialize the recorder."""
         threading.Thread.__init__(self, name="Recorder")
@@ -392,7 +445,14 @@ class Recorder(threading.Thread):
         self.auto_purge = auto_purge
         self.keep_days = keep_days
         self.commit_interval = commit_interval
-        self.queue: Any = queue.SimpleQueue()
+        self.queue_max_size = queue_max_size
+        self.queue: Any
+        if queue_max_size:
+            self.queue = SpillQueue(
+                hass.config.path(QUEUE_JOURNAL_FILE), queue_max_size
+            )
+        else:
+            self.queue = queue.SimpleQueue()
         self.recording_start = dt_util.utcnow()
         self.db_url = uri
         self.db_max_retries = db_max_retries
@@ -402,14 +462,36 @@ class Recorder(threading.Thread):
         self._queue_watch = threading.Event()
         self.engine: Any = None
         self.run_info: Any = None
+        # Every event fired before this time is in the database
+        self.committed_until: datetime | None = None
+        # Changes when a purge starts and when it ends
+        self.purge_generation = 0
+        # The events put in the queue that may not be committed yet
+        self._uncommitted_events: deque[Event] = deque()
+        # When the last event dropped from them to bound the memory was fired
+        self._uncommitted_events_dropped_until: datetime | None = None
 
         self.entity_filter = entity_filter
         self.exclude_t = exclude_t
+        self.bulk_insert = bulk_insert
+        self.db_read_pool_size = db_read_pool_size
+        self.db_read_cache_size = db_read_cache_size
+        self.db_read_mmap_size = db_read_mmap_size
+        self.commit_journal = commit_journal
 
         self._timechanges_seen = 0
         self._commits_without_expire = 0
         self._keepalive_count = 0
+        self._last_event_time: datetime | None = None
         self._old_states: dict[str, States] = {}
+        self._old_state_ids: dict[str, int] = {}
+        self._bulk_inserter: BulkInserter | None = None
+        self._commit_journal: CommitJournal | None = None
+        # Encodes the new states while the recorder writes the previous ones
+        self.serializer = EventSerializer()
+        self.statistics_states = statistics.StatisticsStates()
+        self._state_attributes_ids: OrderedDict[str, int] = OrderedDict()
+        self._pending_state_attributes: dict[str, StateAttributes] = {}
         self._pending_expunge: list[States] = []
         self.event_session = None
         self.get_session = None
@@ -429,6 +511,8 @@ class Recorder(threading.Thread):
     @callback
     def async_initialize(self):
         """Initialize the recorder."""
+        # Events may have been dropped while the listener was removed
+        self.statistics_states = statistics.StatisticsStates()
         self._event_listener = self.hass.bus.async_listen(
             MATCH_ALL, self.event_listener, event_filter=self._async_event_filter
         )
@@ -443,8 +527,13 @@ class Recorder(threading.Thread):
         The queue grows during migraton or if something really goes wrong.
         """
         size = self.queue.qsize()
-        _LOGGER.debug("Recorder queue size is: %s", size)
-        if self.queue.qsize() <= MAX_QUEUE_BACKLOG:
+        _LOGGER.debug(
+            "Recorder queue size is: %s, serializer queue size is: %s",
+            size,
+            self.serializer.queue.qsize(),
+        )
+        # The events beyond queue_max_size are kept on disk
+        if self.queue_max_size or size <= MAX_QUEUE_BACKLOG:
             return
         _LOGGER.error(
             "The recorder queue reached the maximum size of %s; Events are no longer being recorded",
@@ -461,6 +550,7 @@ class Recorder(threading.Thread):
         if self._event_listener:
             self._event_listener()
             self._event_listener = None
+        self._uncommitted_events.clear()
 
     @callback
     def _async_event_filter(self, event) -> bool:
@@ -516,12 +606,16 @@ class Recorder(threading.Thread):
             #
             # We drain all the events in the queue and then insert
             # an empty one to ensure the next thing the recorder sees
-            # is a request to shutdown.
-            while True:
-                try:
-                    self.queue.get_nowait()
-                except queue.Empty:
-                    break
+            # is a request to shutdown. The events spilled to the journal
+            # are recorded after the next start.
+            if self.queue_max_size:
+                self.queue.clear()
+            else:
+                while True:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        break
             self.queue.put(None)
 
         self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, _empty_queue)
@@ -602,6 +696,15 @@ class Recorder(threading.Thread):
         """Schedule external statistics."""
         self.queue.put(ExternalStatisticsTask(metadata, stats))
 
+    async def async_commit(self) -> None:
+        """Commit the events queued so far to the database.
+
+        Used by readers that must see every event fired before the call.
+        """
+        done = asyncio.Event()
+        self.queue.put(CommitTask(done))
+        await done.wait()
+
     @callback
     def _async_setup_periodic_tasks(self):
         """Prepare periodic tasks."""
@@ -625,10 +728,14 @@ class Recorder(threading.Thread):
         hass_started = concurrent.futures.Future()
 
         self.hass.add_job(self.async_register, shutdown_task, hass_started)
+        self.serializer.start()
+        if self.queue_max_size:
+            self.queue.load()
 
         current_version = self._setup_recorder()
 
         if current_version is None:
+            self.serializer.stop()
             self.hass.add_job(self.async_connection_failed)
             return
 
@@ -758,7 +865,15 @@ class Recorder(threading.Thread):
 
     def _run_purge(self, purge_before, repack, apply_filter):
         """Purge the database."""
-        if purge.purge_old_data(self, purge_before, repack, apply_filter):
+        # Commit pending states first so the purge sees all
+        # the state attributes that are still in use
+        self._commit_event_session_or_retry()
+        self.purge_generation += 1
+        try:
+            finished = purge.purge_old_data(self, purge_before, repack, apply_filter)
+        finally:
+            self.purge_generation += 1
+        if finished:
             # We always need to do the db cleanups after a purge
             # is finished to ensure the WAL checkpoint and other
             # tasks happen after a vacuum.
@@ -769,7 +884,13 @@ class Recorder(threading.Thread):
 
     def _run_purge_entities(self, entity_filter):
         """Purge entities from the database."""
-        if purge.purge_entity_data(self, entity_filter):
+        self._commit_event_session_or_retry()
+        self.purge_generation += 1
+        try:
+            finished = purge.purge_entity_data(self, entity_filter)
+        finally:
+            self.purge_generation += 1
+        if finished:
             return
         # Schedule a new purge task if this one didn't finish
         self.queue.put(PurgeEntitiesTask(entity_filter))
@@ -816,6 +937,11 @@ class Recorder(threading.Thread):
         if isinstance(event, WaitTask):
             self._queue_watch.set()
             return
+        if isinstance(event, CommitTask):
+            self._commit_event_session_or_retry()
+            self.hass.loop.call_soon_threadsafe(event.done.set)
+            return
+        self._last_event_time = event.time_fired
         if event.event_type == EVENT_TIME_CHANGED:
             self._keepalive_count += 1
             if self._keepalive_count >= KEEPALIVE_TIME:
@@ -826,51 +952,117 @@ class Recorder(threading.Thread):
                 if self._timechanges_seen >= self.commit_interval:
                     self._timechanges_seen = 0
                     self._commit_event_session_or_retry()
+            if self._commit_journal:
+                # A commit already synced the emptied journal. Between the
+                # commits the journal is synced every second so a crash
+                # loses at most a second of events, whatever the interval
+                self._commit_journal.sync()
             return
 
         if not self.enabled:
             return
 
-        try:
-            if event.event_type == EVENT_STATE_CHANGED:
-                dbevent = Events.from_event(event, event_data="{}")
-            else:
-                dbevent = Events.from_event(event)
-            dbevent.created = event.time_fired
-            self.event_session.add(dbevent)
-        except (TypeError, ValueError):
-            _LOGGER.warning("Event is not JSON serializable: %s", event)
-            return
+        if self._commit_journal:
+            self._commit_journal.add(event)
 
         if event.event_type == EVENT_STATE_CHANGED:
-            try:
-                dbstate = States.from_event(event)
-                has_new_state = event.data.get("new_state")
-                if dbstate.entity_id in self._old_states:
-                    old_state = self._old_states.pop(dbstate.entity_id)
-                    if old_state.state_id:
-                        dbstate.old_state_id = old_state.state_id
-                    else:
-                        dbstate.old_state = old_state
-                if not has_new_state:
-                    dbstate.state = None
-                dbstate.event = dbevent
-                dbstate.created = event.time_fired
-                self.event_session.add(dbstate)
-                if has_new_state:
-                    self._old_states[dbstate.entity_id] = dbstate
-                    self._pending_expunge.append(dbstate)
-            except (TypeError, ValueError):
-                _LOGGER.warning(
-                    "State is not JSON serializable: %s",
-                    event.data.get("new_state"),
-                )
+            self.statistics_states.add_event(event)
+
+        if self._bulk_inserter:
+            self._bulk_inserter.add(event)
+        else:
+            self._add_event_to_session(event)
 
         # If they do not have a commit interval
         # than we commit right away
         if not self.commit_interval:
             self._commit_event_session_or_retry()
 
+    def _add_event_to_session(self, event):
+        """Add the database objects for an event to the event session."""
+        if event.event_type == EVENT_STATE_CHANGED:
+            self._add_state_to_session(event)
+            return
+
+        try:
+            dbevent = Events.from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Event is not JSON serializable: %s", event)
+            return
+        dbevent.created = event.time_fired
+        self.event_session.add(dbevent)
+
+    def _add_state_to_session(self, event):
+        """Add the state of a state_changed event to the event session.
+
+        The state carries the context of the event so
+        no events row is written for it.
+        """
+        try:
+            dbstate = States.from_event(event)
+            dbstate_attributes = StateAttributes.from_event(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning(
+                "State is not JSON serializable: %s",
+                event.data.get("new_state"),
+            )
+            return
+
+        self._set_state_attributes(dbstate, dbstate_attributes)
+        has_new_state = event.data.get("new_state")
+        if dbstate.entity_id in self._old_states:
+            old_state = self._old_states.pop(dbstate.entity_id)
+            if old_state.state_id:
+                dbstate.old_state_id = old_state.state_id
+            else:
+                dbstate.old_state = old_state
+        if not has_new_state:
+            dbstate.state = None
+        dbstate.created = event.time_fired
+        self.event_session.add(dbstate)
+        if has_new_state:
+            self._old_states[dbstate.entity_id] = dbstate
+            self._pending_expunge.append(dbstate)
+
+    def _set_state_attributes(self, dbstate, dbstate_attributes):
+        """Link the state to its shared attributes, adding them if they are new."""
+        shared_attrs = dbstate_attributes.shared_attrs
+        # Matching attributes are about to be committed
+        if pending_attributes := self._pending_state_attributes.get(shared_attrs):
+            dbstate.state_attributes = pending_attributes
+        # Matching attributes were recently seen
+        elif attributes_id := self._state_attributes_ids.get(shared_attrs):
+            self._state_attributes_ids.move_to_end(shared_attrs)
+            dbstate.attributes_id = attributes_id
+        # Matching attributes are in the database
+        elif attributes_id := self._find_shared_attributes_in_db(
+            dbstate_attributes.hash, shared_attrs
+        ):
+            self._cache_state_attributes_id(shared_attrs, attributes_id)
+            dbstate.attributes_id = attributes_id
+        else:
+            dbstate.state_attributes = dbstate_attributes
+            self._pending_state_attributes[shared_attrs] = dbstate_attributes
+            self.event_session.add(dbstate_attributes)
+
+    def _find_shared_attributes_in_db(self, attributes_hash, shared_attrs):
+        """Return the attributes_id of matching shared attributes in the database."""
+        with self.event_session.no_autoflush:
+            if attributes := (
+                self.event_session.query(StateAttributes.attributes_id)
+                .filter(StateAttributes.hash == attributes_hash)
+                .filter(StateAttributes.shared_attrs == shared_attrs)
+                .first()
+            ):
+                return attributes[0]
+        return None
+
+    def _cache_state_attributes_id(self, shared_attrs, attributes_id):
+        """Remember the attributes_id of shared attributes."""
+        self._state_attributes_ids[shared_attrs] = attributes_id
+        if len(self._state_attributes_ids) > STATE_ATTRIBUTES_ID_CACHE_SIZE:
+            self._state_attributes_ids.popitem(last=False)
+
     def _handle_database_error(self, err):
         """Handle a database error that may result in moving away the corrupt db."""
         if isinstance(err.__cause__, sqlite3.DatabaseError):
@@ -883,12 +1075,18 @@ class Recorder(threading.Thread):
 
     def _commit_event_session_or_retry(self):
         """Commit the event session if there is work to do."""
-        if not self.event_session.new and not self.event_session.dirty:
+        if (
+            not self.event_session.new
+            and not self.event_session.dirty
+            and not (self._bulk_inserter and self._bulk_inserter.pending)
+        ):
+            self.committed_until = self._last_event_time
             return
         tries = 1
         while tries <= self.db_max_retries:
             try:
                 self._commit_event_session()
+                self.committed_until = self._last_event_time
                 return
             except (exc.InternalError, exc.OperationalError) as err:
                 _LOGGER.error(
@@ -914,7 +1112,20 @@ class Recorder(threading.Thread):
                 if dbstate in self.event_session:
                     self.event_session.expunge(dbstate)
             self._pending_expunge = []
+        if self._bulk_inserter:
+            self._bulk_inserter.insert(self.event_session)
         self.event_session.commit()
+        if self._bulk_inserter:
+            self._bulk_inserter.committed()
+        if self._commit_journal:
+            self._commit_journal.committed()
+
+        # The new shared attributes have an attributes_id now
+        for shared_attrs, dbstate_attributes in self._pending_state_attributes.items():
+            self._cache_state_attributes_id(
+                shared_attrs, dbstate_attributes.attributes_id
+            )
+        self._pending_state_attributes = {}
 
         # Expire is an expensive operation (frequently more expensive
         # than the flush and commit itself) so we only
@@ -934,6 +1145,11 @@ class Recorder(threading.Thread):
     def _close_event_session(self):
         """Close the event session."""
         self._old_states = {}
+        self._old_state_ids = {}
+        self._state_attributes_ids.clear()
+        if self._bulk_inserter:
+            self._bulk_inserter.reset()
+        self._pending_state_attributes = {}
 
         if not self.event_session:
             return
@@ -964,7 +1180,42 @@ class Recorder(threading.Thread):
     @callback
     def event_listener(self, event):
         """Listen for new events and put them in the process queue."""
+        self.serializer.add(event)
         self.queue.put(event)
+        uncommitted_events = self._uncommitted_events
+        if len(uncommitted_events) >= UNCOMMITTED_EVENTS_MAX_SIZE:
+            self._uncommitted_events_dropped_until = (
+                uncommitted_events.popleft().time_fired
+            )
+        uncommitted_events.append(event)
+        if (committed_until := self.committed_until) is not None:
+            while (
+                uncommitted_events
+                and uncommitted_events[0].time_fired < committed_until
+            ):
+                uncommitted_events.popleft()
+
+    @callback
+    def async_uncommitted_events(self) -> tuple[datetime, list[Event]] | None:
+        """Return when the committed events end and the events fired since.
+
+        Every event fired before the returned time is in the database, the
+        returned events may not be committed yet. Returns None when some of
+        the events not committed yet were dropped to bound the memory.
+        """
+        uncommitted_events = self._uncommitted_events
+        committed_until = self.committed_until
+        if (dropped_until := self._uncommitted_events_dropped_until) is not None and (
+            committed_until is None or committed_until <= dropped_until
+        ):
+            return None
+        if committed_until is None:
+            if not uncommitted_events:
+                return dt_util.utcnow(), []
+            committed_until = uncommitted_events[0].time_fired
+        return committed_until, [
+            event for event in uncommitted_events if event.time_fired >= committed_until
+        ]
 
     def block_till_done(self):
         """Block till all events processed.
@@ -1003,6 +1254,11 @@ class Recorder(threading.Thread):
             kwargs["pool_reset_on_return"] = None
         elif self.db_url.startswith(SQLITE_URL_PREFIX):
             kwargs["poolclass"] = RecorderPool
+            kwargs["read_pool_size"] = self.db_read_pool_size
+            read_pragmas = [f"cache_size = -{self.db_read_cache_size}"]
+            if self.db_read_mmap_size:
+                read_pragmas.append(f"mmap_size = {self.db_read_mmap_size}")
+            kwargs["read_pragmas"] = read_pragmas
         else:
             kwargs["echo"] = False
 
@@ -1013,6 +1269,29 @@ class Recorder(threading.Thread):
 
         sqlalchemy_event.listen(self.engine, "connect", setup_recorder_connection)
 
+        if kwargs.get("poolclass") is RecorderPool:
+
+            def connect_reader(dialect, connection_record, cargs, cparams):
+                """Open the connections of the readers to be reused by other threads.
+
+                The connection of the recorder keeps the check for its thread.
+                """
+                if threading.get_ident() == self.ident:
+                    return None
+                return dialect.connect(*cargs, **cparams, check_same_thread=False)
+
+            sqlalchemy_event.listen(self.engine, "do_connect", connect_reader)
+
+        self._bulk_inserter = None
+        if self.bulk_insert:
+            if self.engine.dialect.name in BULK_INSERT_DIALECTS:
+                self._bulk_inserter = BulkInserter(self)
+            else:
+                _LOGGER.warning(
+                    "Bulk inserts are not supported with %s, falling back to the ORM",
+                    self.engine.dialect.name,
+                )
+
         Base.metadata.create_all(self.engine)
         self.get_session = scoped_session(sessionmaker(bind=self.engine))
         _LOGGER.debug("Connected to recorder database")
@@ -1042,6 +1321,32 @@ class Recorder(threading.Thread):
             self._schedule_compile_missing_statistics(session)
 
         self._open_event_session()
+        if self.commit_journal:
+            self._replay_commit_journal()
+
+    def _replay_commit_journal(self):
+        """Record the events accepted but not committed before a crash."""
+        if self._commit_journal:
+            self._commit_journal.close()
+            self._commit_journal = None
+        journal = CommitJournal(self.hass.config.path(COMMIT_JOURNAL_FILE))
+        if events := journal.load():
+            try:
+                with session_scope(session=self.get_session()) as session:
+                    events = uncommitted_events(session, events)
+                _LOGGER.info("Recording %s events that were not committed", len(events))
+                for event in events:
+                    self._process_one_event(event)
+                self._commit_event_session_or_retry()
+            except SQLAlchemyError as err:
+                _LOGGER.exception(
+                    "Error recording the uncommitted events, keeping them in %s: %s",
+                    journal.set_aside(),
+                    err,
+                )
+                self._reopen_event_session()
+        journal.open()
+        self._commit_journal = journal
 
     def _schedule_compile_missing_statistics(self, session: Session) -> None:
         """Add tasks for missing statistics runs."""
@@ -1079,8 +1384,14 @@ class Recorder(threading.Thread):
     def _shutdown(self):
         """Save end time for current run."""
         self.hass.add_job(self._async_stop_queue_watcher_and_event_listener)
+        self.serializer.stop()
         self._end_session()
+        if self._commit_journal:
+            self._commit_journal.close()
+            self._commit_journal = None
         self._close_connection()
+        if self.queue_max_size:
+            self.queue.close()
 
     @property
     def recording(self):
@@ -0,0 +1,218 @@
+"""Bulk insert events and states with executemany."""
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+from sqlalchemy import func, text
+from sqlalchemy.orm.session import Session
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, split_entity_id
+
+from .models import (
+    EMPTY_JSON_OBJECT,
+    Events,
+    StateAttributes,
+    States,
+    event_data_json,
+    state_attributes_json,
+)
+
+if TYPE_CHECKING:
+    from . import Recorder
+
+_LOGGER = logging.getLogger(__name__)
+
+# The dialects that accept explicit values for identity columns
+# and keep handing out ids past them afterwards
+BULK_INSERT_DIALECTS = {"mysql", "postgresql", "sqlite"}
+
+EVENTS_TABLE = Events.__table__  # type: ignore[attr-defined]
+STATES_TABLE = States.__table__  # type: ignore[attr-defined]
+STATE_ATTRIBUTES_TABLE = StateAttributes.__table__  # type: ignore[attr-defined]
+
+POSTGRESQL_SETVAL = text(
+    "SELECT setval(pg_get_serial_sequence(:table, :column), :last_id)"
+)
+
+
+class BulkInserter:
+    """Buffer the rows of a commit interval and insert them with executemany.
+
+    Ids are assigned in memory instead of being read back after each
+    insert, which is only safe as long as the recorder is the only
+    writer of the events, states and state_attributes tables.
+    """
+
+    def __init__(self, instance: Recorder) -> None:
+        """Initialize the bulk inserter."""
+        self.instance = instance
+        self._events: list[dict[str, Any]] = []
+        self._states: list[dict[str, Any]] = []
+        self._state_attributes: list[dict[str, Any]] = []
+        self._pending_state_attributes: dict[str, int] = {}
+        self._last_ids_loaded = False
+        self._last_event_id = 0
+        self._last_state_id = 0
+        self._last_attributes_id = 0
+
+    @property
+    def pending(self) -> bool:
+        """Return if there are rows waiting to be inserted."""
+        return bool(self._events or self._states)
+
+    def add(self, event: Event) -> None:
+        """Buffer the rows for an event."""
+        if not self._last_ids_loaded:
+            self._load_last_ids(self.instance.event_session)
+
+        if event.event_type == EVENT_STATE_CHANGED:
+            try:
+                self._add_state(event)
+            except (TypeError, ValueError):
+                _LOGGER.warning(
+                    "State is not JSON serializable: %s", event.data.get("new_state")
+                )
+            return
+
+        try:
+            event_data = event_data_json(event)
+        except (TypeError, ValueError):
+            _LOGGER.warning("Event is not JSON serializable: %s", event)
+            return
+
+        self._last_event_id += 1
+        self._events.append(
+            {
+                "event_id": self._last_event_id,
+                "event_type": event.event_type,
+                "event_data": event_data,
+                "origin": str(event.origin.value),
+                "time_fired": event.time_fired,
+                "created": event.time_fired,
+                "context_id": event.context.id,
+                "context_user_id": event.context.user_id,
+                "context_parent_id": event.context.parent_id,
+            }
+        )
+
+    def _add_state(self, event: Event) -> None:
+        """Buffer the state row for a state_changed event."""
+        entity_id = event.data["entity_id"]
+        state = event.data.get("new_state")
+        if state is None:
+            shared_attrs = EMPTY_JSON_OBJECT
+        else:
+            shared_attrs = state_attributes_json(state)
+        attributes_id = self._attributes_id(shared_attrs)
+
+        old_state_ids = self.instance._old_state_ids  # pylint: disable=protected-access
+        self._last_state_id += 1
+        row = {
+            "state_id": self._last_state_id,
+            "entity_id": entity_id,
+            "attributes": None,
+            "event_id": None,
+            "created": event.time_fired,
+            "old_state_id": old_state_ids.pop(entity_id, None),
+            "attributes_id": attributes_id,
+            "origin": str(event.origin.value),
+            "context_id": event.context.id,
+            "context_user_id": event.context.user_id,
+            "context_parent_id": event.context.parent_id,
+        }
+        # State got deleted
+        if state is None:
+            row["domain"] = split_entity_id(entity_id)[0]
+            row["state"] = None
+            row["last_changed"] = event.time_fired
+            row["last_updated"] = event.time_fired
+        else:
+            row["domain"] = state.domain
+            row["state"] = state.state
+            row["last_changed"] = state.last_changed
+            row["last_updated"] = state.last_updated
+            old_state_ids[entity_id] = self._last_state_id
+        self._states.append(row)
+
+    def _attributes_id(self, shared_attrs: str) -> int:
+        """Return the attributes_id of shared attributes, adding them if they are new."""
+        instance = self.instance
+        # pylint: disable=protected-access
+        if attributes_id := self._pending_state_attributes.get(shared_attrs):
+            return attributes_id
+        if attributes_id := instance._state_attributes_ids.get(shared_attrs):
+            instance._state_attributes_ids.move_to_end(shared_attrs)
+            return attributes_id
+        attributes_hash = StateAttributes.hash_shared_attrs(shared_attrs)
+        if attributes_id := instance._find_shared_attributes_in_db(
+            attributes_hash, shared_attrs
+        ):
+            instance._cache_state_attributes_id(shared_attrs, attributes_id)
+            return attributes_id
+
+        self._last_attributes_id += 1
+        attributes_id = self._last_attributes_id
+        self._state_attributes.append(
+            {
+                "attributes_id": attributes_id,
+                "hash": attributes_hash,
+                "shared_attrs": shared_attrs,
+            }
+        )
+        self._pending_state_attributes[shared_attrs] = attributes_id
+        return attributes_id
+
+    def _load_last_ids(self, session: Session) -> None:
+        """Load the ids to continue from."""
+        self._last_event_id = session.query(func.max(Events.event_id)).scalar() or 0
+        self._last_state_id = session.query(func.max(States.state_id)).scalar() or 0
+        self._last_attributes_id = (
+            session.query(func.max(StateAttributes.attributes_id)).scalar() or 0
+        )
+        self._last_ids_loaded = True
+
+    def insert(self, session: Session) -> None:
+        """Insert the buffered rows in the transaction of the session."""
+        is_postgresql = session.bind.dialect.name == "postgresql"
+        # The state attributes are inserted before the states
+        # referring to them to satisfy the foreign key constraints
+        for table, column, rows, last_id in (
+            (
+                STATE_ATTRIBUTES_TABLE,
+                "attributes_id",
+                self._state_attributes,
+                self._last_attributes_id,
+            ),
+            (EVENTS_TABLE, "event_id", self._events, self._last_event_id),
+            (STATES_TABLE, "state_id", self._states, self._last_state_id),
+        ):
+            if not rows:
+                continue
+            session.execute(table.insert(), rows)
+            if is_postgresql:
+                # Identity sequences do not advance past explicit ids
+                session.execute(
+                    POSTGRESQL_SETVAL,
+                    {"table": table.name, "column": column, "last_id": last_id},
+                )
+
+    def committed(self) -> None:
+        """Clear the buffers once the rows have been committed."""
+        for shared_attrs, attributes_id in self._pending_state_attributes.items():
+            self.instance._cache_state_attributes_id(  # pylint: disable=protected-access
+                shared_attrs, attributes_id
+            )
+        self._pending_state_attributes = {}
+        self._events = []
+        self._states = []
+        self._state_attributes = []
+
+    def reset(self) -> None:
+        """Drop the buffered rows and reload the ids from the database when needed."""
+        self._pending_state_attributes = {}
+        self._events = []
+        self._states = []
+        self._state_attributes = []
+        self._last_ids_loaded = False
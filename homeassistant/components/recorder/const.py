@@ -8,10 +8,11 @@ CONF_DB_INTEGRITY_CHECK = "db_integrity_check"
 
 MAX_QUEUE_BACKLOG = 30000
 
-# The maximum number of rows (events) we purge in one delete statement
-
 # sqlite3 has a limit of 999 until version 3.32.0
 # in https://github.com/sqlite/sqlite/commit/efdba1a8b3c6c967e7fae9c1989c40d420ce64cc
 # We can increase this back to 1000 once most
 # have upgraded their sqlite version
-MAX_ROWS_TO_PURGE = 998
+SQLITE_MAX_BIND_VARS = 998
+
+# The maximum number of rows (events) we purge in one delete statement
+MAX_ROWS_TO_PURGE = SQLITE_MAX_BIND_VARS
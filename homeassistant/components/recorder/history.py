@@ -3,22 +3,25 @@ from __future__ import annotations
 
 from collections import defaultdict
 from itertools import groupby
+import json
 import logging
 import time
 
-from sqlalchemy import and_, bindparam, func
+from sqlalchemy import Text, and_, bindparam, func, literal
 from sqlalchemy.ext import baked
 
 from homeassistant.components import recorder
 from homeassistant.components.recorder.models import (
     States,
+    process_timestamp,
     process_timestamp_to_utc_isoformat,
 )
 from homeassistant.components.recorder.util import execute, session_scope
-from homeassistant.core import split_entity_id
+from homeassistant.core import State, split_entity_id
 import homeassistant.util.dt as dt_util
 
-from .models import LazyState
+from .const import SQLITE_MAX_BIND_VARS
+from .models import EMPTY_JSON_OBJECT, LazyState, StateAttributes
 
 # mypy: allow-untyped-defs, no-check-untyped-defs
 
@@ -27,6 +30,11 @@ _LOGGER = logging.getLogger(__name__)
 STATE_KEY = "state"
 LAST_CHANGED_KEY = "last_changed"
 
+# Keys of the compressed state format
+COMPRESSED_STATE_STATE = "s"
+COMPRESSED_STATE_LAST_UPDATED = "lu"
+COMPRESSED_STATE_ATTRIBUTES = "a"
+
 SIGNIFICANT_DOMAINS = (
     "climate",
     "device_tracker",
@@ -48,6 +56,22 @@ QUERY_STATES = [
     States.entity_id,
     States.state,
     States.attributes,
+    States.attributes_id,
+    StateAttributes.shared_attrs,
+    States.last_changed,
+    States.last_updated,
+]
+
+# Most states of a minimal response only need the state and last_changed.
+# The attributes of the full states are loaded afterwards, see
+# _load_shared_attributes.
+QUERY_STATES_MINIMAL = [
+    States.domain,
+    States.entity_id,
+    States.state,
+    States.attributes,
+    States.attributes_id,
+    literal(value=None, type_=Text).label("shared_attrs"),
     States.last_changed,
     States.last_updated,
 ]
@@ -76,6 +100,8 @@ def get_significant_states_with_session(
     include_start_time_state=True,
     significant_changes_only=True,
     minimal_response=False,
+    compressed_state_format=False,
+    max_points=None,
 ):
     """
     Return states changes during UTC period start_time - end_time.
@@ -88,12 +114,23 @@ def get_significant_states_with_session(
     Significant states are all states where there is a state change,
     as well as all states from certain domains (for instance
     thermostat so that we get current temperature in our graphs).
+
+    With compressed_state_format the states of each entity are returned
+    in the compressed state format, see compress_states.
+
+    With max_points the numeric states of each entity are downsampled to
+    about max_points states, see _downsample_states.
     """
     timer_start = time.perf_counter()
 
-    baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
-    )
+    if minimal_response:
+        baked_query = hass.data[HISTORY_BAKERY](
+            lambda session: session.query(*QUERY_STATES_MINIMAL)
+        )
+    else:
+        baked_query = hass.data[HISTORY_BAKERY](
+            lambda session: _query_states_with_attributes(session)
+        )
 
     if significant_changes_only:
         baked_query += lambda q: q.filter(
@@ -139,6 +176,9 @@ def get_significant_states_with_session(
         filters,
         include_start_time_state,
         minimal_response,
+        compressed_state_format,
+        end_time,
+        max_points,
     )
 
 
@@ -146,7 +186,7 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
     """Return states changes during UTC period start_time - end_time."""
     with session_scope(hass=hass) as session:
         baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
+            lambda session: _query_states_with_attributes(session)
         )
 
         baked_query += lambda q: q.filter(
@@ -160,7 +200,9 @@ def state_changes_during_period(hass, start_time, end_time=None, entity_id=None)
             )
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(States.entity_id, States.last_updated)
@@ -182,12 +224,14 @@ def get_last_state_changes(hass, number_of_states, entity_id):
 
     with session_scope(hass=hass) as session:
         baked_query = hass.data[HISTORY_BAKERY](
-            lambda session: session.query(*QUERY_STATES)
+            lambda session: _query_states_with_attributes(session)
         )
         baked_query += lambda q: q.filter(States.last_changed == States.last_updated)
 
         if entity_id is not None:
-            baked_query += lambda q: q.filter_by(entity_id=bindparam("entity_id"))
+            baked_query += lambda q: q.filter(
+                States.entity_id == bindparam("entity_id")
+            )
             entity_id = entity_id.lower()
 
         baked_query += lambda q: q.order_by(
@@ -245,75 +289,88 @@ def _get_states_with_session(
         if run is None:
             return []
 
+    if entity_ids:
+        return _get_entities_states_with_session(
+            session, utc_point_in_time, entity_ids, run
+        )
+
     # We have more than one entity to look at so we need to do a query on states
     # since the last recorder run started.
-    query = session.query(*QUERY_STATES)
-
-    if entity_ids:
-        # We got an include-list of entities, accelerate the query by filtering already
-        # in the inner query.
-        most_recent_state_ids = (
-            session.query(
-                func.max(States.state_id).label("max_state_id"),
-            )
-            .filter(
-                (States.last_updated >= run.start)
-                & (States.last_updated < utc_point_in_time)
-            )
-            .filter(States.entity_id.in_(entity_ids))
+    query = _query_states_with_attributes(session)
+
+    # We did not get an include-list of entities, query all states in the inner
+    # query, then filter out unwanted domains as well as applying the custom filter.
+    # This filtering can't be done in the inner query because the domain column is
+    # not indexed and we can't control what's in the custom filter.
+    most_recent_states_by_date = (
+        session.query(
+            States.entity_id.label("max_entity_id"),
+            func.max(States.last_updated).label("max_last_updated"),
         )
-        most_recent_state_ids = most_recent_state_ids.group_by(States.entity_id)
-        most_recent_state_ids = most_recent_state_ids.subquery()
-        query = query.join(
-            most_recent_state_ids,
-            States.state_id == most_recent_state_ids.c.max_state_id,
+        .filter(
+            (States.last_updated >= run.start)
+            & (States.last_updated < utc_point_in_time)
         )
-    else:
-        # We did not get an include-list of entities, query all states in the inner
-        # query, then filter out unwanted domains as well as applying the custom filter.
-        # This filtering can't be done in the inner query because the domain column is
-        # not indexed and we can't control what's in the custom filter.
-        most_recent_states_by_date = (
-            session.query(
-                States.entity_id.label("max_entity_id"),
-                func.max(States.last_updated).label("max_last_updated"),
-            )
+        .group_by(States.entity_id)
+        .subquery()
+    )
+    most_recent_state_ids = (
+        session.query(func.max(States.state_id).label("max_state_id"))
+        .join(
+            most_recent_states_by_date,
+            and_(
+                States.entity_id == most_recent_states_by_date.c.max_entity_id,
+                States.last_updated == most_recent_states_by_date.c.max_last_updated,
+            ),
+        )
+        .group_by(States.entity_id)
+        .subquery()
+    )
+    query = query.join(
+        most_recent_state_ids,
+        States.state_id == most_recent_state_ids.c.max_state_id,
+    )
+    query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
+    if filters:
+        query = filters.apply(query)
+
+    return [LazyState(row) for row in execute(query)]
+
+
+def _get_entities_states_with_session(session, utc_point_in_time, entity_ids, run):
+    """Return the states of an include-list of entities at a point in time.
+
+    Every entity is looked up with its own seek on the
+    index of the states by entity_id and last_updated.
+    """
+    states = []
+    # Each lookup binds the entity_id and both ends of the period
+    chunk_size = SQLITE_MAX_BIND_VARS // 3
+    for idx in range(0, len(entity_ids), chunk_size):
+        most_recent_state_ids = [
+            session.query(States.state_id)
             .filter(
-                (States.last_updated >= run.start)
+                (States.entity_id == entity_id)
+                & (States.last_updated >= run.start)
                 & (States.last_updated < utc_point_in_time)
             )
-            .group_by(States.entity_id)
-            .subquery()
+            .order_by(States.last_updated.desc(), States.state_id.desc())
+            .limit(1)
+            .scalar_subquery()
+            for entity_id in entity_ids[idx : idx + chunk_size]
+        ]
+        query = _query_states_with_attributes(session).filter(
+            States.state_id.in_(most_recent_state_ids)
         )
-        most_recent_state_ids = (
-            session.query(func.max(States.state_id).label("max_state_id"))
-            .join(
-                most_recent_states_by_date,
-                and_(
-                    States.entity_id == most_recent_states_by_date.c.max_entity_id,
-                    States.last_updated
-                    == most_recent_states_by_date.c.max_last_updated,
-                ),
-            )
-            .group_by(States.entity_id)
-            .subquery()
-        )
-        query = query.join(
-            most_recent_state_ids,
-            States.state_id == most_recent_state_ids.c.max_state_id,
-        )
-        query = query.filter(~States.domain.in_(IGNORE_DOMAINS))
-        if filters:
-            query = filters.apply(query)
-
-    return [LazyState(row) for row in execute(query)]
+        states.extend(LazyState(row) for row in execute(query))
+    return states
 
 
 def _get_single_entity_states_with_session(hass, session, utc_point_in_time, entity_id):
     # Use an entirely different (and extremely fast) query if we only
     # have a single entity id
     baked_query = hass.data[HISTORY_BAKERY](
-        lambda session: session.query(*QUERY_STATES)
+        lambda session: _query_states_with_attributes(session)
     )
     baked_query += lambda q: q.filter(
         States.last_updated < bindparam("utc_point_in_time"),
@@ -329,6 +386,43 @@ def _get_single_entity_states_with_session(hass, session, utc_point_in_time, ent
     return [LazyState(row) for row in execute(query)]
 
 
+def _query_states_with_attributes(session):
+    """Return a query for states joined with their shared attributes."""
+    return session.query(*QUERY_STATES).outerjoin(
+        StateAttributes, States.attributes_id == StateAttributes.attributes_id
+    )
+
+
+def _load_shared_attributes(session, pending_attributes):
+    """Load the shared attributes of states queried without them."""
+    attributes_ids = list({attributes_id for _, attributes_id in pending_attributes})
+    shared_attrs = {}
+    for idx in range(0, len(attributes_ids), SQLITE_MAX_BIND_VARS):
+        shared_attrs.update(
+            session.query(StateAttributes.attributes_id, StateAttributes.shared_attrs)
+            .filter(
+                StateAttributes.attributes_id.in_(
+                    attributes_ids[idx : idx + SQLITE_MAX_BIND_VARS]
+                )
+            )
+            .all()
+        )
+
+    # States with the same attributes share the decoded attributes
+    decoded_attrs = {}
+    for state, attributes_id in pending_attributes:
+        if (attributes := decoded_attrs.get(attributes_id)) is None:
+            try:
+                attributes = json.loads(
+                    shared_attrs.get(attributes_id) or EMPTY_JSON_OBJECT
+                )
+            except ValueError:
+                _LOGGER.exception("Error converting attributes of state: %s", state)
+                attributes = {}
+            decoded_attrs[attributes_id] = attributes
+        state.attributes = attributes
+
+
 def _sorted_states_to_dict(
     hass,
     session,
@@ -338,6 +432,9 @@ def _sorted_states_to_dict(
     filters=None,
     include_start_time_state=True,
     minimal_response=False,
+    compressed_state_format=False,
+    end_time=None,
+    max_points=None,
 ):
     """Convert SQL results into JSON friendly data structure.
 
@@ -375,19 +472,36 @@ def _sorted_states_to_dict(
     # here
     _process_timestamp_to_utc_isoformat = process_timestamp_to_utc_isoformat
 
+    # States that were queried without their shared attributes
+    pending_attributes = []
+
+    def _lazy_state(db_state):
+        """Create a LazyState, loading the attributes later if needed."""
+        state = LazyState(db_state)
+        if db_state.attributes_id is not None and db_state.shared_attrs is None:
+            pending_attributes.append((state, db_state.attributes_id))
+        return state
+
+    if max_points is not None:
+        bucket_size = ((end_time or dt_util.utcnow()) - start_time) / max(
+            max_points // 2, 1
+        )
+
     # Append all changes to it
     for ent_id, group in groupby(states, lambda state: state.entity_id):
+        if max_points is not None:
+            group = _downsample_states(group, start_time, bucket_size)
         domain = split_entity_id(ent_id)[0]
         ent_results = result[ent_id]
         if not minimal_response or domain in NEED_ATTRIBUTE_DOMAINS:
-            ent_results.extend(LazyState(db_state) for db_state in group)
+            ent_results.extend(_lazy_state(db_state) for db_state in group)
 
         # With minimal response we only provide a native
         # State for the first and last response. All the states
         # in-between only provide the "state" and the
         # "last_changed".
         if not ent_results:
-            ent_results.append(LazyState(next(group)))
+            ent_results.append(_lazy_state(next(group)))
 
         prev_state = ent_results[-1]
         initial_state_count = len(ent_results)
@@ -398,26 +512,115 @@ def _sorted_states_to_dict(
             if db_state.state == prev_state.state:
                 continue
 
-            ent_results.append(
-                {
-                    STATE_KEY: db_state.state,
-                    LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
-                        db_state.last_changed
-                    ),
-                }
-            )
+            if compressed_state_format:
+                # Converted by compress_states
+                ent_results.append(db_state)
+            else:
+                ent_results.append(
+                    {
+                        STATE_KEY: db_state.state,
+                        LAST_CHANGED_KEY: _process_timestamp_to_utc_isoformat(
+                            db_state.last_changed
+                        ),
+                    }
+                )
             prev_state = db_state
 
         if prev_state and len(ent_results) != initial_state_count:
             # There was at least one state change
             # replace the last minimal state with
             # a full state
-            ent_results[-1] = LazyState(prev_state)
+            ent_results[-1] = _lazy_state(prev_state)
+
+    if pending_attributes:
+        _load_shared_attributes(session, pending_attributes)
+
+    if compressed_state_format:
+        return {key: compress_states(val) for key, val in result.items() if val}
 
     # Filter out the empty lists if some states had 0 results.
     return {key: val for key, val in result.items() if val}
 
 
+def _downsample_states(db_states, start_time, bucket_size):
+    """Keep the lowest and the highest numeric state of each time bucket.
+
+    The states which are not numeric, like unavailable, and the last
+    state are always kept.
+    """
+    bucket = lowest = highest = None
+    db_state = None
+    for db_state in db_states:
+        try:
+            value = float(db_state.state)
+        except (TypeError, ValueError):
+            yield from _bucket_states(lowest, highest)
+            bucket = lowest = highest = None
+            yield db_state
+            continue
+
+        last_updated = process_timestamp(db_state.last_updated)
+        state_bucket = (last_updated - start_time) // bucket_size
+        if state_bucket != bucket:
+            yield from _bucket_states(lowest, highest)
+            bucket = state_bucket
+            lowest = highest = (value, db_state)
+        elif value < lowest[0]:
+            lowest = (value, db_state)
+        elif value > highest[0]:
+            highest = (value, db_state)
+
+    if lowest is None:
+        return
+    yield from _bucket_states(lowest, highest)
+    if db_state is not lowest[1] and db_state is not highest[1]:
+        yield db_state
+
+
+def _bucket_states(lowest, highest):
+    """Yield the lowest and the highest state of a bucket in time order."""
+    if lowest is None:
+        return
+    if lowest[1] is highest[1]:
+        yield lowest[1]
+    elif lowest[1].last_updated < highest[1].last_updated:
+        yield lowest[1]
+        yield highest[1]
+    else:
+        yield highest[1]
+        yield lowest[1]
+
+
+def compress_states(states):
+    """Convert the states of an entity to the compressed state format.
+
+    The states and the times they were last updated, in seconds since the
+    epoch, are kept in parallel lists. The attributes are only included for
+    the states where they changed, as [index, attributes] pairs.
+    """
+    state_values = []
+    last_updated = []
+    attributes = []
+    prev_attributes = None
+    for idx, state in enumerate(states):
+        if isinstance(state, State):
+            state_values.append(state.state)
+            last_updated.append(state.last_updated.timestamp())
+            if state.attributes != prev_attributes:
+                prev_attributes = state.attributes
+                attributes.append([idx, dict(prev_attributes)])
+        else:
+            # The rows in between the full states of a minimal
+            # response are only kept for their state changes
+            state_values.append(state.state)
+            last_updated.append(process_timestamp(state.last_changed).timestamp())
+    return {
+        COMPRESSED_STATE_STATE: state_values,
+        COMPRESSED_STATE_LAST_UPDATED: last_updated,
+        COMPRESSED_STATE_ATTRIBUTES: attributes,
+    }
+
+
 def get_state(hass, utc_point_in_time, entity_id, run=None):
     """Return a state at a specific point in time."""
     states = get_states(hass, utc_point_in_time, (entity_id,), run)
@@ -0,0 +1,430 @@
+"""Keep the events waiting to be recorded in an append-only journal file."""
+from __future__ import annotations
+
+from collections import Counter, deque
+from datetime import datetime
+import json
+import logging
+import os
+import shutil
+import threading
+from typing import Any, TextIO
+
+from sqlalchemy.orm.session import Session
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Context, Event, EventOrigin, State
+from homeassistant.helpers.json import JSONEncoder
+import homeassistant.util.dt as dt_util
+
+from .models import Events, States, process_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Taken in place of a malformed journal line
+_MALFORMED = object()
+
+# The number of rows read at once when matching the replayed events
+JOURNAL_MATCH_BATCH_SIZE = 100
+
+
+def encode_event(event: Event) -> str:
+    """Return the journal line of an event."""
+    try:
+        return event.as_dict_json
+    except ValueError:
+        # NaN and infinity are recorded as the stdlib encoder writes them
+        return json.dumps(event.as_dict(), cls=JSONEncoder, separators=(",", ":"))
+
+
+def decode_event(line: str) -> Event:
+    """Return the event of a journal line."""
+    event_dict = json.loads(line)
+    event_type = event_dict["event_type"]
+    data = event_dict["data"]
+    if event_type == EVENT_STATE_CHANGED:
+        for key in ("old_state", "new_state"):
+            if data.get(key) is not None:
+                data[key] = State.from_dict(data[key])
+    return Event(
+        event_type,
+        data,
+        EventOrigin(event_dict["origin"]),
+        dt_util.parse_datetime(event_dict["time_fired"]),
+        Context(**event_dict["context"]),
+    )
+
+
+class _SpilledEvents:
+    """A run of consecutive events waiting in the journal."""
+
+    __slots__ = ("count",)
+
+    def __init__(self, count: int) -> None:
+        """Initialize the run."""
+        self.count = count
+
+
+class SpillQueue:
+    """A queue keeping up to max_size events in memory.
+
+    The events put while the queue is full are appended to the journal
+    and read back in order once the events before them were taken. The
+    tasks are always kept in memory, in order with the events.
+
+    The journal is written by its own thread and read by the thread
+    taking the items, so putting an item never waits for the disk.
+    The queue expects a single thread taking the items.
+
+    The events left in the journal on shutdown are taken first after the
+    next start. When the recorder stops without shutting down, the events
+    taken from the journal since it was last empty are taken again.
+    """
+
+    def __init__(self, path: str, max_size: int) -> None:
+        """Initialize the queue."""
+        self.path = path
+        self.max_size = max_size
+        self._items: deque[Any] = deque()
+        self._events_in_memory = 0
+        self._events_in_journal = 0
+        # The lines not written yet and the lines written but not read yet
+        self._unwritten: list[str] = []
+        self._written = 0
+        self._writer: TextIO | None = None
+        self._reader: TextIO | None = None
+        self._writer_thread: threading.Thread | None = None
+        self._closing = False
+        self._not_empty = threading.Condition(threading.Lock())
+        # Held while reading or writing the journal
+        self._journal_lock = threading.Lock()
+
+    def load(self) -> None:
+        """Open the journal, taking the events left in it first.
+
+        The events are only spilled to the journal once it is loaded.
+        """
+        with self._not_empty:
+            self._writer = open(  # pylint: disable=consider-using-with
+                self.path, "a", encoding="utf-8"
+            )
+            self._reader = open(  # pylint: disable=consider-using-with
+                self.path, encoding="utf-8"
+            )
+            if count := sum(1 for _ in self._reader):
+                _LOGGER.info("Recording %s events left in %s", count, self.path)
+                self._reader.seek(0)
+                self._items.appendleft(_SpilledEvents(count))
+                self._events_in_journal = count
+                self._written = count
+                self._not_empty.notify_all()
+            self._writer_thread = threading.Thread(
+                target=self._write, name="Recorder queue journal", daemon=True
+            )
+            self._writer_thread.start()
+
+    def qsize(self) -> int:
+        """Return the number of queued items."""
+        with self._not_empty:
+            return (
+                len(self._items)
+                + self._events_in_journal
+                - sum(isinstance(item, _SpilledEvents) for item in self._items)
+            )
+
+    def put(self, item: Any) -> None:
+        """Queue an item, spilling the event to the journal when the queue is full."""
+        line = None
+        if (
+            self._writer is not None
+            and isinstance(item, Event)
+            and self._events_in_memory >= self.max_size
+        ):
+            # Decided without the lock: taking items only makes room, so at
+            # worst an event that would fit in memory is spilled
+            try:
+                line = f"{encode_event(item)}\n"
+            except (TypeError, ValueError):
+                _LOGGER.warning("Event is not JSON serializable: %s", item)
+                return
+
+        with self._not_empty:
+            if line is not None and self._writer is not None:
+                self._unwritten.append(line)
+                self._events_in_journal += 1
+                if self._items and isinstance(self._items[-1], _SpilledEvents):
+                    self._items[-1].count += 1
+                    self._not_empty.notify_all()
+                    return
+                item = _SpilledEvents(1)
+            elif isinstance(item, Event):
+                self._events_in_memory += 1
+            self._items.append(item)
+            self._not_empty.notify_all()
+
+    def get(self) -> Any:
+        """Take the next item, waiting for one."""
+        while True:
+            with self._not_empty:
+                while not self._items:
+                    self._not_empty.wait()
+                item = self._items[0]
+                if not isinstance(item, _SpilledEvents):
+                    self._items.popleft()
+                    if isinstance(item, Event):
+                        self._events_in_memory -= 1
+                    return item
+                while not self._written:
+                    self._not_empty.wait()
+                self._written -= 1
+                item.count -= 1
+                if not item.count:
+                    self._items.popleft()
+                self._events_in_journal -= 1
+
+            if (event := self._read_event()) is not _MALFORMED:
+                return event
+
+    def clear(self) -> None:
+        """Drop the items in memory, keeping the events in the journal."""
+        with self._not_empty:
+            self._items.clear()
+            self._events_in_memory = 0
+
+    def close(self) -> None:
+        """Close the journal, keeping only the events not taken yet."""
+        with self._not_empty:
+            self._closing = True
+            self._not_empty.notify_all()
+        if self._writer_thread is not None:
+            self._writer_thread.join()
+            self._writer_thread = None
+        with self._journal_lock:
+            if self._writer is None or self._reader is None:
+                return
+            self._writer.close()
+            self._writer = None
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+                shutil.copyfileobj(self._reader, tmp_file)
+                keep = tmp_file.tell() > 0
+            self._reader.close()
+            self._reader = None
+            if keep:
+                os.replace(tmp_path, self.path)
+            else:
+                os.remove(tmp_path)
+                os.remove(self.path)
+
+    def _write(self) -> None:
+        """Write the spilled events to the journal until it is closed."""
+        while True:
+            with self._not_empty:
+                while not self._unwritten and not self._closing:
+                    self._not_empty.wait()
+                if not self._unwritten:
+                    return
+                lines = self._unwritten
+                self._unwritten = []
+            with self._journal_lock:
+                assert self._writer is not None
+                self._writer.writelines(lines)
+                self._writer.flush()
+            with self._not_empty:
+                self._written += len(lines)
+                self._not_empty.notify_all()
+
+    def _read_event(self) -> Any:
+        """Read the next spilled event, _MALFORMED if its journal line is malformed."""
+        with self._journal_lock:
+            assert self._writer is not None and self._reader is not None
+            line = self._reader.readline()
+            with self._not_empty:
+                drained = not self._events_in_journal
+            if drained:
+                # Start over once every spilled event was taken
+                self._writer.truncate(0)
+                self._reader.seek(0)
+        try:
+            return decode_event(line)
+        except (KeyError, TypeError, ValueError):
+            _LOGGER.warning("Skipping malformed journal line: %s", line)
+            return _MALFORMED
+
+
+class CommitJournal:
+    """An append-only journal of the events accepted since the last commit.
+
+    The events are synced to disk in batches and the journal is emptied
+    once they are committed. The events left in it after a crash are
+    recorded on the next start, before the journal is opened again.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Initialize the journal."""
+        self.path = path
+        self._file: TextIO | None = None
+        self._synced = True
+
+    def load(self) -> list[Event]:
+        """Return the events left in the journal."""
+        events = []
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as journal_file:
+                for line in journal_file:
+                    try:
+                        events.append(decode_event(line))
+                    except (KeyError, TypeError, ValueError):
+                        _LOGGER.warning("Skipping malformed journal line: %s", line)
+        return events
+
+    def open(self) -> None:
+        """Open the journal, emptying it.
+
+        The events left in it must be committed or set aside first.
+        """
+        self._file = open(  # pylint: disable=consider-using-with
+            self.path, "a", encoding="utf-8"
+        )
+        self._file.truncate(0)
+
+    def set_aside(self) -> str:
+        """Move the journal away, keeping the events left in it."""
+        path = f"{self.path}.failed.{dt_util.utcnow().isoformat()}"
+        os.replace(self.path, path)
+        return path
+
+    def add(self, event: Event) -> None:
+        """Append an accepted event."""
+        assert self._file is not None
+        try:
+            self._file.write(f"{encode_event(event)}\n")
+        except (TypeError, ValueError):
+            # The recorder does not record the event either
+            return
+        self._synced = False
+
+    def sync(self) -> None:
+        """Sync the events appended since the last sync to disk."""
+        if self._synced or self._file is None:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._synced = True
+
+    def committed(self) -> None:
+        """Empty the journal once its events are committed."""
+        if self._file is not None:
+            self._file.flush()
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._synced = True
+
+    def close(self) -> None:
+        """Close the journal, removing it when it is empty."""
+        if self._file is None:
+            return
+        self.sync()
+        empty = os.fstat(self._file.fileno()).st_size == 0
+        self._file.close()
+        self._file = None
+        if empty:
+            os.remove(self.path)
+
+
+def last_committed_time(session: Session) -> datetime | None:
+    """Return when the last committed event was fired."""
+    times = [
+        process_timestamp(created)
+        for created in (
+            session.query(States.created)
+            .order_by(States.state_id.desc())
+            .limit(1)
+            .scalar(),
+            session.query(Events.created)
+            .order_by(Events.event_id.desc())
+            .limit(1)
+            .scalar(),
+        )
+        if created is not None
+    ]
+    return max(times, default=None)
+
+
+def _rows_created_at(
+    session: Session,
+    primary_key: Any,
+    created: Any,
+    columns: tuple,
+    committed_until: datetime,
+) -> list[tuple]:
+    """Return the columns of the last rows created at committed_until.
+
+    The rows are inserted in the order the events were fired, so they
+    are walked back along the primary key in batches, stopping at the
+    first row created before committed_until.
+    """
+    query = session.query(primary_key, created, *columns).order_by(primary_key.desc())
+    rows = []
+    before_id = None
+    while True:
+        batch = (
+            (query if before_id is None else query.filter(primary_key < before_id))
+            .limit(JOURNAL_MATCH_BATCH_SIZE)
+            .all()
+        )
+        for row in batch:
+            if process_timestamp(row[1]) < committed_until:
+                return rows
+            rows.append(tuple(row[2:]))
+        if len(batch) < JOURNAL_MATCH_BATCH_SIZE:
+            return rows
+        before_id = batch[-1][0]
+
+
+def uncommitted_events(session: Session, events: list[Event]) -> list[Event]:
+    """Return the events of a commit journal that were not committed.
+
+    The journal is emptied right after each commit, so only the events
+    fired at the time of the last committed event may be in the database
+    already. They are matched with its rows by context.
+    """
+    if (committed_until := last_committed_time(session)) is None:
+        return events
+    committed = Counter(
+        (EVENT_STATE_CHANGED, entity_id, context_id)
+        for entity_id, context_id in _rows_created_at(
+            session,
+            States.state_id,
+            States.created,
+            (States.entity_id, States.context_id),
+            committed_until,
+        )
+    )
+    committed.update(
+        (event_type, None, context_id)
+        for event_type, context_id in _rows_created_at(
+            session,
+            Events.event_id,
+            Events.created,
+            (Events.event_type, Events.context_id),
+            committed_until,
+        )
+    )
+    uncommitted = []
+    for event in events:
+        if event.time_fired < committed_until:
+            continue
+        if event.time_fired == committed_until:
+            key = (
+                event.event_type,
+                event.data.get("entity_id")
+                if event.event_type == EVENT_STATE_CHANGED
+                else None,
+                event.context.id,
+            )
+            if committed[key]:
+                committed[key] -= 1
+                continue
+        uncommitted.append(event)
+    return uncommitted
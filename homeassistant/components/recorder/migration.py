@@ -15,7 +15,9 @@ from sqlalchemy.schema import AddConstraint, DropConstraint
 from sqlalchemy.sql.expression import true
 
 from .models import (
+    DIALECTS_INDEXING_PRIMARY_KEY,
     SCHEMA_VERSION,
+    STATES_ENTITY_ID_LAST_UPDATED_STATE_ID_INDEX,
     TABLE_STATES,
     Base,
     SchemaChanges,
@@ -326,6 +328,21 @@ def _update_states_table_with_foreign_key_options(connection, engine):
             )
 
 
+def _add_foreign_key_constraint(connection, table, columns):
+    """Add the foreign key constraint of the model on specific columns."""
+    for fkc in Base.metadata.tables[table].foreign_key_constraints:
+        if fkc.column_keys != columns:
+            continue
+        try:
+            connection.execute(AddConstraint(fkc))
+        except (InternalError, OperationalError):
+            _LOGGER.exception(
+                "Could not add foreign key constraint in %s table on %s",
+                table,
+                columns,
+            )
+
+
 def _drop_foreign_key_constraints(connection, engine, table, columns):
     """Drop foreign key constraints for a table on specific columns."""
     inspector = sqlalchemy.inspect(engine)
@@ -587,7 +604,54 @@ def _apply_update(instance, session, new_version, old_version):  # noqa: C901
     elif new_version == 23:
         # Add name column to StatisticsMeta
         _add_columns(session, "statistics_meta", ["name VARCHAR(255)"])
-
+    elif new_version == 24:
+        # The state_attributes table is created by create_all, new states
+        # reference their shared attributes in it. Existing states keep
+        # their attributes in the states table.
+        if engine.dialect.name == "sqlite":
+            # SQLite can only add a foreign key with the column
+            _add_columns(
+                connection,
+                "states",
+                ["attributes_id INTEGER REFERENCES state_attributes(attributes_id)"],
+            )
+        else:
+            _add_columns(connection, "states", ["attributes_id INTEGER"])
+            _add_foreign_key_constraint(connection, TABLE_STATES, ["attributes_id"])
+        _create_index(connection, "states", "ix_states_attributes_id")
+    elif new_version == 25:
+        # New states carry the context of their state_changed event,
+        # which is no longer written to the events table. Databases
+        # created before version 9 still have some of these columns.
+        _add_columns(
+            connection,
+            "states",
+            [
+                "origin VARCHAR(32)",
+                "context_id CHARACTER(36)",
+                "context_user_id CHARACTER(36)",
+                "context_parent_id CHARACTER(36)",
+            ],
+        )
+        _create_index(connection, "states", "ix_states_context_id")
+    elif new_version == 26:
+        # The state of multiple entities at a point in time is looked up
+        # with one seek per entity, which only needs state_id in the index
+        # when the index does not end in the primary key
+        if engine.dialect.name not in DIALECTS_INDEXING_PRIMARY_KEY:
+            _LOGGER.warning(
+                "Adding index `ix_states_entity_id_last_updated_state_id` to "
+                "database. Note: this can take several minutes on large "
+                "databases and slow computers. Please be patient!"
+            )
+            try:
+                connection.execute(STATES_ENTITY_ID_LAST_UPDATED_STATE_ID_INDEX)
+            except (InternalError, ProgrammingError, OperationalError) as err:
+                raise_if_exception_missing_str(err, ["already exists", "duplicate"])
+                _LOGGER.warning(
+                    "Index ix_states_entity_id_last_updated_state_id already "
+                    "exists on states, continuing"
+                )
     else:
         raise ValueError(f"No schema migration defined for version {new_version}")
 
@@ -5,8 +5,11 @@ from datetime import datetime, timedelta
 import json
 import logging
 from typing import TypedDict, overload
+import zlib
 
 from sqlalchemy import (
+    DDL,
+    BigInteger,
     Boolean,
     Column,
     DateTime,
@@ -20,6 +23,7 @@ from sqlalchemy import (
     distinct,
 )
 from sqlalchemy.dialects import mysql, oracle, postgresql
+from sqlalchemy.event import listen
 from sqlalchemy.ext.declarative import declared_attr
 from sqlalchemy.orm import declarative_base, relationship
 from sqlalchemy.orm.session import Session
@@ -40,14 +44,17 @@ import homeassistant.util.dt as dt_util
 # pylint: disable=invalid-name
 Base = declarative_base()
 
-SCHEMA_VERSION = 23
+SCHEMA_VERSION = 26
 
 _LOGGER = logging.getLogger(__name__)
 
 DB_TIMEZONE = "+00:00"
 
+EMPTY_JSON_OBJECT = "{}"
+
 TABLE_EVENTS = "events"
 TABLE_STATES = "states"
+TABLE_STATE_ATTRIBUTES = "state_attributes"
 TABLE_RECORDER_RUNS = "recorder_runs"
 TABLE_SCHEMA_CHANGES = "schema_changes"
 TABLE_STATISTICS = "statistics"
@@ -57,6 +64,7 @@ TABLE_STATISTICS_SHORT_TERM = "statistics_short_term"
 
 ALL_TABLES = [
     TABLE_STATES,
+    TABLE_STATE_ATTRIBUTES,
     TABLE_EVENTS,
     TABLE_RECORDER_RUNS,
     TABLE_SCHEMA_CHANGES,
@@ -77,6 +85,30 @@ DOUBLE_TYPE = (
 )
 
 
+def event_data_json(event: Event) -> str:
+    """Return the JSON of the event data to store.
+
+    NaN and infinity are stored as the stdlib encoder writes them.
+    """
+    try:
+        return event.data_json
+    except ValueError:
+        return json.dumps(event.data, cls=JSONEncoder, separators=(",", ":"))
+
+
+def state_attributes_json(state: State) -> str:
+    """Return the JSON of the state attributes to store.
+
+    NaN and infinity are stored as the stdlib encoder writes them.
+    """
+    try:
+        return state.attributes_json
+    except ValueError:
+        return json.dumps(
+            dict(state.attributes), cls=JSONEncoder, separators=(",", ":")
+        )
+
+
 class Events(Base):  # type: ignore
     """Event history data."""
 
@@ -111,8 +143,7 @@ class Events(Base):  # type: ignore
         """Create an event database object from a native event."""
         return Events(
             event_type=event.event_type,
-            event_data=event_data
-            or json.dumps(event.data, cls=JSONEncoder, separators=(",", ":")),
+            event_data=event_data or event_data_json(event),
             origin=str(event.origin.value),
             time_fired=event.time_fired,
             context_id=event.context.id,
@@ -163,8 +194,16 @@ class States(Base):  # type: ignore
     last_updated = Column(DATETIME_TYPE, default=dt_util.utcnow, index=True)
     created = Column(DATETIME_TYPE, default=dt_util.utcnow)
     old_state_id = Column(Integer, ForeignKey("states.state_id"), index=True)
+    attributes_id = Column(
+        Integer, ForeignKey("state_attributes.attributes_id"), index=True
+    )
+    origin = Column(String(MAX_LENGTH_EVENT_ORIGIN))
+    context_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID), index=True)
+    context_user_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
+    context_parent_id = Column(String(MAX_LENGTH_EVENT_CONTEXT_ID))
     event = relationship("Events", uselist=False)
     old_state = relationship("States", remote_side=[state_id])
+    state_attributes = relationship("StateAttributes")
 
     def __repr__(self) -> str:
         """Return string representation of instance for debugging."""
@@ -173,31 +212,39 @@ class States(Base):  # type: ignore
             f"id={self.state_id}, domain='{self.domain}', entity_id='{self.entity_id}', "
             f"state='{self.state}', event_id='{self.event_id}', "
             f"last_updated='{self.last_updated.isoformat(sep=' ', timespec='seconds')}', "
-            f"old_state_id={self.old_state_id}"
+            f"old_state_id={self.old_state_id}, attributes_id={self.attributes_id}"
             f")>"
         )
 
     @staticmethod
     def from_event(event):
-        """Create object from a state_changed event."""
+        """Create object from a state_changed event.
+
+        The attributes are stored separately, see StateAttributes.
+        The context of the event is stored on the state itself
+        instead of on a companion events row.
+        """
         entity_id = event.data["entity_id"]
         state = event.data.get("new_state")
 
-        dbstate = States(entity_id=entity_id)
+        dbstate = States(
+            entity_id=entity_id,
+            attributes=None,
+            origin=str(event.origin.value),
+            context_id=event.context.id,
+            context_user_id=event.context.user_id,
+            context_parent_id=event.context.parent_id,
+        )
 
         # State got deleted
         if state is None:
             dbstate.state = ""
             dbstate.domain = split_entity_id(entity_id)[0]
-            dbstate.attributes = "{}"
             dbstate.last_changed = event.time_fired
             dbstate.last_updated = event.time_fired
         else:
             dbstate.domain = state.domain
             dbstate.state = state.state
-            dbstate.attributes = json.dumps(
-                dict(state.attributes), cls=JSONEncoder, separators=(",", ":")
-            )
             dbstate.last_changed = state.last_changed
             dbstate.last_updated = state.last_updated
 
@@ -205,15 +252,18 @@ class States(Base):  # type: ignore
 
     def to_native(self, validate_entity_id=True):
         """Convert to an HA state object."""
+        attributes = self.attributes
+        if attributes is None and self.state_attributes is not None:
+            attributes = self.state_attributes.shared_attrs
         try:
             return State(
                 self.entity_id,
                 self.state,
-                json.loads(self.attributes),
+                json.loads(attributes or EMPTY_JSON_OBJECT),
                 process_timestamp(self.last_changed),
                 process_timestamp(self.last_updated),
-                # Join the events table on event_id to get the context instead
-                # as it will always be there for state_changed events
+                # The context is only restored where it is needed, older
+                # states keep it on the events row linked by event_id
                 context=Context(id=None),
                 validate_entity_id=validate_entity_id,
             )
@@ -223,6 +273,77 @@ class States(Base):  # type: ignore
             return None
 
 
+# SQLite and InnoDB indexes end in the primary key, so the states of an
+# entity updated at the same time are ordered by state_id in
+# ix_states_entity_id_last_updated already. The other databases get an
+# index ending in state_id to look up the state at a point in time
+# without sorting.
+DIALECTS_INDEXING_PRIMARY_KEY = ("sqlite", "mysql", "mariadb")
+STATES_ENTITY_ID_LAST_UPDATED_STATE_ID_INDEX = DDL(
+    "CREATE INDEX ix_states_entity_id_last_updated_state_id "
+    f"ON {TABLE_STATES} (entity_id, last_updated, state_id)"
+)
+listen(
+    States.__table__,
+    "after_create",
+    STATES_ENTITY_ID_LAST_UPDATED_STATE_ID_INDEX.execute_if(
+        callable_=lambda ddl, target, bind, **kw: bind.dialect.name
+        not in DIALECTS_INDEXING_PRIMARY_KEY
+    ),
+)
+
+
+class StateAttributes(Base):  # type: ignore
+    """State attribute change history.
+
+    Attributes that are shared by many state rows are only stored once.
+    """
+
+    __table_args__ = (
+        {"mysql_default_charset": "utf8mb4", "mysql_collate": "utf8mb4_unicode_ci"},
+    )
+    __tablename__ = TABLE_STATE_ATTRIBUTES
+    attributes_id = Column(Integer, Identity(), primary_key=True)
+    hash = Column(BigInteger, index=True)
+    # Not named attributes to avoid confusion with the states table
+    shared_attrs = Column(Text().with_variant(mysql.LONGTEXT, "mysql"))
+
+    def __repr__(self) -> str:
+        """Return string representation of instance for debugging."""
+        return (
+            f"<recorder.StateAttributes("
+            f"id={self.attributes_id}, hash='{self.hash}', attributes='{self.shared_attrs}'"
+            f")>"
+        )
+
+    @staticmethod
+    def from_event(event):
+        """Create object from a state_changed event."""
+        state = event.data.get("new_state")
+        # State got deleted
+        shared_attrs = (
+            EMPTY_JSON_OBJECT if state is None else state_attributes_json(state)
+        )
+        return StateAttributes(
+            hash=StateAttributes.hash_shared_attrs(shared_attrs),
+            shared_attrs=shared_attrs,
+        )
+
+    @staticmethod
+    def hash_shared_attrs(shared_attrs: str) -> int:
+        """Return the hash of the json encoded shared attributes."""
+        return zlib.crc32(shared_attrs.encode("utf-8"))
+
+    def to_native(self):
+        """Convert to an HA state attributes dict."""
+        try:
+            return json.loads(self.shared_attrs)
+        except ValueError:
+            # When json.loads fails
+            _LOGGER.exception("Error converting row to state attributes: %s", self)
+            return {}
+
+
 class StatisticResult(TypedDict):
     """Statistic result data class.
 
@@ -485,13 +606,17 @@ class LazyState(State):
         self._last_changed = None
         self._last_updated = None
         self._context = None
+        self._as_dict_json = None
+        self._attributes_json = None
 
     @property  # type: ignore
     def attributes(self):
         """State attributes."""
         if not self._attributes:
             try:
-                self._attributes = json.loads(self._row.attributes)
+                self._attributes = json.loads(
+                    self._row.shared_attrs or self._row.attributes or EMPTY_JSON_OBJECT
+                )
             except ValueError:
                 # When json.loads fails
                 _LOGGER.exception("Error converting row to state: %s", self._row)
@@ -1,34 +1,89 @@
 """A pool for sqlite connections."""
+import queue
 import threading
 
 from sqlalchemy.pool import NullPool, StaticPool
 
+# The number of connections kept open for the threads reading the database
+DEFAULT_READ_POOL_SIZE = 5
+
 
 class RecorderPool(StaticPool, NullPool):
     """A hybird of NullPool and StaticPool.
 
     When called from the creating thread acts like StaticPool
-    When called from any other thread, acts like NullPool
+    When called from any other thread, keeps up to read_pool_size
+    connections open for the next reader and acts like NullPool
+    beyond them. The readers only read the database, so their
+    connections get their own cache settings from read_pragmas.
     """
 
-    def __init__(self, *args, **kw):  # pylint: disable=super-init-not-called
+    def __init__(  # pylint: disable=super-init-not-called
+        self, creator, read_pool_size=DEFAULT_READ_POOL_SIZE, read_pragmas=(), **kw
+    ):
         """Create the pool."""
         self._tid = threading.current_thread().ident
-        StaticPool.__init__(self, *args, **kw)
+        self._read_pool_size = read_pool_size
+        self._read_pragmas = tuple(read_pragmas)
+        # The most recently used connection has the warmest cache
+        self._read_connections = queue.LifoQueue(maxsize=read_pool_size)
+        self._read_connections_disposed = False
+        StaticPool.__init__(self, creator, **kw)
+
+    def recreate(self):
+        """Return a new pool with the same settings."""
+        self.logger.info("Pool recreating")
+        return self.__class__(
+            creator=self._creator,
+            recycle=self._recycle,
+            reset_on_return=self._reset_on_return,
+            pre_ping=self._pre_ping,
+            echo=self.echo,
+            logging_name=self._orig_logging_name,
+            _dispatch=self.dispatch,
+            dialect=self._dialect,
+            read_pool_size=self._read_pool_size,
+            read_pragmas=self._read_pragmas,
+        )
 
     def _do_return_conn(self, conn):
         if threading.current_thread().ident == self._tid:
             return super()._do_return_conn(conn)
-        conn.close()
+        if not self._read_pool_size or self._read_connections_disposed:
+            conn.close()
+            return
+        try:
+            self._read_connections.put_nowait(conn)
+        except queue.Full:
+            conn.close()
 
     def dispose(self):
-        """Dispose of the connection."""
+        """Dispose of the connections."""
         if threading.current_thread().ident == self._tid:
+            # Connections still in use are closed when they are returned
+            self._read_connections_disposed = True
+            while True:
+                try:
+                    self._read_connections.get_nowait().close()
+                except queue.Empty:
+                    break
             return super().dispose()
 
     def _do_get(self):
         if threading.current_thread().ident == self._tid:
             return super()._do_get()
-        return super(  # pylint: disable=bad-super-call
+        try:
+            return self._read_connections.get_nowait()
+        except queue.Empty:
+            pass
+        conn = super(  # pylint: disable=bad-super-call
             NullPool, self
         )._create_connection()
+        if self._read_pragmas:
+            cursor = conn.dbapi_connection.cursor()
+            try:
+                for pragma in self._read_pragmas:
+                    cursor.execute(f"PRAGMA {pragma}")
+            finally:
+                cursor.close()
+        return conn
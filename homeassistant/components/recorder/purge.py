@@ -11,7 +11,14 @@ from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.expression import distinct
 
 from .const import MAX_ROWS_TO_PURGE
-from .models import Events, RecorderRuns, States, StatisticsRuns, StatisticsShortTerm
+from .models import (
+    Events,
+    RecorderRuns,
+    StateAttributes,
+    States,
+    StatisticsRuns,
+    StatisticsShortTerm,
+)
 from .repack import repack_database
 from .util import retryable_database_job, session_scope
 
@@ -55,7 +62,7 @@ def purge_old_data(
         if short_term_statistics:
             _purge_short_term_statistics(session, short_term_statistics)
 
-        if event_ids or statistics_runs or short_term_statistics:
+        if event_ids or state_ids or statistics_runs or short_term_statistics:
             # Return false, as we might not be done yet.
             _LOGGER.debug("Purging hasn't fully completed yet")
             return False
@@ -86,16 +93,27 @@ def _select_state_ids_to_purge(
     session: Session, purge_before: datetime, event_ids: list[int]
 ) -> set[int]:
     """Return a list of state ids to purge."""
-    if not event_ids:
-        return set()
-    states = (
-        session.query(States.state_id)
-        .filter(States.last_updated < purge_before)
-        .filter(States.event_id.in_(event_ids))
-        .all()
-    )
-    _LOGGER.debug("Selected %s state ids to remove", len(states))
-    return {state.state_id for state in states}
+    state_ids: set[int] = set()
+    if event_ids:
+        # Older states are linked to their state_changed event
+        state_ids.update(
+            state.state_id
+            for state in session.query(States.state_id)
+            .filter(States.last_updated < purge_before)
+            .filter(States.event_id.in_(event_ids))
+            .all()
+        )
+    if len(state_ids) < MAX_ROWS_TO_PURGE:
+        state_ids.update(
+            state.state_id
+            for state in session.query(States.state_id)
+            .filter(States.last_updated < purge_before)
+            .filter(States.event_id.is_(None))
+            .limit(MAX_ROWS_TO_PURGE - len(state_ids))
+            .all()
+        )
+    _LOGGER.debug("Selected %s state ids to remove", len(state_ids))
+    return state_ids
 
 
 def _select_statistics_runs_to_purge(
@@ -135,6 +153,13 @@ def _select_short_term_statistics_to_purge(
 
 def _purge_state_ids(instance: Recorder, session: Session, state_ids: set[int]) -> None:
     """Disconnect states and delete by state id."""
+    attributes_ids: set[int] = {
+        attributes_id
+        for (attributes_id,) in session.query(distinct(States.attributes_id))
+        .filter(States.state_id.in_(state_ids))
+        .filter(States.attributes_id.isnot(None))
+        .all()
+    }
 
     # Update old_state_id to NULL before deleting to ensure
     # the delete does not fail due to a foreign key constraint
@@ -157,6 +182,48 @@ def _purge_state_ids(instance: Recorder, session: Session, state_ids: set[int])
     # Evict eny entries in the old_states cache referring to a purged state
     _evict_purged_states_from_old_states_cache(instance, state_ids)
 
+    if attributes_ids:
+        _purge_unused_attributes_ids(instance, session, attributes_ids)
+
+
+def _purge_unused_attributes_ids(
+    instance: Recorder, session: Session, attributes_ids: set[int]
+) -> None:
+    """Delete the shared attributes no remaining state refers to."""
+    used_attributes_ids: set[int] = {
+        attributes_id
+        for (attributes_id,) in session.query(distinct(States.attributes_id))
+        .filter(States.attributes_id.in_(attributes_ids))
+        .all()
+    }
+    if not (unused_attributes_ids := attributes_ids - used_attributes_ids):
+        return
+
+    deleted_rows = (
+        session.query(StateAttributes)
+        .filter(StateAttributes.attributes_id.in_(unused_attributes_ids))
+        .delete(synchronize_session=False)
+    )
+    _LOGGER.debug("Deleted %s state attributes", deleted_rows)
+
+    # Evict any entries in the state attributes cache referring to a purged row
+    _evict_purged_attributes_from_attributes_cache(instance, unused_attributes_ids)
+
+
+def _evict_purged_attributes_from_attributes_cache(
+    instance: Recorder, purged_attributes_ids: set[int]
+) -> None:
+    """Evict purged attributes ids from the state attributes cache."""
+    state_attributes_ids = (
+        instance._state_attributes_ids  # pylint: disable=protected-access
+    )
+    for shared_attrs in [
+        shared_attrs
+        for shared_attrs, attributes_id in state_attributes_ids.items()
+        if attributes_id in purged_attributes_ids
+    ]:
+        del state_attributes_ids[shared_attrs]
+
 
 def _evict_purged_states_from_old_states_cache(
     instance: Recorder, purged_state_ids: set[int]
@@ -174,6 +241,15 @@ def _evict_purged_states_from_old_states_cache(
     for purged_state_id in purged_state_ids.intersection(old_state_reversed):
         old_states.pop(old_state_reversed[purged_state_id], None)
 
+    # Evict any purged state from the old state ids of the bulk inserts
+    old_state_ids = instance._old_state_ids  # pylint: disable=protected-access
+    for entity_id in [
+        entity_id
+        for entity_id, state_id in old_state_ids.items()
+        if state_id in purged_state_ids
+    ]:
+        del old_state_ids[entity_id]
+
 
 def _purge_statistics_runs(session: Session, statistics_runs: list[int]) -> None:
     """Delete by run_id."""
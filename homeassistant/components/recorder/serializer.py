@@ -0,0 +1,60 @@
+"""Encode the events waiting in the recorder queue ahead of the recorder."""
+from __future__ import annotations
+
+from contextlib import suppress
+import logging
+import queue
+import threading
+from typing import Any
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
+
+_LOGGER = logging.getLogger(__name__)
+
+# The number of states and events waiting to be encoded
+SERIALIZER_QUEUE_SIZE = 5000
+
+
+class EventSerializer(threading.Thread):
+    """Encode the new states and the event data in their own thread.
+
+    States keep the JSON of their attributes and events the JSON of their
+    data once encoded, so the recorder thread finds them ready to insert.
+    The recorder still encodes the ones the serializer has not reached
+    yet, or that were added while its queue was full, itself.
+    """
+
+    def __init__(self, max_size: int = SERIALIZER_QUEUE_SIZE) -> None:
+        """Initialize the serializer."""
+        super().__init__(name="Recorder serializer", daemon=True)
+        self.queue: Any = queue.Queue(max_size)
+
+    def add(self, event: Event) -> None:
+        """Queue the new state or the data of an event to be encoded."""
+        if event.event_type != EVENT_STATE_CHANGED:
+            item: Event | State = event
+        elif (state := event.data.get("new_state")) is not None:
+            item = state
+        else:
+            return
+        with suppress(queue.Full):
+            self.queue.put_nowait(item)
+
+    def stop(self) -> None:
+        """Stop encoding once the queued states and events are done."""
+        self.queue.put(None)
+
+    def run(self) -> None:
+        """Encode the queued states and events."""
+        while (item := self.queue.get()) is not None:
+            try:
+                if isinstance(item, State):
+                    item.attributes_json  # pylint: disable=pointless-statement
+                else:
+                    item.data_json  # pylint: disable=pointless-statement
+            except (TypeError, ValueError):
+                # The recorder logs the event when it fails to encode it again
+                pass
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error encoding %s", item)
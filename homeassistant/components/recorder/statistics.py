@@ -23,7 +23,7 @@ from homeassistant.const import (
     VOLUME_CUBIC_FEET,
     VOLUME_CUBIC_METERS,
 )
-from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.core import Event, HomeAssistant, State, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import entity_registry
 import homeassistant.util.dt as dt_util
@@ -32,6 +32,7 @@ import homeassistant.util.temperature as temperature_util
 from homeassistant.util.unit_system import UnitSystem
 import homeassistant.util.volume as volume_util
 
+from . import history
 from .const import DATA_INSTANCE, DOMAIN
 from .models import (
     StatisticData,
@@ -170,6 +171,138 @@ class ValidationIssue:
         return dataclasses.asdict(self)
 
 
+class StatisticsStates:
+    """Keep the recent states of the entities statistics are compiled for.
+
+    The recorder feeds the states from the state_changed events it processes,
+    which allows compiling the 5-minute statistics without reading the states
+    back from the database. An entity is tracked from the first time its
+    states are requested; periods which started earlier, for example before
+    a restart, are read from the database until the kept states cover them.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the statistics states."""
+        self._states: dict[str, list[State]] = {}
+        self._tracked_since: dict[str, datetime | None] = {}
+        self._requested: set[str] = set()
+
+    def add_event(self, event: Event) -> None:
+        """Keep the new state of a state_changed event for a tracked entity."""
+        entity_id = event.data["entity_id"]
+        if entity_id not in self._tracked_since:
+            return
+        if (new_state := event.data.get("new_state")) is None:
+            return
+        if (states := self._states.get(entity_id)) is None:
+            states = self._states[entity_id] = []
+            # The old state is the last state before the new one
+            if old_state := event.data.get("old_state"):
+                states.append(old_state)
+            self._tracked_since[entity_id] = (
+                states[0].last_updated if states else new_state.last_updated
+            )
+        states.append(new_state)
+
+    def states_during_period(
+        self,
+        start: datetime,
+        end: datetime,
+        entity_ids: list[str],
+        significant_changes_only: bool,
+    ) -> tuple[dict[str, list[State]], list[str]]:
+        """Return the states during a period and the entity_ids it does not cover.
+
+        Like the history, the states start with the last state before the period.
+        """
+        result: dict[str, list[State]] = {}
+        uncovered: list[str] = []
+        for entity_id in entity_ids:
+            self._requested.add(entity_id)
+            if entity_id not in self._tracked_since:
+                self._tracked_since[entity_id] = None
+            since = self._tracked_since[entity_id]
+            if since is None or start < since:
+                uncovered.append(entity_id)
+                continue
+
+            initial_state: State | None = None
+            period_states: list[State] = []
+            for state in self._states.get(entity_id, ()):
+                if state.last_updated < start:
+                    initial_state = state
+                elif state.last_updated >= end:
+                    break
+                elif (
+                    not significant_changes_only
+                    or state.last_changed == state.last_updated
+                ):
+                    period_states.append(state)
+            if initial_state is not None:
+                period_states.insert(0, initial_state)
+            if period_states:
+                result[entity_id] = period_states
+
+        return result, uncovered
+
+    def trim(self, before: datetime) -> None:
+        """Drop the states not needed for periods starting at or after before.
+
+        Entities which were not requested since the previous trim are no longer tracked.
+        """
+        for entity_id, since in list(self._tracked_since.items()):
+            if entity_id not in self._requested:
+                del self._tracked_since[entity_id]
+                self._states.pop(entity_id, None)
+                continue
+            if since is not None:
+                self._tracked_since[entity_id] = max(since, before)
+            if not (states := self._states.get(entity_id)):
+                continue
+            # Keep the last state before the period as its initial state
+            first_kept = 0
+            for idx, state in enumerate(states):
+                if state.last_updated >= before:
+                    break
+                first_kept = idx
+            del states[:first_kept]
+        self._requested = set()
+
+
+def get_states_for_statistics(
+    hass: HomeAssistant,
+    session: scoped_session,
+    start: datetime,
+    end: datetime,
+    entity_ids: list[str],
+    significant_changes_only: bool = True,
+) -> dict[str, list[State]]:
+    """Return the states to compile statistics for a period from.
+
+    The states kept in memory by the recorder are used where they cover the
+    period, the states of the other entities are read from the database.
+    """
+    if (instance := hass.data.get(DATA_INSTANCE)) is None:
+        states: dict[str, list[State]] = {}
+        uncovered = entity_ids
+    else:
+        states, uncovered = instance.statistics_states.states_during_period(
+            start, end, entity_ids, significant_changes_only
+        )
+    if uncovered:
+        states.update(
+            history.get_significant_states_with_session(  # type: ignore
+                hass,
+                session,
+                start - timedelta.resolution,
+                end,
+                entity_ids=uncovered,
+                significant_changes_only=significant_changes_only,
+            )
+        )
+    return states
+
+
 def async_setup(hass: HomeAssistant) -> None:
     """Set up the history hooks."""
     hass.data[STATISTICS_BAKERY] = baked.bakery()
@@ -427,6 +560,7 @@ def compile_statistics(instance: Recorder, start: datetime) -> bool:
 
         session.add(StatisticsRuns(start=start))
 
+    instance.statistics_states.trim(end)
     return True
 
 
@@ -94,6 +94,7 @@ def ws_info(
     instance: Recorder = hass.data[DATA_INSTANCE]
 
     backlog = instance.queue.qsize() if instance and instance.queue else None
+    serializer_backlog = instance.serializer.queue.qsize() if instance else None
     migration_in_progress = async_migration_in_progress(hass)
     recording = instance.recording if instance else False
     thread_alive = instance.is_alive() if instance else False
@@ -101,6 +102,7 @@ def ws_info(
     recorder_info = {
         "backlog": backlog,
         "max_backlog": MAX_QUEUE_BACKLOG,
+        "serializer_backlog": serializer_backlog,
         "migration_in_progress": migration_in_progress,
         "recording": recording,
         "thread_running": thread_alive,
@@ -12,7 +12,6 @@ from typing import Any
 from sqlalchemy.orm.session import Session
 
 from homeassistant.components.recorder import (
-    history,
     is_entity_recorded,
     statistics,
     util as recorder_util,
@@ -431,10 +430,10 @@ def _compile_statistics(  # noqa: C901
     ]
     history_list = {}
     if entities_full_history:
-        history_list = history.get_significant_states_with_session(  # type: ignore
+        history_list = statistics.get_states_for_statistics(
             hass,
             session,
-            start - datetime.timedelta.resolution,
+            start,
             end,
             entity_ids=entities_full_history,
             significant_changes_only=False,
@@ -445,10 +444,10 @@ def _compile_statistics(  # noqa: C901
         if "sum" not in wanted_statistics[i.entity_id]
     ]
     if entities_significant_history:
-        _history_list = history.get_significant_states_with_session(  # type: ignore
+        _history_list = statistics.get_states_for_statistics(
             hass,
             session,
-            start - datetime.timedelta.resolution,
+            start,
             end,
             entity_ids=entities_significant_history,
         )
@@ -5,7 +5,10 @@ from typing import Final, cast
 
 import voluptuous as vol
 
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.area_registry import EVENT_AREA_REGISTRY_UPDATED
+from homeassistant.helpers.device_registry import EVENT_DEVICE_REGISTRY_UPDATED
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.loader import bind_hass
 
@@ -67,4 +70,18 @@ async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
     """Initialize the websocket API."""
     hass.http.register_view(http.WebsocketAPIView())
     commands.async_register_commands(hass, async_register_command)
+
+    @callback
+    def count_registry_update(event: Event) -> None:
+        """Count the updates that invalidate the entity read permissions."""
+        hass.data[const.DATA_REGISTRY_UPDATES] = (
+            hass.data.get(const.DATA_REGISTRY_UPDATES, 0) + 1
+        )
+
+    for event_type in (
+        EVENT_AREA_REGISTRY_UPDATED,
+        EVENT_DEVICE_REGISTRY_UPDATED,
+        EVENT_ENTITY_REGISTRY_UPDATED,
+    ):
+        hass.bus.async_listen(event_type, count_registry_update)
     return True
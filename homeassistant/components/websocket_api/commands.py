@@ -12,7 +12,7 @@ from homeassistant.auth.permissions.const import CAT_ENTITIES, POLICY_READ
 from homeassistant.bootstrap import SIGNAL_BOOTSTRAP_INTEGRATONS
 from homeassistant.components.websocket_api.const import ERR_NOT_FOUND
 from homeassistant.const import EVENT_STATE_CHANGED, EVENT_TIME_CHANGED, MATCH_ALL
-from homeassistant.core import Context, Event, HomeAssistant, callback
+from homeassistant.core import Context, Event, HomeAssistant, State, callback
 from homeassistant.exceptions import (
     HomeAssistantError,
     ServiceNotFound,
@@ -24,6 +24,7 @@ from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.event import (
     TrackTemplate,
     TrackTemplateResult,
+    async_track_state_change_event,
     async_track_template_result,
 )
 from homeassistant.helpers.json import ExtendedJSONEncoder
@@ -53,8 +54,10 @@ def async_register_commands(
     async_reg(hass, handle_ping)
     async_reg(hass, handle_render_template)
     async_reg(hass, handle_subscribe_bootstrap_integrations)
+    async_reg(hass, handle_subscribe_entities)
     async_reg(hass, handle_subscribe_events)
     async_reg(hass, handle_subscribe_trigger)
+    async_reg(hass, handle_supported_features)
     async_reg(hass, handle_test_condition)
     async_reg(hass, handle_unsubscribe_events)
 
@@ -89,9 +92,7 @@ def handle_subscribe_events(
         @callback
         def forward_events(event: Event) -> None:
             """Forward state changed events to websocket."""
-            if not connection.user.permissions.check_entity(
-                event.data["entity_id"], POLICY_READ
-            ):
+            if not connection.can_read_entity(event.data["entity_id"]):
                 return
 
             connection.send_message(messages.cached_event_message(msg["id"], event))
@@ -113,6 +114,114 @@ def handle_subscribe_events(
     connection.send_message(messages.result_message(msg["id"]))
 
 
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "subscribe_entities",
+        vol.Optional("entity_ids"): cv.entity_ids,
+    }
+)
+def handle_subscribe_entities(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle subscribe entities command.
+
+    The compressed states are sent first, followed by only the fields that
+    changed. The changes made within one iteration of the event loop are
+    sent together.
+    """
+    entity_ids = msg.get("entity_ids")
+    # The state before the first change and the latest state of each entity
+    pending: dict[str, tuple[State | None, State | None]] = {}
+    send_handle: asyncio.Handle | None = None
+
+    @callback
+    def send_entity_changes() -> None:
+        """Send the changes of the entities since the last message."""
+        nonlocal send_handle
+        send_handle = None
+        added: dict[str, Any] = {}
+        changed: dict[str, Any] = {}
+        removed: list[str] = []
+        for entity_id, (old_state, new_state) in pending.items():
+            if new_state is None:
+                if old_state is not None:
+                    removed.append(entity_id)
+            elif old_state is None:
+                added[entity_id] = messages.compressed_state(new_state)
+            elif diff := messages.compressed_state_diff(old_state, new_state):
+                changed[entity_id] = diff
+        pending.clear()
+
+        entity_event: dict[str, Any] = {}
+        if added:
+            entity_event[messages.ENTITY_EVENT_ADD] = added
+        if changed:
+            entity_event[messages.ENTITY_EVENT_CHANGE] = changed
+        if removed:
+            entity_event[messages.ENTITY_EVENT_REMOVE] = removed
+        if entity_event:
+            connection.send_message(messages.event_message(msg["id"], entity_event))
+
+    @callback
+    def forward_entity_changes(event: Event) -> None:
+        """Queue the change of an entity to be sent to the websocket."""
+        nonlocal send_handle
+        entity_id = event.data["entity_id"]
+        if not connection.can_read_entity(entity_id):
+            return
+        if entity_id in pending:
+            pending[entity_id] = (pending[entity_id][0], event.data.get("new_state"))
+        else:
+            pending[entity_id] = (
+                event.data.get("old_state"),
+                event.data.get("new_state"),
+            )
+        if send_handle is None:
+            send_handle = hass.loop.call_soon(send_entity_changes)
+
+    if entity_ids is None:
+        unsub_state_changes = hass.bus.async_listen(
+            EVENT_STATE_CHANGED, forward_entity_changes
+        )
+        states = hass.states.async_all()
+    else:
+        unsub_state_changes = async_track_state_change_event(
+            hass, entity_ids, forward_entity_changes
+        )
+        states = [
+            state
+            for entity_id in entity_ids
+            if (state := hass.states.get(entity_id)) is not None
+        ]
+
+    @callback
+    def unsubscribe() -> None:
+        """Stop sending the changes of the entities."""
+        unsub_state_changes()
+        if send_handle is not None:
+            send_handle.cancel()
+
+    connection.subscriptions[msg["id"]] = unsubscribe
+    connection.send_message(messages.result_message(msg["id"]))
+
+    if not connection.user.permissions.access_all_entities(POLICY_READ):
+        states = [
+            state for state in states if connection.can_read_entity(state.entity_id)
+        ]
+    connection.send_message(
+        messages.event_message(
+            msg["id"],
+            {
+                messages.ENTITY_EVENT_ADD: {
+                    state.entity_id: messages.compressed_state(state)
+                    for state in states
+                }
+            },
+        )
+    )
+
+
 @callback
 @decorators.websocket_command(
     {
@@ -231,14 +340,21 @@ def handle_get_states(
     if connection.user.permissions.access_all_entities("read"):
         states = hass.states.async_all()
     else:
-        entity_perm = connection.user.permissions.check_entity
         states = [
             state
             for state in hass.states.async_all()
-            if entity_perm(state.entity_id, "read")
+            if connection.can_read_entity(state.entity_id)
         ]
 
-    connection.send_message(messages.result_message(msg["id"], states))
+    try:
+        states_json = ",".join(state.as_dict_json for state in states)
+    except (ValueError, TypeError):
+        connection.send_message(messages.result_message(msg["id"], states))
+        return
+
+    connection.send_message(
+        messages.construct_result_message(msg["id"], f"[{states_json}]")
+    )
 
 
 @decorators.websocket_command({vol.Required("type"): "get_services"})
@@ -314,6 +430,21 @@ def handle_ping(
     connection.send_message(pong_message(msg["id"]))
 
 
+@callback
+@decorators.websocket_command(
+    {
+        vol.Required("type"): "supported_features",
+        vol.Required("features"): {str: int},
+    }
+)
+def handle_supported_features(
+    hass: HomeAssistant, connection: ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Handle setting the features supported by the client."""
+    connection.supported_features = msg["features"]
+    connection.send_message(messages.result_message(msg["id"]))
+
+
 @decorators.websocket_command(
     {
         vol.Required("type"): "render_template",
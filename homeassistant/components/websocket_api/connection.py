@@ -8,6 +8,8 @@ from typing import TYPE_CHECKING, Any
 import voluptuous as vol
 
 from homeassistant.auth.models import RefreshToken, User
+from homeassistant.auth.permissions import AbstractPermissions
+from homeassistant.auth.permissions.const import POLICY_READ
 from homeassistant.core import Context, HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError, Unauthorized
 
@@ -36,11 +38,38 @@ class ActiveConnection:
         self.refresh_token_id = refresh_token.id
         self.subscriptions: dict[Hashable, Callable[[], Any]] = {}
         self.last_id = 0
+        self.supported_features: dict[str, float] = {}
+        self._entity_read_cache: dict[str, bool] = {}
+        self._entity_read_permissions: AbstractPermissions | None = None
+        self._entity_read_registry_updates = 0
 
     def context(self, msg: dict[str, Any]) -> Context:
         """Return a context."""
         return Context(user_id=self.user.id)
 
+    @callback
+    def can_read_entity(self, entity_id: str) -> bool:
+        """Return if the user can read an entity.
+
+        The result is remembered until the permissions of the user
+        or the entity, device or area registry change.
+        """
+        permissions = self.user.permissions
+        registry_updates = self.hass.data.get(const.DATA_REGISTRY_UPDATES, 0)
+        if (
+            permissions is not self._entity_read_permissions
+            or registry_updates != self._entity_read_registry_updates
+        ):
+            self._entity_read_cache = {}
+            self._entity_read_permissions = permissions
+            self._entity_read_registry_updates = registry_updates
+
+        if (can_read := self._entity_read_cache.get(entity_id)) is None:
+            can_read = self._entity_read_cache[entity_id] = permissions.check_entity(
+                entity_id, POLICY_READ
+            )
+        return can_read
+
     @callback
     def send_result(self, msg_id: int, result: Any | None = None) -> None:
         """Send a result message."""
@@ -3,12 +3,10 @@ from __future__ import annotations
 
 import asyncio
 from concurrent import futures
-from functools import partial
-import json
 from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Final
 
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers.json import JSONEncoder
+from homeassistant.helpers.json import json_dumps
 
 if TYPE_CHECKING:
     from .connection import ActiveConnection
@@ -40,6 +38,10 @@ ERR_TEMPLATE_ERROR: Final = "template_error"
 
 TYPE_RESULT: Final = "result"
 
+# The features a client can ask for with supported_features
+# Outgoing messages are sent as JSON arrays of the messages queued together
+FEATURE_COALESCE_MESSAGES: Final = "coalesce_messages"
+
 # Define the possible errors that occur when connections are cancelled.
 # Originally, this was just asyncio.CancelledError, but issue #9546 showed
 # that futures.CancelledErrors can also occur in some situations.
@@ -52,4 +54,8 @@ SIGNAL_WEBSOCKET_DISCONNECTED: Final = "websocket_disconnected"
 # Data used to store the current connection list
 DATA_CONNECTIONS: Final = f"{DOMAIN}.connections"
 
-JSON_DUMP: Final = partial(json.dumps, cls=JSONEncoder, allow_nan=False)
+# Data used to store how often the registries the entity permissions
+# depend on have been updated
+DATA_REGISTRY_UPDATES: Final = f"{DOMAIN}.registry_updates"
+
+JSON_DUMP: Final = json_dumps
@@ -1,13 +1,12 @@
 """Message templates for websocket commands."""
 from __future__ import annotations
 
-from functools import lru_cache
 import logging
 from typing import Any, Final
 
 import voluptuous as vol
 
-from homeassistant.core import Event
+from homeassistant.core import Context, Event, State
 from homeassistant.helpers import config_validation as cv
 from homeassistant.util.json import (
     find_paths_unserializable_data,
@@ -28,8 +27,21 @@ MINIMAL_MESSAGE_SCHEMA: Final = vol.Schema(
 # Base schema to extend by message handlers
 BASE_COMMAND_MESSAGE_SCHEMA: Final = vol.Schema({vol.Required("id"): cv.positive_int})
 
-IDEN_TEMPLATE: Final = "__IDEN__"
-IDEN_JSON_TEMPLATE: Final = '"__IDEN__"'
+# The keys of the entity events of subscribe_entities
+ENTITY_EVENT_ADD: Final = "a"
+ENTITY_EVENT_REMOVE: Final = "r"
+ENTITY_EVENT_CHANGE: Final = "c"
+
+# The keys of a compressed state
+COMPRESSED_STATE_STATE: Final = "s"
+COMPRESSED_STATE_ATTRIBUTES: Final = "a"
+COMPRESSED_STATE_CONTEXT: Final = "c"
+COMPRESSED_STATE_LAST_CHANGED: Final = "lc"
+COMPRESSED_STATE_LAST_UPDATED: Final = "lu"
+
+# The keys of a compressed state diff
+STATE_DIFF_ADDITIONS: Final = "+"
+STATE_DIFF_REMOVALS: Final = "-"
 
 
 def result_message(iden: int, result: Any = None) -> dict[str, Any]:
@@ -37,6 +49,11 @@ def result_message(iden: int, result: Any = None) -> dict[str, Any]:
     return {"id": iden, "type": const.TYPE_RESULT, "success": True, "result": result}
 
 
+def construct_result_message(iden: int, payload: str) -> str:
+    """Construct a success result message JSON from an already serialized result."""
+    return f'{{"id":{iden},"type":"result","success":true,"result":{payload}}}'
+
+
 def error_message(iden: int | None, code: str, message: str) -> dict[str, Any]:
     """Return an error result message."""
     return {
@@ -55,23 +72,79 @@ def event_message(iden: JSON_TYPE, event: Any) -> dict[str, Any]:
 def cached_event_message(iden: int, event: Event) -> str:
     """Return an event message.
 
-    Serialize to json once per message.
+    Serialize to json once per event.
 
     Since we can have many clients connected that are
     all getting many of the same events (mostly state changed)
     we can avoid serializing the same data for each connection.
+    The JSON is cached on the event itself so it is shared with
+    other consumers of the event.
     """
-    return _cached_event_message(event).replace(IDEN_JSON_TEMPLATE, str(iden), 1)
+    try:
+        return f'{{"id":{iden},"type":"event","event":{event.as_dict_json}}}'
+    except (ValueError, TypeError):
+        return message_to_json(event_message(iden, event))
+
+
+def compressed_state(state: State) -> dict[str, Any]:
+    """Return a state with short keys.
+
+    The last_updated time is left out when it is the last_changed time.
+    """
+    compressed = {
+        COMPRESSED_STATE_STATE: state.state,
+        COMPRESSED_STATE_ATTRIBUTES: dict(state.attributes),
+        COMPRESSED_STATE_CONTEXT: _compressed_context(state.context),
+        COMPRESSED_STATE_LAST_CHANGED: state.last_changed.timestamp(),
+    }
+    if state.last_updated != state.last_changed:
+        compressed[COMPRESSED_STATE_LAST_UPDATED] = state.last_updated.timestamp()
+    return compressed
 
 
-@lru_cache(maxsize=128)
-def _cached_event_message(event: Event) -> str:
-    """Cache and serialize the event to json.
+def compressed_state_diff(old_state: State, new_state: State) -> dict[str, Any]:
+    """Return the fields of a compressed state that changed.
 
-    The IDEN_TEMPLATE is used which will be replaced
-    with the actual iden in cached_event_message
+    Changed and added attributes are additions, removed attributes
+    are removals. An empty dict is returned when nothing changed.
     """
-    return message_to_json(event_message(IDEN_TEMPLATE, event))
+    additions: dict[str, Any] = {}
+    if new_state.state != old_state.state:
+        additions[COMPRESSED_STATE_STATE] = new_state.state
+    if new_state.last_changed != old_state.last_changed:
+        additions[COMPRESSED_STATE_LAST_CHANGED] = new_state.last_changed.timestamp()
+    if (
+        new_state.last_updated != old_state.last_updated
+        and new_state.last_updated != new_state.last_changed
+    ):
+        additions[COMPRESSED_STATE_LAST_UPDATED] = new_state.last_updated.timestamp()
+    if new_state.context.id != old_state.context.id:
+        additions[COMPRESSED_STATE_CONTEXT] = _compressed_context(new_state.context)
+
+    old_attributes = old_state.attributes
+    new_attributes = new_state.attributes
+    if changed_attributes := {
+        key: value
+        for key, value in new_attributes.items()
+        if key not in old_attributes or old_attributes[key] != value
+    }:
+        additions[COMPRESSED_STATE_ATTRIBUTES] = changed_attributes
+
+    diff: dict[str, Any] = {}
+    if additions:
+        diff[STATE_DIFF_ADDITIONS] = additions
+    if removed_attributes := [
+        key for key in old_attributes if key not in new_attributes
+    ]:
+        diff[STATE_DIFF_REMOVALS] = {COMPRESSED_STATE_ATTRIBUTES: removed_attributes}
+    return diff
+
+
+def _compressed_context(context: Context) -> str | dict[str, str | None]:
+    """Return the id of a context, or all of it when it has a user or parent."""
+    if context.user_id is None and context.parent_id is None:
+        return context.id
+    return context.as_dict()
 
 
 def message_to_json(message: dict[str, Any]) -> str:
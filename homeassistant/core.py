@@ -15,6 +15,7 @@ import logging
 import os
 import pathlib
 import re
+import sys
 import threading
 from time import monotonic
 from types import MappingProxyType
@@ -28,6 +29,7 @@ import yarl
 from homeassistant import async_timeout_backcompat, block_async_io, loader, util
 from homeassistant.const import (
     ATTR_DOMAIN,
+    ATTR_ENTITY_ID,
     ATTR_FRIENDLY_NAME,
     ATTR_NOW,
     ATTR_SECONDS,
@@ -60,6 +62,7 @@ from homeassistant.exceptions import (
     ServiceNotFound,
     Unauthorized,
 )
+from homeassistant.helpers.json import JSON_DUMP
 from homeassistant.util import location
 from homeassistant.util.async_ import (
     fire_coroutine_threadsafe,
@@ -113,6 +116,9 @@ TIMEOUT_EVENT_START = 15
 
 _LOGGER = logging.getLogger(__name__)
 
+# Shared by all states without attributes
+_EMPTY_ATTRIBUTES: MappingProxyType[str, Any] = MappingProxyType({})
+
 
 def split_entity_id(entity_id: str) -> list[str]:
     """Split a state entity ID into domain and object ID."""
@@ -603,7 +609,15 @@ class EventOrigin(enum.Enum):
 class Event:
     """Representation of an event within the bus."""
 
-    __slots__ = ["event_type", "data", "origin", "time_fired", "context"]
+    __slots__ = [
+        "event_type",
+        "data",
+        "origin",
+        "time_fired",
+        "context",
+        "_as_dict_json",
+        "_data_json",
+    ]
 
     def __init__(
         self,
@@ -619,6 +633,8 @@ class Event:
         self.origin = origin
         self.time_fired = time_fired or dt_util.utcnow()
         self.context: Context = context or Context()
+        self._as_dict_json: str | None = None
+        self._data_json: str | None = None
 
     def __hash__(self) -> int:
         """Make hashable."""
@@ -638,6 +654,43 @@ class Event:
             "context": self.context.as_dict(),
         }
 
+    @property
+    def data_json(self) -> str:
+        """Return the JSON representation of the event data.
+
+        Async friendly.
+        """
+        if self._data_json is None:
+            self._data_json = JSON_DUMP(self.data)
+        return self._data_json
+
+    @property
+    def as_dict_json(self) -> str:
+        """Return the JSON representation of this Event.
+
+        Serialized once and shared by every consumer of the event. The cached
+        JSON of State objects in the event data is spliced in as is.
+
+        Async friendly.
+        """
+        if self._as_dict_json is None:
+            self._as_dict_json = "".join(
+                (
+                    '{"event_type":',
+                    JSON_DUMP(self.event_type),
+                    ',"data":',
+                    _event_data_json(self.data),
+                    ',"origin":',
+                    JSON_DUMP(str(self.origin.value)),
+                    ',"time_fired":"',
+                    self.time_fired.isoformat(),
+                    '","context":',
+                    JSON_DUMP(self.context.as_dict()),
+                    "}",
+                )
+            )
+        return self._as_dict_json
+
     def __repr__(self) -> str:
         """Return the representation."""
         if self.data:
@@ -657,12 +710,35 @@ class Event:
         )
 
 
+def _event_data_json(data: Mapping[str, Any]) -> str:
+    """Serialize event data, reusing the cached JSON of State values."""
+    if not any(isinstance(value, State) for value in data.values()):
+        return JSON_DUMP(data)
+    return "{%s}" % ",".join(
+        f"{JSON_DUMP(str(key))}:"
+        f"{value.as_dict_json if isinstance(value, State) else JSON_DUMP(value)}"
+        for key, value in data.items()
+    )
+
+
+def _run_callback_job_events(job: HassJob, events: list[Event]) -> None:
+    """Run a callback job for each event of a batch."""
+    for event in events:
+        try:
+            job.target(event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error running job %s for %s", job, event)
+
+
 class EventBus:
     """Allow the firing of and listening for events."""
 
     def __init__(self, hass: HomeAssistant) -> None:
         """Initialize a new event bus."""
         self._listeners: dict[str, list[tuple[HassJob, Callable | None]]] = {}
+        self._keyed_listeners: dict[
+            str, dict[str, list[tuple[HassJob, Callable | None]]]
+        ] = {}
         self._hass = hass
 
     @callback
@@ -671,7 +747,17 @@ class EventBus:
 
         This method must be run in the event loop.
         """
-        return {key: len(listeners) for key, listeners in self._listeners.items()}
+        listeners = {key: len(listeners) for key, listeners in self._listeners.items()}
+        for event_type, keyed_listeners in self._keyed_listeners.items():
+            # A listener registered for several keys is counted once
+            listeners[event_type] = listeners.get(event_type, 0) + len(
+                {
+                    filterable_job
+                    for key_listeners in keyed_listeners.values()
+                    for filterable_job in key_listeners
+                }
+            )
+        return listeners
 
     @property
     def listeners(self) -> dict[str, int]:
@@ -708,12 +794,7 @@ class EventBus:
                 event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
             )
 
-        listeners = self._listeners.get(event_type, [])
-
-        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
-        match_all_listeners = self._listeners.get(MATCH_ALL)
-        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
-            listeners = match_all_listeners + listeners
+        listeners = self._async_event_listeners(event_type, event_data)
 
         event = Event(event_type, event_data, origin, time_fired, context)
 
@@ -733,6 +814,94 @@ class EventBus:
                     continue
             self._hass.async_add_hass_job(job, event)
 
+    @callback
+    def async_fire_many(
+        self,
+        event_type: str,
+        events_data: Iterable[dict[str, Any]],
+        origin: EventOrigin = EventOrigin.local,
+        context: Context | None = None,
+        time_fired: datetime.datetime | None = None,
+    ) -> None:
+        """Fire several events of the same type in one pass.
+
+        Every listener receives the events it matches in order, but callback
+        listeners are scheduled once for the whole batch instead of once per
+        event.
+
+        This method must be run in the event loop.
+        """
+        if len(event_type) > MAX_LENGTH_EVENT_EVENT_TYPE:
+            raise MaxLengthExceeded(
+                event_type, "event_type", MAX_LENGTH_EVENT_EVENT_TYPE
+            )
+
+        listener_events: dict[tuple[HassJob, Callable | None], list[Event]] = {}
+
+        for event_data in events_data:
+            listeners = self._async_event_listeners(event_type, event_data)
+
+            event = Event(event_type, event_data, origin, time_fired, context)
+
+            if event_type != EVENT_TIME_CHANGED:
+                _LOGGER.debug("Bus:Handling %s", event)
+
+            for filterable_job in listeners:
+                if (event_filter := filterable_job[1]) is not None:
+                    try:
+                        if not event_filter(event):
+                            continue
+                    except Exception:  # pylint: disable=broad-except
+                        _LOGGER.exception("Error in event filter")
+                        continue
+                listener_events.setdefault(filterable_job, []).append(event)
+
+        for (job, _), events in listener_events.items():
+            if job.job_type == HassJobType.Callback and len(events) > 1:
+                self._hass.loop.call_soon(_run_callback_job_events, job, events)
+                continue
+            for event in events:
+                self._hass.async_add_hass_job(job, event)
+
+    @callback
+    def _async_event_listeners(
+        self, event_type: str, event_data: dict[str, Any] | None
+    ) -> list[tuple[HassJob, Callable | None]]:
+        """Return the listeners that should receive an event.
+
+        This method must be run in the event loop.
+        """
+        listeners = self._listeners.get(event_type, [])
+
+        # Keyed listeners are routed by the entity_id in the event data
+        # so the cost does not grow with the number of keyed listeners.
+        if (
+            event_data is not None
+            and (keyed_listeners := self._keyed_listeners.get(event_type)) is not None
+            and isinstance(entity_id := event_data.get(ATTR_ENTITY_ID), str)
+        ):
+            matched_listeners: list[tuple[HassJob, Callable | None]] | None = None
+            for key in (entity_id, split_entity_id(entity_id)[0], MATCH_ALL):
+                if (key_listeners := keyed_listeners.get(key)) is None:
+                    continue
+                if matched_listeners is None:
+                    matched_listeners = key_listeners
+                else:
+                    # A listener registered for both an entity_id
+                    # and its domain runs once for the event
+                    matched_listeners = list(
+                        dict.fromkeys(matched_listeners + key_listeners)
+                    )
+            if matched_listeners is not None:
+                listeners = listeners + matched_listeners
+
+        # EVENT_HOMEASSISTANT_CLOSE should go only to his listeners
+        match_all_listeners = self._listeners.get(MATCH_ALL)
+        if match_all_listeners is not None and event_type != EVENT_HOMEASSISTANT_CLOSE:
+            listeners = match_all_listeners + listeners
+
+        return listeners
+
     def listen(self, event_type: str, listener: Callable) -> CALLBACK_TYPE:
         """Listen for all events or events of a specific type.
 
@@ -785,6 +954,49 @@ class EventBus:
 
         return remove_listener
 
+    @callback
+    def async_listen_keyed(
+        self,
+        event_type: str,
+        keys: str | Iterable[str],
+        listener: Callable,
+        event_filter: Callable | None = None,
+    ) -> CALLBACK_TYPE:
+        """Listen for events of a specific type for entity ids or domains.
+
+        Keys are matched against the entity_id in the event data. A key can
+        be an entity_id, a domain or ``MATCH_ALL`` to match any entity_id.
+        Events without an entity_id are never routed to keyed listeners.
+        A listener registered for overlapping keys, like an entity_id and
+        its domain, runs once for each event matching them.
+
+        An optional event_filter, which must be a callable decorated with
+        @callback that returns a boolean value, determines if the
+        listener callable should run.
+
+        This method must be run in the event loop.
+        """
+        if event_type == MATCH_ALL:
+            raise HomeAssistantError("Keyed listeners require a specific event type")
+        if event_filter is not None and not is_callback(event_filter):
+            raise HomeAssistantError(f"Event filter {event_filter} is not a callback")
+
+        if isinstance(keys, str):
+            keys = [keys.lower()]
+        else:
+            keys = list(dict.fromkeys(key.lower() for key in keys))
+
+        filterable_job = (HassJob(listener), event_filter)
+        keyed_listeners = self._keyed_listeners.setdefault(event_type, {})
+        for key in keys:
+            keyed_listeners.setdefault(key, []).append(filterable_job)
+
+        def remove_listener() -> None:
+            """Remove the listener."""
+            self._async_remove_keyed_listener(event_type, keys, filterable_job)
+
+        return remove_listener
+
     def listen_once(
         self, event_type: str, listener: Callable[[Event], None]
     ) -> CALLBACK_TYPE:
@@ -863,6 +1075,36 @@ class EventBus:
                 "Unable to remove unknown job listener %s", filterable_job
             )
 
+    @callback
+    def _async_remove_keyed_listener(
+        self,
+        event_type: str,
+        keys: Iterable[str],
+        filterable_job: tuple[HassJob, Callable | None],
+    ) -> None:
+        """Remove a keyed listener of a specific event_type.
+
+        This method must be run in the event loop.
+        """
+        try:
+            keyed_listeners = self._keyed_listeners[event_type]
+
+            for key in keys:
+                keyed_listeners[key].remove(filterable_job)
+
+                # delete key list if empty
+                if not keyed_listeners[key]:
+                    keyed_listeners.pop(key)
+
+            if not keyed_listeners:
+                self._keyed_listeners.pop(event_type)
+        except (KeyError, ValueError):
+            # KeyError is key event_type or key listener did not exist
+            # ValueError if listener did not exist within key
+            _LOGGER.exception(
+                "Unable to remove unknown keyed job listener %s", filterable_job
+            )
+
 
 class State:
     """Object to represent a state within the state machine.
@@ -885,8 +1127,9 @@ class State:
         "last_updated",
         "context",
         "domain",
-        "object_id",
         "_as_dict",
+        "_as_dict_json",
+        "_attributes_json",
     ]
 
     def __init__(
@@ -916,12 +1159,25 @@ class State:
 
         self.entity_id = entity_id.lower()
         self.state = state
-        self.attributes = MappingProxyType(attributes or {})
+        if isinstance(attributes, MappingProxyType):
+            self.attributes = attributes
+        elif attributes:
+            self.attributes = MappingProxyType(attributes)
+        else:
+            self.attributes = _EMPTY_ATTRIBUTES
         self.last_updated = last_updated or dt_util.utcnow()
         self.last_changed = last_changed or self.last_updated
         self.context = context or Context()
-        self.domain, self.object_id = split_entity_id(self.entity_id)
+        # All states of a domain share the same domain string
+        self.domain = sys.intern(split_entity_id(self.entity_id)[0])
         self._as_dict: dict[str, Collection[Any]] | None = None
+        self._as_dict_json: str | None = None
+        self._attributes_json: str | None = None
+
+    @property
+    def object_id(self) -> str:
+        """Object id of this state."""
+        return split_entity_id(self.entity_id)[1]
 
     @property
     def name(self) -> str:
@@ -954,6 +1210,28 @@ class State:
             }
         return self._as_dict
 
+    @property
+    def attributes_json(self) -> str:
+        """Return the JSON representation of the attributes.
+
+        Async friendly.
+        """
+        if self._attributes_json is None:
+            self._attributes_json = JSON_DUMP(dict(self.attributes))
+        return self._attributes_json
+
+    @property
+    def as_dict_json(self) -> str:
+        """Return the JSON representation of the State.
+
+        Serialized once and shared by every consumer of the state.
+
+        Async friendly.
+        """
+        if self._as_dict_json is None:
+            self._as_dict_json = JSON_DUMP(self.as_dict())
+        return self._as_dict_json
+
     @classmethod
     def from_dict(cls, json_dict: dict) -> Any:
         """Initialize a state from a dict.
@@ -1013,6 +1291,7 @@ class StateMachine:
     def __init__(self, bus: EventBus, loop: asyncio.events.AbstractEventLoop) -> None:
         """Initialize state machine."""
         self._states: dict[str, State] = {}
+        self._domain_index: dict[str, dict[str, State]] = {}
         self._reservations: set[str] = set()
         self._bus = bus
         self._loop = loop
@@ -1036,12 +1315,12 @@ class StateMachine:
             return list(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return list(self._domain_index.get(domain_filter.lower(), ()))
 
         return [
-            state.entity_id
-            for state in self._states.values()
-            if state.domain in domain_filter
+            entity_id
+            for domain in dict.fromkeys(domain_filter)
+            for entity_id in self._domain_index.get(domain, ())
         ]
 
     @callback
@@ -1056,10 +1335,11 @@ class StateMachine:
             return len(self._states)
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            return len(self._domain_index.get(domain_filter.lower(), ()))
 
-        return len(
-            [None for state in self._states.values() if state.domain in domain_filter]
+        return sum(
+            len(self._domain_index.get(domain, ()))
+            for domain in dict.fromkeys(domain_filter)
         )
 
     def all(self, domain_filter: str | Iterable | None = None) -> list[State]:
@@ -1078,10 +1358,14 @@ class StateMachine:
             return list(self._states.values())
 
         if isinstance(domain_filter, str):
-            domain_filter = (domain_filter.lower(),)
+            if (states := self._domain_index.get(domain_filter.lower())) is None:
+                return []
+            return list(states.values())
 
         return [
-            state for state in self._states.values() if state.domain in domain_filter
+            state
+            for domain in dict.fromkeys(domain_filter)
+            for state in self._domain_index.get(domain, {}).values()
         ]
 
     def get(self, entity_id: str) -> State | None:
@@ -1125,6 +1409,11 @@ class StateMachine:
         if old_state is None:
             return False
 
+        domain_states = self._domain_index[old_state.domain]
+        del domain_states[entity_id]
+        if not domain_states:
+            del self._domain_index[old_state.domain]
+
         self._bus.async_fire(
             EVENT_STATE_CHANGED,
             {"entity_id": entity_id, "old_state": old_state, "new_state": None},
@@ -1200,26 +1489,111 @@ class StateMachine:
         This method must be run in the event loop.
         """
         entity_id = entity_id.lower()
+        old_state = self._states.get(entity_id)
+        state = self._async_build_state(
+            entity_id, old_state, new_state, attributes, force_update, context
+        )
+        if state is None:
+            return
+
+        self._states[entity_id] = state
+        self._domain_index.setdefault(state.domain, {})[entity_id] = state
+        self._bus.async_fire(
+            EVENT_STATE_CHANGED,
+            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
+            EventOrigin.local,
+            state.context,
+            time_fired=state.last_updated,
+        )
+
+    @callback
+    def async_set_many(
+        self,
+        states: Iterable[tuple[str, str, Mapping[str, Any] | None]],
+        force_update: bool = False,
+        context: Context | None = None,
+    ) -> None:
+        """Set the state of multiple entities, add entities that do not exist.
+
+        States is an iterable of (entity_id, new_state, attributes) tuples.
+
+        All new states are validated before any of them is stored, they share
+        the same context and last updated time and their state changed events
+        are fired as one batch on the bus.
+
+        This method must be run in the event loop.
+        """
+        if context is None:
+            context = Context()
+
+        now = dt_util.utcnow()
+        new_states: dict[str, State] = {}
+        changes: list[dict[str, Any]] = []
+
+        for entity_id, new_state, attributes in states:
+            entity_id = entity_id.lower()
+            if (old_state := new_states.get(entity_id)) is None:
+                old_state = self._states.get(entity_id)
+            state = self._async_build_state(
+                entity_id, old_state, new_state, attributes, force_update, context, now
+            )
+            if state is None:
+                continue
+            new_states[entity_id] = state
+            changes.append(
+                {"entity_id": entity_id, "old_state": old_state, "new_state": state}
+            )
+
+        if not changes:
+            return
+
+        for entity_id, state in new_states.items():
+            self._states[entity_id] = state
+            self._domain_index.setdefault(state.domain, {})[entity_id] = state
+
+        self._bus.async_fire_many(
+            EVENT_STATE_CHANGED, changes, EventOrigin.local, context, time_fired=now
+        )
+
+    @staticmethod
+    def _async_build_state(
+        entity_id: str,
+        old_state: State | None,
+        new_state: str,
+        attributes: Mapping[str, Any] | None,
+        force_update: bool,
+        context: Context | None,
+        now: datetime.datetime | None = None,
+    ) -> State | None:
+        """Build the new state of an entity or None if nothing changed."""
         new_state = str(new_state)
         attributes = attributes or {}
-        if (old_state := self._states.get(entity_id)) is None:
+        if old_state is None:
             same_state = False
             same_attr = False
             last_changed = None
         else:
             same_state = old_state.state == new_state and not force_update
-            same_attr = old_state.attributes == MappingProxyType(attributes)
+            same_attr = (
+                attributes is old_state.attributes
+                or old_state.attributes == MappingProxyType(attributes)
+            )
             last_changed = old_state.last_changed if same_state else None
+            # Unchanged attributes are shared with the old state so consumers
+            # can compare attributes of consecutive states by identity.
+            if same_attr:
+                attributes = old_state.attributes
 
         if same_state and same_attr:
-            return
+            return None
 
         if context is None:
             context = Context()
 
-        now = dt_util.utcnow()
+        if now is None:
+            now = dt_util.utcnow()
 
-        state = State(
+        return State(
             entity_id,
             new_state,
             attributes,
@@ -1228,14 +1602,6 @@ class StateMachine:
             context,
             old_state is None,
         )
-        self._states[entity_id] = state
-        self._bus.async_fire(
-            EVENT_STATE_CHANGED,
-            {"entity_id": entity_id, "old_state": old_state, "new_state": state},
-            EventOrigin.local,
-            context,
-            time_fired=now,
-        )
 
 
 class Service:
@@ -30,7 +30,6 @@ from homeassistant.core import (
     HomeAssistant,
     State,
     callback,
-    split_entity_id,
 )
 from homeassistant.exceptions import TemplateError
 from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
@@ -240,53 +239,27 @@ def async_track_state_change_event(
 
     In order to avoid having to iterate a long list
     of EVENT_STATE_CHANGED and fire and create a job
-    for each one, we keep a dict of entity ids that
-    care about the state change events so we can
-    do a fast dict lookup to route events.
+    for each one, we register a keyed listener on the
+    bus for each entity id so the bus can do a fast
+    dict lookup to route events.
     """
     if not (entity_ids := _async_string_to_lower_list(entity_ids)):
         return _remove_empty_listener
 
-    entity_callbacks = hass.data.setdefault(TRACK_STATE_CHANGE_CALLBACKS, {})
-
-    if TRACK_STATE_CHANGE_LISTENER not in hass.data:
-
-        @callback
-        def _async_state_change_filter(event: Event) -> bool:
-            """Filter state changes by entity_id."""
-            return event.data.get("entity_id") in entity_callbacks
-
-        @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            entity_id = event.data.get("entity_id")
-
-            if entity_id not in entity_callbacks:
-                return
-
-            for job in entity_callbacks[entity_id][:]:
-                try:
-                    hass.async_run_hass_job(job, event)
-                except Exception:  # pylint: disable=broad-except
-                    _LOGGER.exception(
-                        "Error while processing state change for %s", entity_id
-                    )
-
-        hass.data[TRACK_STATE_CHANGE_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED,
-            _async_state_change_dispatcher,
-            event_filter=_async_state_change_filter,
-        )
-
     job = HassJob(action)
 
-    for entity_id in entity_ids:
-        entity_callbacks.setdefault(entity_id, []).append(job)
+    _async_add_keyed_listeners(
+        hass,
+        TRACK_STATE_CHANGE_CALLBACKS,
+        TRACK_STATE_CHANGE_LISTENER,
+        entity_ids,
+        job,
+    )
 
     @callback
     def remove_listener() -> None:
         """Remove state change listener."""
-        _async_remove_indexed_listeners(
+        _async_remove_keyed_listeners(
             hass,
             TRACK_STATE_CHANGE_CALLBACKS,
             TRACK_STATE_CHANGE_LISTENER,
@@ -323,6 +296,68 @@ def _async_remove_indexed_listeners(
         del hass.data[listener_key]
 
 
+@callback
+def _async_dispatch_keyed_event(
+    hass: HomeAssistant, callbacks: dict[str, list[HassJob]], key: str, event: Event
+) -> None:
+    """Dispatch a state change event routed by the bus to the jobs for key."""
+    if (jobs := callbacks.get(key)) is None:
+        return
+
+    for job in jobs[:]:
+        try:
+            hass.async_run_hass_job(job, event)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Error while processing state change for %s", key)
+
+
+@callback
+def _async_add_keyed_listeners(
+    hass: HomeAssistant,
+    data_key: str,
+    listener_key: str,
+    storage_keys: Iterable[str],
+    job: HassJob,
+    event_filter: Callable[[Event], bool] | None = None,
+) -> None:
+    """Add a job for storage keys routed by keyed state change listeners.
+
+    Each storage key gets a single keyed listener on the bus that fans
+    out to all jobs registered for that key.
+    """
+    callbacks = hass.data.setdefault(data_key, {})
+    listeners = hass.data.setdefault(listener_key, {})
+
+    for storage_key in storage_keys:
+        if storage_key not in callbacks:
+            listeners[storage_key] = hass.bus.async_listen_keyed(
+                EVENT_STATE_CHANGED,
+                storage_key,
+                ft.partial(_async_dispatch_keyed_event, hass, callbacks, storage_key),
+                event_filter=event_filter,
+            )
+        callbacks.setdefault(storage_key, []).append(job)
+
+
+@callback
+def _async_remove_keyed_listeners(
+    hass: HomeAssistant,
+    data_key: str,
+    listener_key: str,
+    storage_keys: Iterable[str],
+    job: HassJob,
+) -> None:
+    """Remove a job added with _async_add_keyed_listeners."""
+    callbacks = hass.data[data_key]
+    listeners = hass.data[listener_key]
+
+    for storage_key in storage_keys:
+        callbacks[storage_key].remove(job)
+        if len(callbacks[storage_key]) == 0:
+            del callbacks[storage_key]
+            listeners.pop(storage_key)()
+
+
 @bind_hass
 def async_track_entity_registry_updated_event(
     hass: HomeAssistant,
@@ -389,23 +424,15 @@ def async_track_entity_registry_updated_event(
 
 
 @callback
-def _async_dispatch_domain_event(
-    hass: HomeAssistant, event: Event, callbacks: dict[str, list[HassJob]]
-) -> None:
-    domain = split_entity_id(event.data["entity_id"])[0]
+def _async_state_added_filter(event: Event) -> bool:
+    """Filter state changes for entities being added."""
+    return event.data.get("old_state") is None
 
-    if domain not in callbacks and MATCH_ALL not in callbacks:
-        return
-
-    listeners = callbacks.get(domain, []) + callbacks.get(MATCH_ALL, [])
 
-    for job in listeners:
-        try:
-            hass.async_run_hass_job(job, event)
-        except Exception:  # pylint: disable=broad-except
-            _LOGGER.exception(
-                "Error while processing event %s for domain %s", event, domain
-            )
+@callback
+def _async_state_removed_filter(event: Event) -> bool:
+    """Filter state changes for entities being removed."""
+    return event.data.get("new_state") is None
 
 
 @bind_hass
@@ -418,38 +445,21 @@ def async_track_state_added_domain(
     if not (domains := _async_string_to_lower_list(domains)):
         return _remove_empty_listener
 
-    domain_callbacks = hass.data.setdefault(TRACK_STATE_ADDED_DOMAIN_CALLBACKS, {})
-
-    if TRACK_STATE_ADDED_DOMAIN_LISTENER not in hass.data:
-
-        @callback
-        def _async_state_change_filter(event: Event) -> bool:
-            """Filter state changes by entity_id."""
-            return event.data.get("old_state") is None
-
-        @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            if event.data.get("old_state") is not None:
-                return
-
-            _async_dispatch_domain_event(hass, event, domain_callbacks)
-
-        hass.data[TRACK_STATE_ADDED_DOMAIN_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED,
-            _async_state_change_dispatcher,
-            event_filter=_async_state_change_filter,
-        )
-
     job = HassJob(action)
 
-    for domain in domains:
-        domain_callbacks.setdefault(domain, []).append(job)
+    _async_add_keyed_listeners(
+        hass,
+        TRACK_STATE_ADDED_DOMAIN_CALLBACKS,
+        TRACK_STATE_ADDED_DOMAIN_LISTENER,
+        domains,
+        job,
+        _async_state_added_filter,
+    )
 
     @callback
     def remove_listener() -> None:
         """Remove state change listener."""
-        _async_remove_indexed_listeners(
+        _async_remove_keyed_listeners(
             hass,
             TRACK_STATE_ADDED_DOMAIN_CALLBACKS,
             TRACK_STATE_ADDED_DOMAIN_LISTENER,
@@ -470,38 +480,21 @@ def async_track_state_removed_domain(
     if not (domains := _async_string_to_lower_list(domains)):
         return _remove_empty_listener
 
-    domain_callbacks = hass.data.setdefault(TRACK_STATE_REMOVED_DOMAIN_CALLBACKS, {})
-
-    if TRACK_STATE_REMOVED_DOMAIN_LISTENER not in hass.data:
-
-        @callback
-        def _async_state_change_filter(event: Event) -> bool:
-            """Filter state changes by entity_id."""
-            return event.data.get("new_state") is None
-
-        @callback
-        def _async_state_change_dispatcher(event: Event) -> None:
-            """Dispatch state changes by entity_id."""
-            if event.data.get("new_state") is not None:
-                return
-
-            _async_dispatch_domain_event(hass, event, domain_callbacks)
-
-        hass.data[TRACK_STATE_REMOVED_DOMAIN_LISTENER] = hass.bus.async_listen(
-            EVENT_STATE_CHANGED,
-            _async_state_change_dispatcher,
-            event_filter=_async_state_change_filter,
-        )
-
     job = HassJob(action)
 
-    for domain in domains:
-        domain_callbacks.setdefault(domain, []).append(job)
+    _async_add_keyed_listeners(
+        hass,
+        TRACK_STATE_REMOVED_DOMAIN_CALLBACKS,
+        TRACK_STATE_REMOVED_DOMAIN_LISTENER,
+        domains,
+        job,
+        _async_state_removed_filter,
+    )
 
     @callback
     def remove_listener() -> None:
         """Remove state change listener."""
-        _async_remove_indexed_listeners(
+        _async_remove_keyed_listeners(
             hass,
             TRACK_STATE_REMOVED_DOMAIN_CALLBACKS,
             TRACK_STATE_REMOVED_DOMAIN_LISTENER,
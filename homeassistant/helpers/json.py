@@ -1,7 +1,10 @@
 """Helpers to help with encoding Home Assistant objects in JSON."""
 import datetime
 import json
-from typing import Any
+import math
+from typing import Any, Final
+
+import orjson
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -40,3 +43,60 @@ class ExtendedJSONEncoder(JSONEncoder):
             return super().default(o)
         except TypeError:
             return {"__type": str(type(o)), "repr": repr(o)}
+
+
+def json_encoder_default(obj: Any) -> Any:
+    """Convert Home Assistant objects for orjson.
+
+    orjson handles datetime natively. Raise TypeError for everything
+    else so the caller can fall back to the stdlib encoder.
+    """
+    if isinstance(obj, set):
+        return list(obj)
+    if hasattr(obj, "as_dict"):
+        return obj.as_dict()
+    raise TypeError
+
+
+def _raise_on_non_finite_floats(obj: Any) -> None:
+    """Raise ValueError if obj contains NaN or infinity."""
+    if isinstance(obj, float):
+        if not math.isfinite(obj):
+            raise ValueError("Out of range float values are not JSON compliant")
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            _raise_on_non_finite_floats(value)
+    elif isinstance(obj, (list, tuple, set)):
+        for value in obj:
+            _raise_on_non_finite_floats(value)
+    elif hasattr(obj, "as_dict"):
+        _raise_on_non_finite_floats(obj.as_dict())
+
+
+def json_bytes(obj: Any) -> bytes:
+    """Serialize to compact JSON bytes.
+
+    orjson is used for speed. Types it does not support, like integers
+    larger than 64 bit, are handed to the stdlib encoder. NaN and
+    infinity raise ValueError, like the stdlib encoder with allow_nan=False.
+    """
+    try:
+        data = orjson.dumps(
+            obj, option=orjson.OPT_NON_STR_KEYS, default=json_encoder_default
+        )
+    except TypeError:
+        return json.dumps(
+            obj, cls=JSONEncoder, allow_nan=False, separators=(",", ":")
+        ).encode("utf-8")
+    # orjson serializes NaN and infinity as null
+    if b"null" in data:
+        _raise_on_non_finite_floats(obj)
+    return data
+
+
+def json_dumps(obj: Any) -> str:
+    """Serialize to a compact JSON string."""
+    return json_bytes(obj).decode("utf-8")
+
+
+JSON_DUMP: Final = json_dumps
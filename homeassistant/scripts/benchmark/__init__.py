@@ -6,10 +6,13 @@ import asyncio
 import collections
 from collections.abc import Callable
 from contextlib import suppress
-from datetime import datetime
+from datetime import datetime, timedelta
+from functools import partial
 import json
 import logging
+import tempfile
 from timeit import default_timer as timer
+import tracemalloc
 from typing import TypeVar
 
 from homeassistant import core
@@ -253,6 +256,100 @@ async def state_changed_event_filter_helper(hass):
     return timer() - start
 
 
+@benchmark
+async def state_changed_filtered_listeners(hass):
+    """Run 10k state changed events through 10k filtered bus listeners."""
+    return await _state_changed_listeners(hass, False)
+
+
+@benchmark
+async def state_changed_keyed_listeners(hass):
+    """Run 10k state changed events through 10k keyed bus listeners."""
+    return await _state_changed_listeners(hass, True)
+
+
+async def _state_changed_listeners(hass, keyed):
+    count = 0
+    entity_id = "light.kitchen"
+    listeners = 10 ** 4
+    events_to_fire = 10 ** 4
+
+    @core.callback
+    def listener(_):
+        """Handle event."""
+        nonlocal count
+        count += 1
+
+    for idx in range(listeners):
+        listen_entity_id = f"{entity_id}{idx}"
+
+        if keyed:
+            hass.bus.async_listen_keyed(EVENT_STATE_CHANGED, listen_entity_id, listener)
+            continue
+
+        @core.callback
+        def event_filter(event, listen_entity_id=listen_entity_id):
+            """Filter event."""
+            return event.data["entity_id"] == listen_entity_id
+
+        hass.bus.async_listen(EVENT_STATE_CHANGED, listener, event_filter=event_filter)
+
+    event_data = {
+        "entity_id": f"{entity_id}0",
+        "old_state": core.State(entity_id, "off"),
+        "new_state": core.State(entity_id, "on"),
+    }
+
+    start = timer()
+
+    for _ in range(events_to_fire):
+        hass.bus.async_fire(EVENT_STATE_CHANGED, event_data)
+
+    await hass.async_block_till_done()
+
+    assert count == events_to_fire
+
+    return timer() - start
+
+
+@benchmark
+async def state_machine_memory(hass):
+    """Report state machine memory use per entity with 10k updated entities.
+
+    Only the current code is measured, run it on two revisions to compare.
+    """
+    entities = 10 ** 4
+    updates = 10
+
+    def attributes(idx):
+        """Return attributes that do not change between updates."""
+        return {
+            "friendly_name": f"Temperature {idx}",
+            "unit_of_measurement": "°C",
+            "device_class": "temperature",
+            "icon": "mdi:thermometer",
+            "supported_features": 0,
+        }
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = timer()
+
+    for update in range(updates):
+        for idx in range(entities):
+            hass.states.async_set(f"sensor.temperature_{idx}", update, attributes(idx))
+
+    await hass.async_block_till_done()
+
+    runtime = timer() - start
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+
+    print(f"State machine uses {used // entities} bytes per entity")
+
+    return runtime
+
+
 @benchmark
 async def logbook_filtering_state(hass):
     """Filter state changes."""
@@ -391,6 +488,193 @@ async def json_serialize_states(hass):
     return timer() - start
 
 
+@benchmark
+async def json_serialize_10k_states(hass):
+    """Serialize 10k states like get_states does."""
+    return _json_serialize_states(
+        lambda states: ",".join(state.as_dict_json for state in states)
+    )
+
+
+@benchmark
+async def json_serialize_10k_states_stdlib(hass):
+    """Serialize 10k states with the stdlib encoder."""
+    return _json_serialize_states(partial(json.dumps, cls=JSONEncoder))
+
+
+def _json_serialize_states(dump):
+    """Serialize 10k states with the given dump function."""
+    states = [
+        core.State(
+            f"sensor.power_{idx}",
+            str(idx),
+            {
+                "unit_of_measurement": "W",
+                "device_class": "power",
+                "state_class": "measurement",
+                "friendly_name": f"Power {idx}",
+            },
+        )
+        for idx in range(10 ** 4)
+    ]
+
+    start = timer()
+    dump(states)
+    return timer() - start
+
+
+@benchmark
+async def json_serialize_history(hass):
+    """Serialize the history of 50 sensors with 2k states each."""
+    return _json_serialize_history(compressed_state_format=False)
+
+
+@benchmark
+async def json_serialize_history_compressed(hass):
+    """Serialize the history of 50 sensors with 2k states each, compressed."""
+    return _json_serialize_history(compressed_state_format=True)
+
+
+def _json_serialize_history(compressed_state_format):
+    """Convert history rows to a history response and serialize it."""
+    # pylint: disable=import-outside-toplevel,protected-access
+    from homeassistant.components.recorder import history
+
+    row = collections.namedtuple(
+        "Row",
+        [
+            "domain",
+            "entity_id",
+            "state",
+            "attributes",
+            "attributes_id",
+            "shared_attrs",
+            "last_changed",
+            "last_updated",
+        ],
+    )
+    start_time = dt_util.utcnow() - timedelta(days=30)
+    rows = []
+    for sensor in range(50):
+        attributes = JSON_DUMP(
+            {
+                "unit_of_measurement": "W",
+                "device_class": "power",
+                "state_class": "measurement",
+                "friendly_name": f"Power {sensor}",
+            }
+        )
+        for idx in range(2000):
+            last_changed = start_time + timedelta(minutes=20 * idx)
+            rows.append(
+                row(
+                    "sensor",
+                    f"sensor.power_{sensor}",
+                    str(idx),
+                    attributes,
+                    None,
+                    None,
+                    last_changed,
+                    last_changed,
+                )
+            )
+
+    start = timer()
+    result = history._sorted_states_to_dict(
+        hass=None,
+        session=None,
+        states=rows,
+        start_time=start_time,
+        entity_ids=None,
+        include_start_time_state=False,
+        compressed_state_format=compressed_state_format,
+    )
+    if not compressed_state_format:
+        result = list(result.values())
+    size = len(JSON_DUMP(result))
+    runtime = timer() - start
+    print(f"Serialized {len(rows)} states in {size} bytes")
+    return runtime
+
+
+@benchmark
+async def recorder_insert_10k_states(hass):
+    """Record 10k state changes with the ORM event session."""
+    return await _recorder_insert_states(hass, bulk_insert=False)
+
+
+@benchmark
+async def recorder_bulk_insert_10k_states(hass):
+    """Record 10k state changes with executemany bulk inserts."""
+    return await _recorder_insert_states(hass, bulk_insert=True)
+
+
+async def _recorder_insert_states(hass, bulk_insert):
+    """Record 10k state changes in a sqlite database."""
+    # pylint: disable=import-outside-toplevel,protected-access
+    from homeassistant.components import recorder
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        instance = recorder.Recorder(
+            hass,
+            auto_purge=False,
+            keep_days=1,
+            commit_interval=1,
+            uri=f"sqlite:///{tmpdir}/benchmark.db",
+            db_max_retries=1,
+            db_retry_wait=0,
+            entity_filter=lambda entity_id: True,
+            exclude_t=[],
+            bulk_insert=bulk_insert,
+        )
+        return await hass.async_add_executor_job(_record_state_changes, instance)
+
+
+def _record_state_changes(instance):
+    """Record state changes, committing 300 at a time."""
+    # pylint: disable=protected-access
+    instance._setup_connection()
+    instance._setup_run()
+
+    events = []
+    old_states = {}
+    for idx in range(10 ** 4):
+        entity_id = f"sensor.power_{idx % 100}"
+        new_state = core.State(
+            entity_id,
+            str(idx),
+            {
+                "unit_of_measurement": "W",
+                "device_class": "power",
+                "state_class": "measurement",
+                "friendly_name": f"Power {idx % 100}",
+            },
+        )
+        events.append(
+            core.Event(
+                EVENT_STATE_CHANGED,
+                {
+                    "entity_id": entity_id,
+                    "old_state": old_states.get(entity_id),
+                    "new_state": new_state,
+                },
+            )
+        )
+        old_states[entity_id] = new_state
+
+    start = timer()
+    for idx, event in enumerate(events, 1):
+        instance._process_one_event(event)
+        if idx % 300 == 0:
+            instance._commit_event_session_or_retry()
+    instance._commit_event_session_or_retry()
+    runtime = timer() - start
+
+    instance._close_event_session()
+    instance._close_connection()
+    return runtime
+
+
 def _create_state_changed_event_from_old_new(
     entity_id, event_time_fired, old_state, new_state
 ):
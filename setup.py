@@ -48,6 +48,7 @@ REQUIRES = [
     "PyJWT==2.1.0",
     # PyJWT has loose dependency. We want the latest one.
     "cryptography==35.0.0",
+    "orjson==3.8.3",
     "pip>=8.0.3,<20.3",
     "python-slugify==4.0.1",
     "pyyaml==6.0",
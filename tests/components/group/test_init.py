@@ -439,7 +439,7 @@ async def test_reloading_groups(hass):
         "group.second_group",
         "group.test_group",
     ]
-    assert hass.bus.async_listeners()["state_changed"] == 1
+    assert hass.bus.async_listeners()["state_changed"] == 5
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["hello.world"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["light.bowl"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.one"]) == 1
@@ -458,7 +458,7 @@ async def test_reloading_groups(hass):
         "group.all_tests",
         "group.hello",
     ]
-    assert hass.bus.async_listeners()["state_changed"] == 1
+    assert hass.bus.async_listeners()["state_changed"] == 3
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["light.bowl"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.one"]) == 1
     assert len(hass.data[TRACK_STATE_CHANGE_CALLBACKS]["test.two"]) == 1
@@ -1062,3 +1062,326 @@ async def test_list_statistic_ids(hass, hass_ws_client, units, attributes, unit)
     response = await client.receive_json()
     assert response["success"]
     assert response["result"] == []
+
+
+async def test_history_stream(hass, hass_ws_client):
+    """Test the history stream sends the history and then the state changes."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("sensor.test", "1")
+    hass.states.async_set("sensor.test", "2")
+    hass.states.async_set("sensor.other", "1")
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/stream",
+            "start_time": start_time.isoformat(),
+            "entity_ids": ["sensor.test"],
+            "minimal_response": True,
+        }
+    )
+    response = await client.receive_json()
+    assert response["id"] == 1
+    assert response["success"]
+
+    response = await client.receive_json()
+    assert response["type"] == "event"
+    states = response["event"]["states"]
+    assert list(states) == ["sensor.test"]
+    assert [state["state"] for state in states["sensor.test"]] == ["1", "2"]
+
+    hass.states.async_set("sensor.test", "2", {"attr": "changed"})
+    hass.states.async_set("sensor.other", "2")
+    hass.states.async_set("sensor.test", "3")
+    await hass.async_block_till_done()
+
+    response = await client.receive_json()
+    last_changed = hass.states.get("sensor.test").last_changed
+    assert response["event"]["states"] == {
+        "sensor.test": [{"state": "3", "last_changed": last_changed.isoformat()}]
+    }
+
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    response = await client.receive_json()
+    assert response["id"] == 2
+    assert response["success"]
+
+    hass.states.async_set("sensor.test", "4")
+    await hass.async_block_till_done()
+    await client.send_json({"id": 3, "type": "ping"})
+    response = await client.receive_json()
+    assert response["type"] == "pong"
+
+
+async def test_history_stream_significant_attribute_changes(hass, hass_ws_client):
+    """Test attribute changes are only sent for the significant domains."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/stream",
+            "start_time": dt_util.utcnow().isoformat(),
+            "entity_ids": ["climate.test", "light.test"],
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    response = await client.receive_json()
+    assert response["event"]["states"] == {}
+
+    hass.states.async_set("light.test", "on", {"brightness": 1})
+    hass.states.async_set("light.test", "on", {"brightness": 2})
+    hass.states.async_set("climate.test", "heat", {"temperature": 20})
+    hass.states.async_set("climate.test", "heat", {"temperature": 21})
+    await hass.async_block_till_done()
+
+    sent = []
+    for _ in range(3):
+        response = await client.receive_json()
+        for entity_id, states in response["event"]["states"].items():
+            sent.extend((entity_id, state["attributes"]) for state in states)
+    assert sent == [
+        ("light.test", {"brightness": 1}),
+        ("climate.test", {"temperature": 20}),
+        ("climate.test", {"temperature": 21}),
+    ]
+
+
+async def test_fetch_period_api_with_compressed_state_format(hass, hass_client):
+    """Test the fetch period view for history with the compressed state format."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    hass.states.async_set("light.kitchen", "on", {"brightness": 1})
+    hass.states.async_set("light.kitchen", "on", {"brightness": 2})
+    hass.states.async_set("light.kitchen", "off", {"brightness": 2})
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(
+        f"/api/history/period/{dt_util.utcnow() - timedelta(minutes=1)}",
+        params={
+            "filter_entity_id": "light.kitchen",
+            "significant_changes_only": "0",
+            "compressed_state_format": "",
+        },
+    )
+    assert response.status == HTTPStatus.OK
+    response_json = await response.json()
+    assert list(response_json) == ["light.kitchen"]
+    states = response_json["light.kitchen"]
+    assert states["s"] == ["on", "on", "off"]
+    assert len(states["lu"]) == 3
+    assert states["lu"] == sorted(states["lu"])
+    assert states["a"] == [[0, {"brightness": 1}], [1, {"brightness": 2}]]
+
+    response = await client.get(
+        f"/api/history/period/{dt_util.utcnow() + timedelta(days=1)}",
+        params={"compressed_state_format": ""},
+    )
+    assert response.status == HTTPStatus.OK
+    assert await response.json() == {}
+
+
+async def test_history_stream_compressed_state_format(hass, hass_ws_client):
+    """Test the history stream with the compressed state format."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("sensor.test", "1", {"unit_of_measurement": "W"})
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "history/stream",
+            "start_time": start_time.isoformat(),
+            "entity_ids": ["sensor.test"],
+            "compressed_state_format": True,
+        }
+    )
+    response = await client.receive_json()
+    assert response["success"]
+    response = await client.receive_json()
+    states = response["event"]["states"]["sensor.test"]
+    assert states["s"] == ["1"]
+    assert states["a"] == [[0, {"unit_of_measurement": "W"}]]
+
+    hass.states.async_set("sensor.test", "2", {"unit_of_measurement": "W"})
+    hass.states.async_set("sensor.test", "3", {"unit_of_measurement": "kW"})
+    await hass.async_block_till_done()
+
+    response = await client.receive_json()
+    last_updated = hass.states.get("sensor.test").last_updated
+    assert response["event"]["states"]["sensor.test"]["s"] == ["2"]
+    assert response["event"]["states"]["sensor.test"]["a"] == []
+    response = await client.receive_json()
+    assert response["event"]["states"] == {
+        "sensor.test": {
+            "s": ["3"],
+            "lu": [last_updated.timestamp()],
+            "a": [[0, {"unit_of_measurement": "kW"}]],
+        }
+    }
+
+
+async def test_fetch_period_api_with_max_points(hass, hass_client):
+    """Test the fetch period view for history downsampled to max_points."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    start_time = dt_util.utcnow()
+    for value in ("1", "5", "2", "4"):
+        hass.states.async_set("sensor.power", value)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    response = await client.get(
+        f"/api/history/period/{start_time.isoformat()}",
+        params={"filter_entity_id": "sensor.power", "max_points": "2"},
+    )
+    assert response.status == HTTPStatus.OK
+    response_json = await response.json()
+    assert [state["state"] for state in response_json[0]] == ["1", "5", "4"]
+
+    for max_points in ("0", "many"):
+        response = await client.get(
+            f"/api/history/period/{start_time.isoformat()}",
+            params={"max_points": max_points},
+        )
+        assert response.status == HTTPStatus.BAD_REQUEST
+
+
+async def test_fetch_period_api_reuses_cached_history(hass, hass_client):
+    """Test the fetch period view only fetches the states after the cached ones."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    start_time = dt_util.utcnow()
+    end_time = start_time + timedelta(hours=1)
+
+    async def async_record_states(states):
+        for entity_id, state in states:
+            hass.states.async_set(entity_id, state, {"unit": "W"})
+        await hass.async_block_till_done()
+        await hass.async_add_executor_job(trigger_db_commit, hass)
+        await hass.async_block_till_done()
+        await hass.async_add_executor_job(instance.block_till_done)
+
+    async def async_fetch_history():
+        response = await client.get(
+            f"/api/history/period/{start_time.isoformat()}",
+            params={
+                "filter_entity_id": "sensor.power,light.kitchen",
+                "end_time": end_time.isoformat(),
+                "minimal_response": "",
+            },
+        )
+        assert response.status == HTTPStatus.OK
+        return await response.json()
+
+    def expected_history():
+        states = get_significant_states(
+            hass,
+            start_time,
+            end_time,
+            ["sensor.power", "light.kitchen"],
+            minimal_response=True,
+        )
+        return json.loads(json.dumps(list(states.values()), cls=JSONEncoder))
+
+    client = await hass_client()
+    await async_record_states([("sensor.power", "1"), ("sensor.power", "2")])
+    assert await async_fetch_history() == await hass.async_add_executor_job(
+        expected_history
+    )
+
+    await async_record_states(
+        [("sensor.power", "2"), ("light.kitchen", "on"), ("sensor.power", "3")]
+    )
+    response_json = await async_fetch_history()
+    assert response_json == await hass.async_add_executor_job(expected_history)
+    assert [state["state"] for state in response_json[0]] == ["1", "2", "3"]
+    assert [state["state"] for state in response_json[1]] == ["on"]
+
+    history_cache = hass.data[history.DATA_HISTORY_CACHE]
+    assert (history_cache.hits, history_cache.misses) == (1, 1)
+    assert len(history_cache) == 1
+
+    # The cached states are dropped once the recorder purged rows
+    await hass.services.async_call(
+        recorder.DOMAIN, recorder.SERVICE_PURGE, {"keep_days": 5}, blocking=True
+    )
+    await hass.async_add_executor_job(instance.block_till_done)
+    assert await async_fetch_history() == response_json
+    assert (history_cache.hits, history_cache.misses) == (1, 2)
+    assert len(history_cache) == 1
+
+    # The states of a query with more than max_rows states are not cached
+    history_cache.max_rows = 2
+    await hass.services.async_call(
+        recorder.DOMAIN, recorder.SERVICE_PURGE, {"keep_days": 5}, blocking=True
+    )
+    await hass.async_add_executor_job(instance.block_till_done)
+    assert await async_fetch_history() == response_json
+    assert (history_cache.hits, history_cache.misses) == (1, 3)
+    assert len(history_cache) == 0
+
+
+async def test_fetch_period_api_caches_compressed_history_by_rows(hass, hass_client):
+    """Test the compressed states are counted by their states when cached."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "history", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    start_time = dt_util.utcnow()
+    for state in ("1", "2", "3", "4"):
+        hass.states.async_set("sensor.power", state)
+    await hass.async_block_till_done()
+    end_time = dt_util.utcnow()
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    async def async_fetch_history():
+        response = await client.get(
+            f"/api/history/period/{start_time.isoformat()}",
+            params={
+                "filter_entity_id": "sensor.power",
+                "end_time": end_time.isoformat(),
+                "significant_changes_only": "0",
+                "compressed_state_format": "",
+            },
+        )
+        assert response.status == HTTPStatus.OK
+        return await response.json()
+
+    client = await hass_client()
+    history_cache = hass.data[history.DATA_HISTORY_CACHE]
+    # The compressed states of an entity are a dict of three lists
+    history_cache.max_rows = 3
+    response_json = await async_fetch_history()
+    assert response_json["sensor.power"]["s"] == ["1", "2", "3", "4"]
+    assert len(history_cache) == 0
+
+    history_cache.max_rows = 4
+    assert await async_fetch_history() == response_json
+    assert len(history_cache) == 1
+    assert await async_fetch_history() == response_json
+    assert (history_cache.hits, history_cache.misses) == (1, 2)
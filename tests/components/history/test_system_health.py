@@ -0,0 +1,18 @@
+"""Tests for history system health."""
+from homeassistant.components import history
+from homeassistant.setup import async_setup_component
+
+from tests.common import get_system_health_info, init_recorder_component
+
+
+async def test_system_health_info(hass):
+    """Test system health info endpoint."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    assert await async_setup_component(hass, "history", {})
+    assert await async_setup_component(hass, "system_health", {})
+    history_cache = hass.data[history.DATA_HISTORY_CACHE]
+    history_cache.hits = 3
+    history_cache.misses = 1
+
+    info = await get_system_health_info(hass, "history")
+    assert info == {"cache_hits": 3, "cache_misses": 1, "cached_queries": 0}
@@ -4,9 +4,11 @@ import collections
 from datetime import datetime, timedelta
 from http import HTTPStatus
 import json
-from unittest.mock import Mock, patch
+from unittest.mock import ANY, Mock, patch
 
+from aiohttp import ClientPayloadError
 import pytest
+from sqlalchemy.exc import OperationalError
 import voluptuous as vol
 
 from homeassistant.components import logbook, recorder
@@ -288,6 +290,7 @@ def create_state_changed_event_from_old_new(
             "entity_id"
             "domain"
             "attributes"
+            "shared_attrs"
             "state_id",
             "old_state_id",
         ],
@@ -296,6 +299,7 @@ def create_state_changed_event_from_old_new(
     row.event_type = EVENT_STATE_CHANGED
     row.event_data = "{}"
     row.attributes = attributes_json
+    row.shared_attrs = None
     row.time_fired = event_time_fired
     row.state = new_state and new_state.get("state")
     row.entity_id = entity_id
@@ -402,6 +406,336 @@ async def test_logbook_view_period_entity(hass, hass_client):
     assert response_json[0]["entity_id"] == entity_id_test
 
 
+async def test_logbook_view_streams_batches(hass, hass_client):
+    """Test the logbook view encodes the entries in batches."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    for idx in range(5):
+        hass.states.async_set("switch.test", STATE_ON if idx % 2 else STATE_OFF)
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_client()
+    start = dt_util.utcnow().date()
+    start_date = datetime(start.year, start.month, start.day)
+
+    with patch.object(logbook, "STREAM_BATCH_SIZE", 2):
+        response = await client.get(f"/api/logbook/{start_date.isoformat()}")
+        assert response.status == HTTPStatus.OK
+        response_json = await response.json()
+        assert [entry["state"] for entry in response_json] == [
+            STATE_ON,
+            STATE_OFF,
+            STATE_ON,
+            STATE_OFF,
+        ]
+
+        tomorrow = start_date + timedelta(days=1)
+        response = await client.get(f"/api/logbook/{tomorrow.isoformat()}")
+        assert response.status == HTTPStatus.OK
+        assert await response.json() == []
+
+
+async def test_logbook_view_query_fails(hass, hass_client):
+    """Test the logbook view answers with an error status when the query fails."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    def _stream_events(*args):
+        raise OperationalError("select the events", {}, Exception("forced to fail"))
+        yield  # pylint: disable=unreachable
+
+    client = await hass_client()
+    with patch.object(logbook, "_stream_events", _stream_events):
+        response = await client.get("/api/logbook")
+    assert response.status == HTTPStatus.INTERNAL_SERVER_ERROR
+
+
+async def test_logbook_view_query_fails_while_streaming(hass, hass_client):
+    """Test the logbook view response is cut short when the query fails later on."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    def _stream_events(*args):
+        yield {"name": "test", "state": STATE_ON}
+        raise OperationalError("select the events", {}, Exception("forced to fail"))
+
+    client = await hass_client()
+    with patch.object(logbook, "STREAM_BATCH_SIZE", 1), patch.object(
+        logbook, "_stream_events", _stream_events
+    ):
+        response = await client.get("/api/logbook")
+        assert response.status == HTTPStatus.OK
+        with pytest.raises(ClientPayloadError):
+            await response.read()
+
+
+async def test_logbook_get_events_websocket(hass, hass_ws_client):
+    """Test the logbook entries are sent in batches over the websocket."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("switch.test", STATE_OFF)
+    for idx in range(6):
+        hass.states.async_set("switch.test", STATE_OFF if idx % 2 else STATE_ON)
+    hass.states.async_set("switch.second", STATE_OFF)
+    hass.states.async_set("switch.second", STATE_ON)
+    await hass.async_add_executor_job(trigger_db_commit, hass)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    client = await hass_ws_client()
+    with patch.object(logbook, "STREAM_BATCH_SIZE", 4):
+        await client.send_json(
+            {
+                "id": 1,
+                "type": "logbook/get_events",
+                "start_time": start_time.isoformat(),
+                "entity_ids": ["switch.test"],
+            }
+        )
+        batches = []
+        while (response := await client.receive_json())["type"] == "event":
+            assert response["id"] == 1
+            batches.append(response["event"]["events"])
+    assert response["id"] == 1
+    assert response["success"]
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert {entry["entity_id"] for batch in batches for entry in batch} == {
+        "switch.test"
+    }
+
+    await client.send_json(
+        {
+            "id": 2,
+            "type": "logbook/get_events",
+            "start_time": "not a date",
+        }
+    )
+    response = await client.receive_json()
+    assert not response["success"]
+    assert response["error"]["code"] == "invalid_start_time"
+
+
+async def test_logbook_event_stream_websocket(hass, hass_ws_client):
+    """Test the logbook event stream sends the history and then live entries."""
+    await hass.async_add_executor_job(init_recorder_component, hass)
+    await async_setup_component(hass, "logbook", {})
+    await hass.async_add_executor_job(hass.data[recorder.DATA_INSTANCE].block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("switch.test", STATE_OFF)
+    hass.states.async_set("switch.test", STATE_ON)
+    hass.states.async_set("switch.second", STATE_OFF)
+    hass.states.async_set("switch.second", STATE_ON)
+    await hass.async_block_till_done()
+
+    client = await hass_ws_client()
+    await client.send_json(
+        {
+            "id": 1,
+            "type": "logbook/event_stream",
+            "start_time": start_time.isoformat(),
+            "entity_ids": ["switch.test"],
+        }
+    )
+    response = await client.receive_json()
+    assert response["id"] == 1
+    assert response["success"]
+
+    response = await client.receive_json()
+    assert response["type"] == "event"
+    assert [
+        (entry["entity_id"], entry["state"]) for entry in response["event"]["events"]
+    ] == [("switch.test", STATE_ON)]
+
+    hass.states.async_set("switch.second", STATE_OFF)
+    hass.states.async_set("switch.test", STATE_ON, {"brightness": 10})
+    hass.states.async_set("switch.test", STATE_OFF)
+    hass.bus.async_fire(
+        logbook.EVENT_LOGBOOK_ENTRY,
+        {logbook.ATTR_NAME: "Alarm", logbook.ATTR_MESSAGE: "is triggered"},
+    )
+    logbook.async_log_entry(hass, "Switch", "was toggled", entity_id="switch.test")
+    await hass.async_block_till_done()
+
+    response = await client.receive_json()
+    assert response["event"]["events"] == [
+        {
+            "when": ANY,
+            "name": "test",
+            "state": STATE_OFF,
+            "entity_id": "switch.test",
+        }
+    ]
+    response = await client.receive_json()
+    assert response["event"]["events"] == [
+        {
+            "when": ANY,
+            "name": "Switch",
+            "message": "was toggled",
+            "domain": "switch",
+            "entity_id": "switch.test",
+        }
+    ]
+
+    await client.send_json({"id": 2, "type": "unsubscribe_events", "subscription": 1})
+    response = await client.receive_json()
+    assert response["id"] == 2
+    assert response["success"]
+
+    hass.states.async_set("switch.test", STATE_ON)
+    await hass.async_block_till_done()
+    await client.send_json({"id": 3, "type": "ping"})
+    response = await client.receive_json()
+    assert response["type"] == "pong"
+
+
+async def test_logbook_event_stream_uncommitted_events(hass, hass_ws_client):
+    """Test the logbook event stream sends the events the recorder did not commit."""
+    await hass.async_add_executor_job(
+        init_recorder_component, hass, {recorder.CONF_COMMIT_INTERVAL: 3600}
+    )
+    await async_setup_component(hass, "logbook", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("switch.test", STATE_OFF)
+    hass.states.async_set("switch.test", STATE_ON)
+    hass.states.async_set("switch.second", STATE_OFF)
+    hass.states.async_set("switch.second", STATE_ON)
+    await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+    _, uncommitted_events = instance.async_uncommitted_events()
+    assert [
+        event.data["entity_id"]
+        for event in uncommitted_events
+        if event.event_type == EVENT_STATE_CHANGED
+    ] == ["switch.test", "switch.test", "switch.second", "switch.second"]
+
+    client = await hass_ws_client()
+    with patch.object(instance, "async_commit") as async_commit:
+        for msg_id in (1, 2):
+            await client.send_json(
+                {
+                    "id": msg_id,
+                    "type": "logbook/event_stream",
+                    "start_time": start_time.isoformat(),
+                    "entity_ids": ["switch.test"],
+                }
+            )
+            response = await client.receive_json()
+            assert response["success"]
+            response = await client.receive_json()
+            assert [
+                (entry["entity_id"], entry["state"])
+                for entry in response["event"]["events"]
+            ] == [("switch.test", STATE_ON)]
+            if msg_id == 1:
+                state_changed_listeners = hass.bus.async_listeners()[
+                    EVENT_STATE_CHANGED
+                ]
+    assert not async_commit.called
+    # The subscriptions for entity_ids share the state_changed listener
+    assert hass.bus.async_listeners()[EVENT_STATE_CHANGED] == state_changed_listeners
+
+
+async def test_logbook_event_stream_event_fired_before_subscribing(
+    hass, hass_ws_client
+):
+    """Test the event stream sends an event fired right before subscribing once."""
+    await hass.async_add_executor_job(
+        init_recorder_component, hass, {recorder.CONF_COMMIT_INTERVAL: 3600}
+    )
+    await async_setup_component(hass, "logbook", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    start_time = dt_util.utcnow()
+    hass.states.async_set("switch.test", STATE_ON)
+    await hass.async_block_till_done()
+
+    track_state_change_event = logbook.async_track_state_change_event
+
+    def _fire_and_track(*args):
+        # The recorder callback for this event is still waiting on the loop
+        hass.states.async_set("switch.test", STATE_OFF)
+        return track_state_change_event(*args)
+
+    client = await hass_ws_client()
+    with patch.object(instance, "async_commit") as async_commit, patch(
+        "homeassistant.components.logbook.async_track_state_change_event",
+        _fire_and_track,
+    ):
+        await client.send_json(
+            {
+                "id": 1,
+                "type": "logbook/event_stream",
+                "start_time": start_time.isoformat(),
+                "entity_ids": ["switch.test"],
+            }
+        )
+        response = await client.receive_json()
+        assert response["success"]
+        response = await client.receive_json()
+        assert [
+            (entry["entity_id"], entry["state"])
+            for entry in response["event"]["events"]
+        ] == [("switch.test", STATE_OFF)]
+        await client.send_json({"id": 2, "type": "ping"})
+        response = await client.receive_json()
+        assert response["type"] == "pong"
+    assert not async_commit.called
+
+
+async def test_logbook_event_stream_uncommitted_events_dropped(hass, hass_ws_client):
+    """Test the event stream waits for a commit once the recorder dropped events."""
+    await hass.async_add_executor_job(
+        init_recorder_component, hass, {recorder.CONF_COMMIT_INTERVAL: 3600}
+    )
+    await async_setup_component(hass, "logbook", {})
+    instance = hass.data[recorder.DATA_INSTANCE]
+    await hass.async_add_executor_job(instance.block_till_done)
+
+    start_time = dt_util.utcnow()
+    with patch.object(recorder, "UNCOMMITTED_EVENTS_MAX_SIZE", 2):
+        hass.states.async_set("switch.test", STATE_OFF)
+        hass.states.async_set("switch.test", STATE_ON)
+        hass.states.async_set("switch.second", STATE_ON)
+        await hass.async_block_till_done()
+    await hass.async_add_executor_job(instance.block_till_done)
+    assert instance.async_uncommitted_events() is None
+
+    client = await hass_ws_client()
+    with patch.object(
+        instance, "async_commit", wraps=instance.async_commit
+    ) as async_commit:
+        await client.send_json(
+            {
+                "id": 1,
+                "type": "logbook/event_stream",
+                "start_time": start_time.isoformat(),
+                "entity_ids": ["switch.test"],
+            }
+        )
+        response = await client.receive_json()
+        assert response["success"]
+        response = await client.receive_json()
+        assert [
+            (entry["entity_id"], entry["state"])
+            for entry in response["event"]["events"]
+        ] == [("switch.test", STATE_ON)]
+    assert async_commit.called
+
+
 async def test_logbook_describe_event(hass, hass_client):
     """Test teaching logbook about a new event."""
     await hass.async_add_executor_job(init_recorder_component, hass)
@@ -0,0 +1,122 @@
+"""The tests for the recorder bulk inserts."""
+# pylint: disable=protected-access
+from datetime import timedelta
+from unittest.mock import patch
+
+from homeassistant.components.recorder import CONF_BULK_INSERT
+from homeassistant.components.recorder.models import (
+    Events,
+    StateAttributes,
+    States,
+)
+from homeassistant.components.recorder.purge import purge_old_data
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Context, HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from .common import async_wait_recording_done
+from .conftest import SetupRecorderInstanceT
+
+
+async def test_bulk_insert_states_and_events(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states and events are written by the bulk inserter."""
+    instance = await async_setup_recorder_instance(hass, {CONF_BULK_INSERT: True})
+    assert instance._bulk_inserter is not None
+
+    attributes = {"test_attr": 5, "test_attr_10": "nice"}
+    context = Context(user_id="abc")
+
+    hass.states.async_set("test.recorder", "on", attributes, context=context)
+    hass.states.async_set("test.recorder", "off", attributes)
+    hass.states.async_set("test.other", "on", {"test_attr": 6})
+    hass.bus.async_fire("custom_event", {"some_data": 15})
+    await async_wait_recording_done(hass, instance)
+
+    hass.states.async_set("test.recorder", "on", attributes)
+    hass.states.async_remove("test.other")
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert [(db_state.entity_id, db_state.state) for db_state in db_states] == [
+            ("test.recorder", "on"),
+            ("test.recorder", "off"),
+            ("test.other", "on"),
+            ("test.recorder", "on"),
+            ("test.other", None),
+        ]
+        assert db_states[0].old_state_id is None
+        assert db_states[1].old_state_id == db_states[0].state_id
+        assert db_states[2].old_state_id is None
+        assert db_states[3].old_state_id == db_states[1].state_id
+        assert db_states[4].old_state_id == db_states[2].state_id
+        assert "test.other" not in instance._old_state_ids
+
+        assert db_states[3].to_native().attributes == attributes
+        assert db_states[0].attributes_id == db_states[3].attributes_id
+        assert db_states[2].to_native().attributes == {"test_attr": 6}
+        assert session.query(StateAttributes).count() == 3
+
+        assert db_states[0].event_id is None
+        assert db_states[0].context_user_id == "abc"
+        state_changed = session.query(Events).filter(
+            Events.event_type == EVENT_STATE_CHANGED
+        )
+        assert state_changed.count() == 0
+        custom_event = session.query(Events).filter(Events.event_type == "custom_event")
+        assert custom_event.one().to_native().data == {"some_data": 15}
+
+
+async def test_bulk_insert_continues_after_existing_rows(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test the bulk inserter continues the ids and attributes in the database."""
+    instance = await async_setup_recorder_instance(hass, {CONF_BULK_INSERT: True})
+    attributes = {"test_attr": 5}
+
+    hass.states.async_set("test.recorder", "on", attributes)
+    await async_wait_recording_done(hass, instance)
+
+    # Forget everything kept in memory
+    instance._reopen_event_session()
+
+    hass.states.async_set("test.recorder", "off", attributes)
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States).order_by(States.state_id))
+        assert len(db_states) == 2
+        assert db_states[1].state_id > db_states[0].state_id
+        assert db_states[1].attributes_id == db_states[0].attributes_id
+        assert session.query(StateAttributes).count() == 1
+
+
+async def test_purge_evicts_bulk_old_state_ids(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test purged states are no longer used as old states."""
+    instance = await async_setup_recorder_instance(hass, {CONF_BULK_INSERT: True})
+
+    eleven_days_ago = dt_util.utcnow() - timedelta(days=11)
+    with patch(
+        "homeassistant.components.recorder.dt_util.utcnow",
+        return_value=eleven_days_ago,
+    ):
+        hass.states.async_set("test.recorder", "on")
+        await async_wait_recording_done(hass, instance)
+    assert "test.recorder" in instance._old_state_ids
+
+    purge_before = dt_util.utcnow() - timedelta(days=4)
+    assert not purge_old_data(instance, purge_before, repack=False)
+    assert "test.recorder" not in instance._old_state_ids
+
+    hass.states.async_set("test.recorder", "off")
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 1
+        assert db_states[0].old_state_id is None
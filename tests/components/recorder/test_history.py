@@ -5,6 +5,8 @@ from datetime import timedelta
 import json
 from unittest.mock import patch, sentinel
 
+import pytest
+
 from homeassistant.components.recorder import history
 from homeassistant.components.recorder.models import process_timestamp
 import homeassistant.core as ha
@@ -75,6 +77,36 @@ def test_get_states(hass_recorder):
     assert history.get_state(hass, time_before_recorder_ran, "demo.id") is None
 
 
+def test_get_states_entity_ids_in_chunks(hass_recorder):
+    """Test getting the states of many entities at a specific point in time."""
+    hass = hass_recorder()
+
+    now = dt_util.utcnow()
+    with patch("homeassistant.components.recorder.dt_util.utcnow", return_value=now):
+        for i in range(5):
+            mock_state_change_event(hass, ha.State(f"test.entity_{i}", "first"))
+        # Updated at the same time, the state recorded last wins
+        mock_state_change_event(hass, ha.State("test.entity_0", "second"))
+        wait_recording_done(hass)
+
+    future = now + timedelta(seconds=1)
+    with patch("homeassistant.components.recorder.dt_util.utcnow", return_value=future):
+        mock_state_change_event(hass, ha.State("test.entity_1", "too late"))
+        wait_recording_done(hass)
+
+    entities = [f"test.entity_{i}" for i in range(5)] + ["test.not_recorded"]
+    with patch.object(history, "SQLITE_MAX_BIND_VARS", 6):
+        states = history.get_states(hass, future, entities)
+
+    assert sorted((state.entity_id, state.state) for state in states) == [
+        ("test.entity_0", "second"),
+        ("test.entity_1", "first"),
+        ("test.entity_2", "first"),
+        ("test.entity_3", "first"),
+        ("test.entity_4", "first"),
+    ]
+
+
 def test_state_changes_during_period(hass_recorder):
     """Test state change during period."""
     hass = hass_recorder()
@@ -217,6 +249,86 @@ def test_get_significant_states_minimal_response(hass_recorder):
     assert states == hist
 
 
+@pytest.mark.parametrize("minimal_response", [False, True])
+def test_get_significant_states_compressed_state_format(
+    hass_recorder, minimal_response
+):
+    """Test the compressed state format holds the same states."""
+    hass = hass_recorder()
+    zero, four, _ = record_states(hass)
+    hist = history.get_significant_states(
+        hass, zero, four, minimal_response=minimal_response
+    )
+    compressed = history.get_significant_states(
+        hass,
+        zero,
+        four,
+        minimal_response=minimal_response,
+        compressed_state_format=True,
+    )
+    assert list(compressed) == list(hist)
+
+    for entity_id, states in hist.items():
+        expected_states = []
+        expected_last_updated = []
+        expected_attributes = []
+        for idx, state in enumerate(states):
+            if isinstance(state, dict):
+                expected_states.append(state["state"])
+                expected_last_updated.append(
+                    dt_util.parse_datetime(state["last_changed"]).timestamp()
+                )
+                continue
+            expected_states.append(state.state)
+            expected_last_updated.append(state.last_updated.timestamp())
+            if (
+                not expected_attributes
+                or expected_attributes[-1][1] != state.attributes
+            ):
+                expected_attributes.append([idx, state.attributes])
+
+        assert compressed[entity_id] == {
+            "s": expected_states,
+            "lu": expected_last_updated,
+            "a": expected_attributes,
+        }
+
+
+def test_get_significant_states_max_points(hass_recorder):
+    """Test the numeric states are downsampled to the lowest and highest per bucket."""
+    hass = hass_recorder()
+    entity_id = "sensor.power"
+    zero = dt_util.utcnow()
+    values = [
+        *("5", "1", "9", "3", "4"),
+        *("2", "unavailable", "8", "6", "7"),
+        *("3", "3", "10", "0", "5"),
+    ]
+    for idx, value in enumerate(values):
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=zero + timedelta(minutes=1 + 2 * idx),
+        ):
+            hass.states.set(entity_id, value)
+            wait_recording_done(hass)
+
+    end = zero + timedelta(minutes=30)
+    hist = history.get_significant_states(
+        hass, zero, end, [entity_id], include_start_time_state=False
+    )
+    assert len(hist[entity_id]) == 14
+
+    # Three buckets of 10 minutes
+    hist = history.get_significant_states(
+        hass, zero, end, [entity_id], include_start_time_state=False, max_points=6
+    )
+    assert [state.state for state in hist[entity_id]] == [
+        *("1", "9"),
+        *("2", "unavailable", "8", "6"),
+        *("10", "0", "5"),
+    ]
+
+
 def test_get_significant_states_with_initial(hass_recorder):
     """Test that only significant states are returned.
 
@@ -2,6 +2,7 @@
 # pylint: disable=protected-access
 from datetime import datetime, timedelta
 import sqlite3
+import threading
 from unittest.mock import patch
 
 import pytest
@@ -28,6 +29,7 @@ from homeassistant.components.recorder.const import DATA_INSTANCE
 from homeassistant.components.recorder.models import (
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
     StatisticsRuns,
     process_timestamp,
@@ -121,7 +123,7 @@ async def test_state_gets_saved_when_set_before_start_event(
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 1
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
 
 
 async def test_saving_state(
@@ -141,12 +143,45 @@ async def test_saving_state(
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 1
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
+        assert db_states[0].context_id == hass.states.get(entity_id).context.id
         state = db_states[0].to_native()
 
     assert state == _state_empty_context(hass, entity_id)
 
 
+async def test_saving_states_shares_attributes(
+    hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
+):
+    """Test states with the same attributes share a state_attributes row."""
+    instance = await async_setup_recorder_instance(hass)
+
+    attributes = {"test_attr": 5, "test_attr_10": "nice"}
+
+    hass.states.async_set("test.recorder", "on", attributes)
+    hass.states.async_set("test.recorder", "off", attributes)
+    hass.states.async_set("test.other", "on", attributes)
+    await async_wait_recording_done(hass, instance)
+
+    hass.states.async_set("test.recorder", "on", attributes)
+    hass.states.async_set("test.other", "off", {"test_attr": 6})
+    await async_wait_recording_done(hass, instance)
+
+    # Shared attributes no longer in the cache are found in the database
+    instance._state_attributes_ids.clear()
+    hass.states.async_set("test.other", "on", attributes)
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 6
+        assert all(db_state.attributes is None for db_state in db_states)
+        assert len({db_state.attributes_id for db_state in db_states}) == 2
+        assert session.query(StateAttributes).count() == 2
+        assert db_states[0].to_native().attributes == attributes
+        assert db_states[4].to_native().attributes == {"test_attr": 6}
+
+
 async def test_saving_many_states(
     hass: HomeAssistant, async_setup_recorder_instance: SetupRecorderInstanceT
 ):
@@ -170,7 +205,7 @@ async def test_saving_many_states(
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 6
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
 
 
 async def test_saving_state_with_intermixed_time_changes(
@@ -196,7 +231,7 @@ async def test_saving_state_with_intermixed_time_changes(
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 2
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
 
 
 def test_saving_state_with_exception(hass, hass_recorder, caplog):
@@ -362,7 +397,7 @@ def test_saving_state_with_commit_interval_zero(hass_recorder):
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 1
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
 
 
 def _add_entities(hass, entity_ids):
@@ -388,8 +423,8 @@ def _add_events(hass, events):
 
 
 def _state_empty_context(hass, entity_id):
-    # We don't restore context unless we need it by joining the
-    # events table on the event_id for state_changed events
+    # The context is stored with the state but
+    # not restored unless we need it
     state = hass.states.get(entity_id)
     state.context = Context(id=None)
     return state
@@ -989,7 +1024,7 @@ def test_service_disable_states_not_recording(hass, hass_recorder):
     with session_scope(hass=hass) as session:
         db_states = list(session.query(States))
         assert len(db_states) == 1
-        assert db_states[0].event_id > 0
+        assert db_states[0].event_id is None
         assert db_states[0].to_native() == _state_empty_context(hass, "test.two")
 
 
@@ -1035,6 +1070,37 @@ def test_service_disable_run_information_recorded(tmpdir):
     hass.stop()
 
 
+def test_sqlite_read_connections_move_between_threads(tmpdir):
+    """Test only the connections of the readers are used by other threads."""
+    test_db_file = tmpdir.mkdir("sqlite").join("test_read_pool.db")
+    dburl = f"{SQLITE_URL_PREFIX}//{test_db_file}"
+
+    hass = get_test_home_assistant()
+    setup_component(hass, DOMAIN, {DOMAIN: {CONF_DB_URL: dburl}})
+    hass.start()
+    wait_recording_done(hass)
+
+    # The connection of the recorder is only used in its thread
+    engine = hass.data[DATA_INSTANCE].engine
+    with pytest.raises(sqlite3.ProgrammingError):
+        engine.pool.connection.connection.execute("SELECT 1")
+
+    run_counts = []
+
+    def _count_runs():
+        with session_scope(hass=hass) as session:
+            run_counts.append(session.query(RecorderRuns).count())
+
+    # The connection opened by the thread is reused by the next reader
+    read_thread = threading.Thread(target=_count_runs)
+    read_thread.start()
+    read_thread.join()
+    _count_runs()
+    assert run_counts == [1, 1]
+
+    hass.stop()
+
+
 class CannotSerializeMe:
     """A class that the JSONEncoder cannot serialize."""
 
@@ -1089,7 +1155,7 @@ async def test_database_corruption_while_running(hass, tmpdir, caplog):
         with session_scope(hass=hass) as session:
             db_states = list(session.query(States))
             assert len(db_states) == 1
-            assert db_states[0].event_id > 0
+            assert db_states[0].event_id is None
             return db_states[0].to_native()
 
     state = await hass.async_add_executor_job(_get_last_state)
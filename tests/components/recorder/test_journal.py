@@ -0,0 +1,351 @@
+"""The tests for the recorder journal."""
+from datetime import timedelta
+import threading
+from unittest.mock import patch
+
+from sqlalchemy.exc import OperationalError
+
+from homeassistant.components.recorder import (
+    CONF_COMMIT_JOURNAL,
+    CONF_QUEUE_MAX_SIZE,
+    Recorder,
+    WaitTask,
+)
+from homeassistant.components.recorder.journal import (
+    CommitJournal,
+    SpillQueue,
+    decode_event,
+    encode_event,
+    uncommitted_events,
+)
+from homeassistant.components.recorder.models import Events, States
+from homeassistant.components.recorder.util import session_scope
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Context, Event, HomeAssistant, State
+
+from .common import async_wait_recording_done
+from .conftest import SetupRecorderInstanceT
+
+
+def test_encode_decode_state_changed_event():
+    """Test a state_changed event is restored from its journal line."""
+    context = Context(user_id="abc", parent_id="def")
+    old_state = State("test.journal", "off", {"forecast": [1, 2]})
+    new_state = State("test.journal", "on", {"forecast": [2, 3]}, context=context)
+    event = Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "test.journal", "old_state": old_state, "new_state": new_state},
+        context=context,
+    )
+
+    restored = decode_event(encode_event(event))
+
+    assert restored.event_type == EVENT_STATE_CHANGED
+    assert restored.time_fired == event.time_fired
+    assert restored.context == context
+    assert restored.data["entity_id"] == "test.journal"
+    assert restored.data["old_state"] == old_state
+    assert restored.data["new_state"].state == "on"
+    assert restored.data["new_state"].attributes == {"forecast": [2, 3]}
+    assert restored.data["new_state"].last_updated == new_state.last_updated
+
+
+def test_spill_queue_keeps_order(tmp_path):
+    """Test the events spilled to the journal are taken in order."""
+    path = tmp_path / "queue"
+    spill_queue = SpillQueue(str(path), 2)
+    spill_queue.load()
+    wait_task = WaitTask()
+
+    for number in range(4):
+        spill_queue.put(Event("test_event", {"number": number}))
+    spill_queue.put(wait_task)
+    spill_queue.put(Event("test_event", {"number": 4}))
+    assert spill_queue.qsize() == 6
+
+    assert [spill_queue.get().data["number"] for _ in range(4)] == [0, 1, 2, 3]
+    assert spill_queue.get() is wait_task
+    assert spill_queue.get().data["number"] == 4
+    assert spill_queue.qsize() == 0
+    assert path.read_text() == ""
+
+    spill_queue.close()
+    assert not path.exists()
+
+
+def test_spill_queue_keeps_events_not_taken(tmp_path):
+    """Test the events left in the journal are taken first after the next load."""
+    path = tmp_path / "queue"
+    spill_queue = SpillQueue(str(path), 1)
+    spill_queue.load()
+    for number in range(4):
+        spill_queue.put(Event("test_event", {"number": number}))
+    assert spill_queue.get().data["number"] == 0
+    assert spill_queue.get().data["number"] == 1
+    spill_queue.clear()
+    spill_queue.close()
+
+    spill_queue = SpillQueue(str(path), 1)
+    spill_queue.put(Event("test_event", {"number": 4}))
+    spill_queue.load()
+    assert spill_queue.qsize() == 3
+    assert [spill_queue.get().data["number"] for _ in range(3)] == [2, 3, 4]
+    spill_queue.close()
+
+
+def test_spill_queue_put_does_not_wait_for_journal(tmp_path):
+    """Test putting items does not wait while a spilled event is read."""
+    path = tmp_path / "queue"
+    spill_queue = SpillQueue(str(path), 1)
+    spill_queue.load()
+    for number in range(3):
+        spill_queue.put(Event("test_event", {"number": number}))
+    assert spill_queue.get().data["number"] == 0
+
+    reading = threading.Event()
+    release = threading.Event()
+
+    def _slow_decode_event(line):
+        reading.set()
+        release.wait()
+        return decode_event(line)
+
+    taken = []
+    wait_task = WaitTask()
+    with patch(
+        "homeassistant.components.recorder.journal.decode_event",
+        _slow_decode_event,
+    ):
+        with spill_queue._journal_lock:
+            reader = threading.Thread(target=lambda: taken.append(spill_queue.get()))
+            reader.start()
+            # The journal is busy, but putting events and tasks does not wait
+            for number in range(3, 6):
+                spill_queue.put(Event("test_event", {"number": number}))
+            spill_queue.put(wait_task)
+
+        assert reading.wait(5)
+        spill_queue.put(Event("test_event", {"number": 6}))
+        assert spill_queue.qsize() == 6
+        release.set()
+        reader.join(5)
+    assert taken[0].data["number"] == 1
+
+    assert [spill_queue.get().data["number"] for _ in range(4)] == [2, 3, 4, 5]
+    assert spill_queue.get() is wait_task
+    assert spill_queue.get().data["number"] == 6
+    spill_queue.close()
+    assert not path.exists()
+
+
+async def test_recorder_spills_events(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+    tmp_path,
+):
+    """Test the events spilled by the recorder are recorded in order."""
+    with patch(
+        "homeassistant.components.recorder.QUEUE_JOURNAL_FILE", str(tmp_path / "queue")
+    ):
+        instance = await async_setup_recorder_instance(hass, {CONF_QUEUE_MAX_SIZE: 1})
+    assert isinstance(instance.queue, SpillQueue)
+
+    for number in range(5):
+        hass.states.async_set("test.journal", str(number), {"number": number})
+    await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_states = session.query(States).order_by(States.state_id)
+        assert [db_state.state for db_state in db_states] == ["0", "1", "2", "3", "4"]
+
+
+def test_commit_journal_keeps_events_not_committed(tmp_path):
+    """Test the commit journal keeps the events accepted since the last commit."""
+    path = tmp_path / "uncommitted"
+    journal = CommitJournal(str(path))
+    assert journal.load() == []
+    journal.open()
+
+    journal.add(Event("test_event", {"number": 0}))
+    journal.sync()
+    journal.committed()
+    assert path.read_text() == ""
+
+    journal.add(Event("test_event", {"number": 1}))
+    journal.add(Event("test_event", {"number": 2}))
+    journal.sync()
+    assert path.read_text().count("\n") == 2
+
+    journal.close()
+
+    journal = CommitJournal(str(path))
+    assert [event.data["number"] for event in journal.load()] == [1, 2]
+    assert path.read_text().count("\n") == 2
+    journal.open()
+    journal.close()
+    assert not path.exists()
+
+
+async def test_recorder_replays_commit_journal(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+    tmp_path,
+):
+    """Test the events left in the commit journal are recorded on start."""
+    path = tmp_path / "uncommitted"
+    new_state = State("test.journal", "on", {"number": 1})
+    path.write_text(
+        "".join(
+            f"{encode_event(event)}\n"
+            for event in (
+                Event(
+                    EVENT_STATE_CHANGED,
+                    {
+                        "entity_id": "test.journal",
+                        "old_state": None,
+                        "new_state": new_state,
+                    },
+                ),
+                Event("test_event", {"number": 2}),
+            )
+        )
+    )
+
+    with patch("homeassistant.components.recorder.COMMIT_JOURNAL_FILE", str(path)):
+        instance = await async_setup_recorder_instance(
+            hass, {CONF_COMMIT_JOURNAL: True}
+        )
+    assert path.read_text() == ""
+
+    hass.bus.async_fire("test_event", {"number": 3})
+    await async_wait_recording_done(hass, instance)
+    assert path.read_text() == ""
+
+    with session_scope(hass=hass) as session:
+        db_states = list(session.query(States))
+        assert len(db_states) == 1
+        assert db_states[0].to_native().attributes == {"number": 1}
+        db_events = session.query(Events).filter(Events.event_type == "test_event")
+        assert [db_event.to_native().data for db_event in db_events] == [
+            {"number": 2},
+            {"number": 3},
+        ]
+
+
+async def test_uncommitted_events(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test the journaled events fired with the last committed one are matched."""
+    await async_setup_recorder_instance(hass)
+    committed_event = Event("test_event", context=Context())
+    time_fired = committed_event.time_fired
+    new_state = State("test.journal", "on")
+    committed_state_event = Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "test.journal", "old_state": None, "new_state": new_state},
+        time_fired=time_fired,
+        context=committed_event.context,
+    )
+    with session_scope(hass=hass) as session:
+        for event in (committed_event, committed_state_event):
+            db_row = (States if event is committed_state_event else Events).from_event(
+                event
+            )
+            db_row.created = time_fired
+            session.add(db_row)
+
+    earlier_event = Event("test_event", time_fired=time_fired - timedelta(seconds=1))
+    same_time_event = Event("test_event", time_fired=time_fired, context=Context())
+    same_time_state_event = Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "test.other", "old_state": None, "new_state": None},
+        time_fired=time_fired,
+        context=committed_event.context,
+    )
+    later_event = Event("test_event", time_fired=time_fired + timedelta(seconds=1))
+
+    with session_scope(hass=hass) as session:
+        assert (
+            uncommitted_events(
+                session,
+                [
+                    earlier_event,
+                    committed_event,
+                    committed_state_event,
+                    same_time_event,
+                    same_time_state_event,
+                    later_event,
+                ],
+            )
+            == [same_time_event, same_time_state_event, later_event]
+        )
+
+
+async def test_uncommitted_events_reads_back_to_committed_time(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+):
+    """Test only the rows created at the last committed time are matched."""
+    await async_setup_recorder_instance(hass)
+    context = Context()
+    earlier_event = Event("test_event", context=context)
+    time_fired = earlier_event.time_fired + timedelta(seconds=1)
+    committed_events = [
+        Event("test_event", time_fired=time_fired, context=context) for _ in range(3)
+    ]
+    with session_scope(hass=hass) as session:
+        for event in (earlier_event, *committed_events):
+            db_event = Events.from_event(event)
+            db_event.created = event.time_fired
+            session.add(db_event)
+
+    same_time_event = Event("test_event", time_fired=time_fired, context=context)
+    with patch(
+        "homeassistant.components.recorder.journal.JOURNAL_MATCH_BATCH_SIZE", 2
+    ), session_scope(hass=hass) as session:
+        # The row fired earlier with the same context is not matched
+        assert uncommitted_events(session, [*committed_events, same_time_event]) == [
+            same_time_event
+        ]
+
+
+async def test_recorder_keeps_commit_journal_when_replay_fails(
+    hass: HomeAssistant,
+    async_setup_recorder_instance: SetupRecorderInstanceT,
+    tmp_path,
+    caplog,
+):
+    """Test the events left in the commit journal are kept when they fail to commit."""
+    path = tmp_path / "uncommitted"
+    journal_text = f"{encode_event(Event('test_event', {'number': 1}))}\n"
+    path.write_text(journal_text)
+
+    commit_event_session_or_retry = Recorder._commit_event_session_or_retry
+    failed = []
+
+    def _fail_first_commit(instance):
+        if not failed:
+            failed.append(True)
+            raise OperationalError("insert the event", {}, Exception("forced to fail"))
+        commit_event_session_or_retry(instance)
+
+    with patch(
+        "homeassistant.components.recorder.COMMIT_JOURNAL_FILE", str(path)
+    ), patch.object(Recorder, "_commit_event_session_or_retry", _fail_first_commit):
+        instance = await async_setup_recorder_instance(
+            hass, {CONF_COMMIT_JOURNAL: True}
+        )
+        assert failed
+        assert "Error recording the uncommitted events" in caplog.text
+        assert path.read_text() == ""
+        set_aside = list(tmp_path.glob("uncommitted.failed.*"))
+        assert len(set_aside) == 1
+        assert set_aside[0].read_text() == journal_text
+
+        hass.bus.async_fire("test_event", {"number": 2})
+        await async_wait_recording_done(hass, instance)
+
+    with session_scope(hass=hass) as session:
+        db_events = session.query(Events).filter(Events.event_type == "test_event")
+        assert [db_event.to_native().data for db_event in db_events] == [{"number": 2}]
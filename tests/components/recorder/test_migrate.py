@@ -9,6 +9,7 @@ from unittest.mock import ANY, Mock, PropertyMock, call, patch
 
 import pytest
 from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.exc import (
     DatabaseError,
     InternalError,
@@ -17,6 +18,7 @@ from sqlalchemy.exc import (
 )
 from sqlalchemy.orm import Session
 from sqlalchemy.pool import StaticPool
+from sqlalchemy.schema import AddConstraint
 
 from homeassistant.bootstrap import async_setup_component
 from homeassistant.components import persistent_notification as pn, recorder
@@ -333,6 +335,40 @@ def test_modify_column(engine_type, substr):
         assert not connection.execute.called
 
 
+@pytest.mark.parametrize(
+    ["engine_type", "substrs"],
+    [
+        (
+            "sqlite",
+            ["ADD attributes_id INTEGER REFERENCES state_attributes(attributes_id)"],
+        ),
+        (
+            "postgresql",
+            [
+                "ADD attributes_id INTEGER",
+                "ADD FOREIGN KEY(attributes_id) REFERENCES state_attributes",
+            ],
+        ),
+    ],
+)
+def test_attributes_id_foreign_key(engine_type, substrs):
+    """Test the attributes_id column is added with its foreign key."""
+    instance = Mock()
+    instance.engine.dialect.name = engine_type
+    session = Mock()
+    with patch("homeassistant.components.recorder.migration._create_index"):
+        migration._apply_update(instance, session, 24, 23)
+    statements = []
+    for execute_call in session.connection().execute.call_args_list:
+        statement = execute_call[0][0]
+        if isinstance(statement, AddConstraint):
+            statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        else:
+            statements.append(statement.text)
+    for substr in substrs:
+        assert any(substr in statement for statement in statements)
+
+
 def test_forgiving_add_column():
     """Test that add column will continue if column exists."""
     engine = create_engine("sqlite://", poolclass=StaticPool)
@@ -347,7 +383,7 @@ def test_forgiving_add_index():
     engine = create_engine("sqlite://", poolclass=StaticPool)
     models.Base.metadata.create_all(engine)
     with Session(engine) as session:
-        migration._create_index(session, "states", "ix_states_context_id")
+        migration._create_index(session.connection(), "states", "ix_states_context_id")
 
 
 @pytest.mark.parametrize(
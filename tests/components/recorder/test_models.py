@@ -2,13 +2,14 @@
 from datetime import datetime
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, create_mock_engine, inspect
 from sqlalchemy.orm import scoped_session, sessionmaker
 
 from homeassistant.components.recorder.models import (
     Base,
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
     process_timestamp,
     process_timestamp_to_utc_isoformat,
@@ -34,10 +35,67 @@ def test_from_event_to_db_state():
         {"entity_id": "sensor.temperature", "old_state": None, "new_state": state},
         context=state.context,
     )
-    # We don't restore context unless we need it by joining the
-    # events table on the event_id for state_changed events
+    db_state = States.from_event(event)
+    assert db_state.context_id == state.context.id
+    assert db_state.origin == "LOCAL"
+    # We don't restore context unless we need it
     state.context = ha.Context(id=None)
-    assert state == States.from_event(event).to_native()
+    assert state == db_state.to_native()
+
+
+def test_from_event_to_db_state_attributes():
+    """Test converting event to db state attributes."""
+    attrs = {"this_attr": True}
+    state = ha.State("sensor.temperature", "18", attrs)
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "sensor.temperature", "old_state": None, "new_state": state},
+        context=state.context,
+    )
+    db_attrs = StateAttributes.from_event(event)
+    assert db_attrs.to_native() == attrs
+    assert db_attrs.hash == StateAttributes.hash_shared_attrs(db_attrs.shared_attrs)
+
+    db_state = States.from_event(event)
+    assert db_state.attributes is None
+    db_state.state_attributes = db_attrs
+    assert db_state.to_native().attributes == attrs
+
+
+def test_from_event_to_db_keeps_nan():
+    """Test NaN in event data and state attributes is still recorded."""
+    state = ha.State("sensor.temperature", "18", {"this_attr": float("nan")})
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "sensor.temperature", "old_state": None, "new_state": state},
+        context=state.context,
+    )
+    assert StateAttributes.from_event(event).shared_attrs == '{"this_attr":NaN}'
+
+    event = ha.Event("test_event", {"some_data": float("inf")})
+    assert Events.from_event(event).event_data == '{"some_data":Infinity}'
+
+
+def test_states_entity_id_last_updated_state_id_index():
+    """Test only the databases not indexing the primary key get the state_id index."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    assert "ix_states_entity_id_last_updated_state_id" not in {
+        index["name"] for index in inspect(engine).get_indexes("states")
+    }
+    assert "ix_states_entity_id_last_updated" in {
+        index["name"] for index in inspect(engine).get_indexes("states")
+    }
+
+    statements = []
+    engine = create_mock_engine(
+        "postgresql://", lambda sql, *args, **kwargs: statements.append(str(sql))
+    )
+    Base.metadata.create_all(engine, checkfirst=False)
+    assert (
+        "CREATE INDEX ix_states_entity_id_last_updated_state_id "
+        "ON states (entity_id, last_updated, state_id)"
+    ) in statements
 
 
 def test_from_event_to_delete_state():
@@ -7,10 +7,15 @@ from sqlalchemy.orm import sessionmaker
 from homeassistant.components.recorder.pool import RecorderPool
 
 
-def test_recorder_pool():
+def test_recorder_pool(tmp_path):
     """Test RecorderPool gives the same connection in the creating thread."""
 
-    engine = create_engine("sqlite://", poolclass=RecorderPool)
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=RecorderPool,
+        read_pool_size=0,
+        connect_args={"check_same_thread": False},
+    )
     get_session = sessionmaker(bind=engine)
 
     connections = []
@@ -32,3 +37,42 @@ def test_recorder_pool():
     new_thread.join()
 
     assert connections[2] != connections[3]
+
+
+def test_recorder_pool_keeps_read_connections(tmp_path):
+    """Test RecorderPool keeps connections open for other threads."""
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path}/pool.db",
+        poolclass=RecorderPool,
+        read_pool_size=1,
+        read_pragmas=["cache_size = -1024"],
+        connect_args={"check_same_thread": False},
+    )
+    get_session = sessionmaker(bind=engine)
+
+    connections = []
+    cache_sizes = []
+
+    def _read():
+        session = get_session()
+        connections.append(session.connection().connection.connection)
+        cache_sizes.append(session.execute("PRAGMA cache_size").scalar())
+        session.close()
+
+    _read()
+    for _ in range(2):
+        new_thread = threading.Thread(target=_read)
+        new_thread.start()
+        new_thread.join()
+
+    assert connections[0] != connections[1]
+    assert connections[1] == connections[2]
+    assert cache_sizes[1:] == [-1024, -1024]
+
+    # Disposing from the creating thread closes the kept connections
+    pool = engine.pool
+    engine.dispose()
+    assert pool._read_connections.empty()
+    assert engine.pool is not pool
+    assert engine.pool._read_pool_size == 1
@@ -13,6 +13,7 @@ from homeassistant.components.recorder.const import MAX_ROWS_TO_PURGE
 from homeassistant.components.recorder.models import (
     Events,
     RecorderRuns,
+    StateAttributes,
     States,
     StatisticsRuns,
     StatisticsShortTerm,
@@ -49,15 +50,20 @@ async def test_purge_old_states(
         assert states[-1].old_state_id == states[-2].state_id
 
         events = session.query(Events).filter(Events.event_type == "state_changed")
-        assert events.count() == 6
+        assert events.count() == 0
         assert "test.recorder2" in instance._old_states
 
+        state_attributes = session.query(StateAttributes)
+        assert state_attributes.count() == 1
+        assert len(instance._state_attributes_ids) == 1
+
         purge_before = dt_util.utcnow() - timedelta(days=4)
 
         # run purge_old_data()
         finished = purge_old_data(instance, purge_before, repack=False)
         assert not finished
         assert states.count() == 2
+        assert state_attributes.count() == 1
         assert "test.recorder2" in instance._old_states
 
         states_after_purge = session.query(States)
@@ -74,6 +80,8 @@ async def test_purge_old_states(
         finished = purge_old_data(instance, purge_before, repack=False)
         assert not finished
         assert states.count() == 0
+        assert state_attributes.count() == 0
+        assert not instance._state_attributes_ids
         assert "test.recorder2" not in instance._old_states
 
     # Add some more states
@@ -87,7 +95,7 @@ async def test_purge_old_states(
         assert states[-1].old_state_id == states[-2].state_id
 
         events = session.query(Events).filter(Events.event_type == "state_changed")
-        assert events.count() == 6
+        assert events.count() == 0
         assert "test.recorder2" in instance._old_states
 
 
@@ -0,0 +1,87 @@
+"""The tests for the recorder event serializer."""
+# pylint: disable=protected-access
+from homeassistant.components.recorder.serializer import EventSerializer
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, State
+
+
+def test_serializer_encodes_new_states():
+    """Test the serializer encodes the attributes of new states."""
+    serializer = EventSerializer()
+    new_state = State("test.serializer", "on", {"forecast": [1, 2, 3]})
+    unserializable_state = State("test.serializer", "off", {"object": object()})
+
+    serializer.start()
+    serializer.add(
+        Event(
+            EVENT_STATE_CHANGED,
+            {"entity_id": "test.serializer", "new_state": new_state},
+        )
+    )
+    serializer.add(
+        Event(
+            EVENT_STATE_CHANGED,
+            {"entity_id": "test.serializer", "new_state": unserializable_state},
+        )
+    )
+    serializer.add(
+        Event(EVENT_STATE_CHANGED, {"entity_id": "test.serializer", "new_state": None})
+    )
+    serializer.stop()
+    serializer.join()
+
+    assert new_state._attributes_json == '{"forecast":[1,2,3]}'
+    assert unserializable_state._attributes_json is None
+    assert serializer.queue.qsize() == 0
+
+
+def test_serializer_encodes_event_data():
+    """Test the serializer encodes the data of other events."""
+    serializer = EventSerializer()
+    event = Event("test_event", {"forecast": [1, 2, 3]})
+
+    serializer.start()
+    serializer.add(event)
+    serializer.stop()
+    serializer.join()
+
+    assert event._data_json == '{"forecast":[1,2,3]}'
+
+
+def test_serializer_skips_events_when_full():
+    """Test the events added while the queue is full are left to the recorder."""
+    serializer = EventSerializer(1)
+    first_event = Event("test_event", {"number": 1})
+    second_event = Event("test_event", {"number": 2})
+
+    serializer.add(first_event)
+    serializer.add(second_event)
+    assert serializer.queue.qsize() == 1
+
+    serializer.start()
+    serializer.stop()
+    serializer.join()
+
+    assert first_event._data_json == '{"number":1}'
+    assert second_event._data_json is None
+
+
+def test_serializer_continues_after_error(caplog):
+    """Test an event failing to encode does not stop the serializer."""
+
+    class BrokenEvent(Event):
+        @property
+        def data_json(self):
+            raise RuntimeError("Broken")
+
+    serializer = EventSerializer()
+    event = Event("test_event", {"number": 1})
+
+    serializer.start()
+    serializer.add(BrokenEvent("test_event"))
+    serializer.add(event)
+    serializer.stop()
+    serializer.join()
+
+    assert "Error encoding" in caplog.text
+    assert event._data_json == '{"number":1}'
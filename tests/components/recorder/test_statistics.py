@@ -16,9 +16,11 @@ from homeassistant.components.recorder.statistics import (
     async_add_external_statistics,
     get_last_statistics,
     get_metadata,
+    get_states_for_statistics,
     list_statistic_ids,
     statistics_during_period,
 )
+from homeassistant.components.recorder.util import session_scope
 from homeassistant.const import TEMP_CELSIUS
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.setup import setup_component
@@ -633,6 +635,70 @@ def test_monthly_statistics(hass_recorder, caplog, timezone):
     dt_util.set_default_time_zone(dt_util.get_time_zone("UTC"))
 
 
+def test_get_states_for_statistics_from_memory(hass_recorder):
+    """Test the states kept in memory match the states in the database."""
+    hass = hass_recorder()
+    recorder = hass.data[DATA_INSTANCE]
+    entity_id = "sensor.test1"
+
+    def set_state(state, last_updated):
+        """Set the state."""
+        with patch(
+            "homeassistant.components.recorder.dt_util.utcnow",
+            return_value=last_updated,
+        ):
+            hass.states.set(entity_id, state, {"unit_of_measurement": "W"})
+        wait_recording_done(hass)
+
+    zero = dt_util.utcnow()
+    set_state("10", zero)
+    start = zero + timedelta(minutes=1)
+    end = start + timedelta(minutes=5)
+
+    # The first request tracks the entity and is answered from the database
+    with session_scope(hass=hass) as session:
+        states = get_states_for_statistics(hass, session, start, end, [entity_id])
+    assert [state.state for state in states[entity_id]] == ["10"]
+    assert recorder.statistics_states.states_during_period(
+        start, end, [entity_id], True
+    ) == ({}, [entity_id])
+
+    set_state("15", start + timedelta(minutes=1))
+    set_state("15", start + timedelta(minutes=2))  # Attribute only change
+    set_state("20", start + timedelta(minutes=3))
+    set_state("25", end)
+
+    for significant_changes_only in (True, False):
+        memory_states, uncovered = recorder.statistics_states.states_during_period(
+            start, end, [entity_id], significant_changes_only
+        )
+        assert uncovered == []
+        db_states = history.get_significant_states(
+            hass,
+            start - timedelta.resolution,
+            end,
+            entity_ids=[entity_id],
+            significant_changes_only=significant_changes_only,
+        )
+        assert memory_states == db_states
+
+    # The states before the next period are dropped, except its initial state
+    recorder.statistics_states.trim(end)
+    memory_states, uncovered = recorder.statistics_states.states_during_period(
+        end, end + timedelta(minutes=5), [entity_id], True
+    )
+    assert uncovered == []
+    assert [state.state for state in memory_states[entity_id]] == ["20", "25"]
+    assert memory_states[entity_id][0].last_updated < end
+
+    # Entities not requested between two trims are no longer tracked
+    recorder.statistics_states.trim(end)
+    recorder.statistics_states.trim(end)
+    assert recorder.statistics_states.states_during_period(
+        end, end + timedelta(minutes=5), [entity_id], True
+    ) == ({}, [entity_id])
+
+
 def record_states(hass):
     """Record some test states.
 
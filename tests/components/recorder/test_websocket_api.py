@@ -265,6 +265,7 @@ async def test_recorder_info(hass, hass_ws_client):
         "backlog": 0,
         "max_backlog": 30000,
         "migration_in_progress": False,
+        "serializer_backlog": 0,
         "recording": True,
         "thread_running": True,
     }
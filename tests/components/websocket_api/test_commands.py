@@ -602,6 +602,107 @@ async def test_subscribe_unsubscribe_events_state_changed(
     assert msg["event"]["data"]["entity_id"] == "light.permitted"
 
 
+async def test_subscribe_entities(hass, websocket_client, hass_admin_user):
+    """Test subscribe_entities sends the states and then only their changes."""
+    hass_admin_user.groups = []
+    hass_admin_user.mock_policy(
+        {"entities": {"entity_ids": {"light.permitted": True, "light.new": True}}}
+    )
+    hass.states.async_set("light.permitted", "on", {"color": "red", "level": 5})
+    hass.states.async_set("light.not_permitted", "on")
+    state = hass.states.get("light.permitted")
+
+    await websocket_client.send_json({"id": 7, "type": "subscribe_entities"})
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "a": {
+            "light.permitted": {
+                "s": "on",
+                "a": {"color": "red", "level": 5},
+                "c": state.context.id,
+                "lc": state.last_changed.timestamp(),
+            }
+        }
+    }
+
+    # The changes within one iteration of the event loop are sent together
+    hass.states.async_set("light.permitted", "on", {"color": "blue", "level": 5})
+    hass.states.async_set("light.permitted", "off", {"color": "blue"})
+    hass.states.async_set("light.not_permitted", "off")
+    hass.states.async_set("light.new", "on")
+    state = hass.states.get("light.permitted")
+    new_state = hass.states.get("light.new")
+
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 7
+    assert msg["type"] == "event"
+    assert msg["event"] == {
+        "c": {
+            "light.permitted": {
+                "+": {
+                    "s": "off",
+                    "lc": state.last_changed.timestamp(),
+                    "c": state.context.id,
+                    "a": {"color": "blue"},
+                },
+                "-": {"a": ["level"]},
+            }
+        },
+        "a": {
+            "light.new": {
+                "s": "on",
+                "a": {},
+                "c": new_state.context.id,
+                "lc": new_state.last_changed.timestamp(),
+            }
+        },
+    }
+
+    hass.states.async_remove("light.new")
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {"r": ["light.new"]}
+
+
+async def test_subscribe_entities_with_entity_ids(hass, websocket_client):
+    """Test subscribe_entities for a list of entities."""
+    hass.states.async_set("light.kitchen", "on")
+    hass.states.async_set("light.bedroom", "on")
+
+    await websocket_client.send_json(
+        {"id": 7, "type": "subscribe_entities", "entity_ids": ["light.kitchen"]}
+    )
+
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+    msg = await websocket_client.receive_json()
+    assert list(msg["event"]["a"]) == ["light.kitchen"]
+
+    hass.states.async_set("light.bedroom", "off")
+    hass.states.async_set("light.kitchen", "on", {"level": 5})
+    state = hass.states.get("light.kitchen")
+
+    msg = await websocket_client.receive_json()
+    assert msg["event"] == {
+        "c": {
+            "light.kitchen": {
+                "+": {
+                    "lu": state.last_updated.timestamp(),
+                    "c": state.context.id,
+                    "a": {"level": 5},
+                }
+            }
+        }
+    }
+
+
 async def test_render_template_renders_template(hass, websocket_client):
     """Test simple template is rendered and updated."""
     hass.states.async_set("light.test", "on")
@@ -1197,3 +1298,31 @@ async def test_integration_setup_info(hass, websocket_client, hass_admin_user):
         {"domain": "august", "seconds": 12.5},
         {"domain": "isy994", "seconds": 12.8},
     ]
+
+
+async def test_supported_features_coalesce_messages(hass, websocket_client):
+    """Test the messages queued together are sent as one JSON array."""
+    await websocket_client.send_json(
+        {"id": 5, "type": "supported_features", "features": {"coalesce_messages": 1}}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["id"] == 5
+    assert msg["type"] == const.TYPE_RESULT
+    assert msg["success"]
+
+    await websocket_client.send_json(
+        {"id": 6, "type": "subscribe_events", "event_type": "test_event"}
+    )
+    msg = await websocket_client.receive_json()
+    assert msg["success"]
+
+    for value in range(3):
+        hass.bus.async_fire("test_event", {"value": value})
+    await hass.async_block_till_done()
+
+    msgs = await websocket_client.receive_json()
+    assert [(msg["id"], msg["event"]["data"]["value"]) for msg in msgs] == [
+        (6, 0),
+        (6, 1),
+        (6, 2),
+    ]
@@ -1,13 +1,15 @@
 """Test WebSocket Connection class."""
 import asyncio
 import logging
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import voluptuous as vol
 
 from homeassistant import exceptions
 from homeassistant.components import websocket_api
 from homeassistant.components.websocket_api import const
+from homeassistant.helpers.entity_registry import EVENT_ENTITY_REGISTRY_UPDATED
+from homeassistant.setup import async_setup_component
 
 from tests.common import MockUser
 
@@ -60,3 +62,30 @@ async def test_exception_handling():
         assert len(send_messages) == 1
         assert send_messages[0]["error"]["code"] == code
         assert send_messages[0]["error"]["message"] == err
+
+
+async def test_can_read_entity_is_remembered(hass, hass_admin_user):
+    """Test the entity read permissions are remembered until they may change."""
+    assert await async_setup_component(hass, "websocket_api", {})
+    hass_admin_user.groups = []
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"light.permitted": True}}})
+    conn = websocket_api.ActiveConnection(
+        logging.getLogger(__name__), hass, Mock(), hass_admin_user, Mock()
+    )
+    permissions = hass_admin_user.permissions
+
+    with patch.object(
+        permissions, "check_entity", wraps=permissions.check_entity
+    ) as check_entity:
+        for _ in range(2):
+            assert conn.can_read_entity("light.permitted")
+            assert not conn.can_read_entity("light.not_permitted")
+        assert check_entity.call_count == 2
+
+        hass.bus.async_fire(EVENT_ENTITY_REGISTRY_UPDATED, {"action": "update"})
+        await hass.async_block_till_done()
+        assert conn.can_read_entity("light.permitted")
+        assert check_entity.call_count == 3
+
+    hass_admin_user.mock_policy({"entities": {"entity_ids": {"light.other": True}}})
+    assert not conn.can_read_entity("light.permitted")
@@ -1,12 +1,13 @@
 """Test Websocket API messages module."""
+import json
 
 from homeassistant.components.websocket_api.messages import (
-    _cached_event_message as lru_event_cache,
     cached_event_message,
+    event_message,
     message_to_json,
 )
 from homeassistant.const import EVENT_STATE_CHANGED
-from homeassistant.core import callback
+from homeassistant.core import Event, callback
 
 
 async def test_cached_event_message(hass):
@@ -25,7 +26,6 @@ async def test_cached_event_message(hass):
     await hass.async_block_till_done()
 
     assert len(events) == 2
-    lru_event_cache.cache_clear()
 
     msg0 = cached_event_message(2, events[0])
     assert msg0 == cached_event_message(2, events[0])
@@ -34,17 +34,11 @@ async def test_cached_event_message(hass):
     assert msg1 == cached_event_message(2, events[1])
 
     assert msg0 != msg1
+    assert json.loads(msg0) == json.loads(message_to_json(event_message(2, events[0])))
 
-    cache_info = lru_event_cache.cache_info()
-    assert cache_info.hits == 2
-    assert cache_info.misses == 2
-    assert cache_info.currsize == 2
-
-    cached_event_message(2, events[1])
-    cache_info = lru_event_cache.cache_info()
-    assert cache_info.hits == 3
-    assert cache_info.misses == 2
-    assert cache_info.currsize == 2
+    # The new state of the first event is the old state of the second one
+    # and is only serialized once.
+    assert events[0].data["new_state"].as_dict_json in msg1
 
 
 async def test_cached_event_message_with_different_idens(hass):
@@ -63,19 +57,25 @@ async def test_cached_event_message_with_different_idens(hass):
 
     assert len(events) == 1
 
-    lru_event_cache.cache_clear()
-
     msg0 = cached_event_message(2, events[0])
     msg1 = cached_event_message(3, events[0])
     msg2 = cached_event_message(4, events[0])
 
     assert msg0 != msg1
     assert msg0 != msg2
+    assert json.loads(msg1)["id"] == 3
+    assert json.loads(msg1)["event"] == json.loads(msg0)["event"]
+
 
-    cache_info = lru_event_cache.cache_info()
-    assert cache_info.hits == 2
-    assert cache_info.misses == 1
-    assert cache_info.currsize == 1
+async def test_cached_event_message_unserializable(hass, caplog):
+    """Test an event that cannot be serialized returns an error message."""
+    event = Event("test_event", {"value": float("nan")})
+
+    msg = json.loads(cached_event_message(2, event))
+
+    assert msg["id"] == 2
+    assert msg["success"] is False
+    assert "Unable to serialize to JSON" in caplog.text
 
 
 async def test_message_to_json(caplog):
@@ -83,13 +83,13 @@ async def test_message_to_json(caplog):
 
     json_str = message_to_json({"id": 1, "message": "xyz"})
 
-    assert json_str == '{"id": 1, "message": "xyz"}'
+    assert json_str == '{"id":1,"message":"xyz"}'
 
     json_str2 = message_to_json({"id": 1, "message": _Unserializeable()})
 
     assert (
         json_str2
-        == '{"id": 1, "type": "result", "success": false, "error": {"code": "unknown_error", "message": "Invalid JSON in response"}}'
+        == '{"id":1,"type":"result","success":false,"error":{"code":"unknown_error","message":"Invalid JSON in response"}}'
     )
     assert "Unable to serialize to JSON" in caplog.text
 
@@ -1,10 +1,16 @@
 """Test Home Assistant remote methods and classes."""
 import datetime
+import json
 
 import pytest
 
 from homeassistant import core
-from homeassistant.helpers.json import ExtendedJSONEncoder, JSONEncoder
+from homeassistant.helpers.json import (
+    ExtendedJSONEncoder,
+    JSONEncoder,
+    json_bytes,
+    json_dumps,
+)
 from homeassistant.util import dt as dt_util
 
 
@@ -64,3 +70,29 @@ def test_extended_json_encoder(hass):
     # Default method falls back to repr(o)
     o = object()
     assert ha_json_enc.default(o) == {"__type": str(type(o)), "repr": repr(o)}
+
+
+def test_json_dumps(hass):
+    """Test the fast JSON serializer matches the JSON encoder."""
+    now = dt_util.utcnow()
+    data = {
+        "state": core.State("test.test", "hello", {"now": now}),
+        "event": core.Event("test_event", {"milk": "beer"}),
+        "now": now,
+        "set": {"milk"},
+        1: "int key",
+    }
+
+    assert json.loads(json_dumps(data)) == json.loads(json.dumps(data, cls=JSONEncoder))
+    assert json_bytes(data) == json_dumps(data).encode("utf-8")
+    assert json_dumps({"none": None}) == '{"none":null}'
+    # Integers larger than 64 bit are handled by the stdlib encoder
+    assert json_dumps({"big": 2 ** 70}) == '{"big":1180591620717411303424}'
+
+    with pytest.raises(TypeError):
+        json_dumps(object())
+    for value in (float("nan"), float("inf"), -float("inf")):
+        with pytest.raises(ValueError):
+            json_dumps({"nested": [{"value": value}], "none": None})
+    with pytest.raises(ValueError):
+        json_dumps(core.State("test.test", "hello", {"value": float("nan")}))
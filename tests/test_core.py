@@ -3,6 +3,7 @@
 import asyncio
 from datetime import datetime, timedelta
 import functools
+import json
 import logging
 import os
 from tempfile import TemporaryDirectory
@@ -33,11 +34,13 @@ from homeassistant.const import (
 )
 import homeassistant.core as ha
 from homeassistant.exceptions import (
+    HomeAssistantError,
     InvalidEntityFormatError,
     InvalidStateError,
     MaxLengthExceeded,
     ServiceNotFound,
 )
+from homeassistant.helpers.json import JSONEncoder
 import homeassistant.util.dt as dt_util
 from homeassistant.util.unit_system import METRIC_SYSTEM
 
@@ -383,6 +386,47 @@ def test_state_as_dict():
     assert state.as_dict() is state.as_dict()
 
 
+def test_state_as_dict_json():
+    """Test a State as JSON."""
+    last_time = datetime(1984, 12, 8, 12, 0, 0)
+    state = ha.State(
+        "happy.happy",
+        "on",
+        {"pig": "dog", "at": last_time},
+        last_updated=last_time,
+        last_changed=last_time,
+    )
+    assert json.loads(state.as_dict_json) == json.loads(
+        json.dumps(state.as_dict(), cls=JSONEncoder)
+    )
+    assert json.loads(state.attributes_json) == {
+        "pig": "dog",
+        "at": last_time.isoformat(),
+    }
+    # 2nd time to verify cache
+    assert state.as_dict_json is state.as_dict_json
+    assert state.attributes_json is state.attributes_json
+
+
+def test_event_as_dict_json():
+    """Test an Event as JSON reuses the JSON of the states in it."""
+    state = ha.State("happy.happy", "on", {"pig": "dog"})
+    event = ha.Event(
+        EVENT_STATE_CHANGED,
+        {"entity_id": "happy.happy", "old_state": None, "new_state": state},
+    )
+    assert json.loads(event.as_dict_json) == json.loads(
+        json.dumps(event.as_dict(), cls=JSONEncoder)
+    )
+    assert state.as_dict_json in event.as_dict_json
+    # 2nd time to verify cache
+    assert event.as_dict_json is event.as_dict_json
+
+    event = ha.Event("some_type", {"value": float("nan")})
+    with pytest.raises(ValueError):
+        event.as_dict_json
+
+
 async def test_eventbus_add_remove_listener(hass):
     """Test remove_listener method."""
     old_count = len(hass.bus.async_listeners())
@@ -431,6 +475,89 @@ async def test_eventbus_filtered_listener(hass):
     unsub()
 
 
+async def test_eventbus_keyed_listener(hass):
+    """Test we can route events by entity_id and domain."""
+    entity_calls = []
+    domain_calls = []
+    all_calls = []
+
+    @ha.callback
+    def filter(event):
+        """Mock filter."""
+        return not event.data.get("filtered")
+
+    unsub_entity = hass.bus.async_listen_keyed(
+        "test", "light.Kitchen", ha.callback(lambda event: entity_calls.append(event))
+    )
+    unsub_domain = hass.bus.async_listen_keyed(
+        "test",
+        ["light", "switch"],
+        ha.callback(lambda event: domain_calls.append(event)),
+        filter,
+    )
+    unsub_all = hass.bus.async_listen_keyed(
+        "test", MATCH_ALL, ha.callback(lambda event: all_calls.append(event))
+    )
+    assert hass.bus.async_listeners()["test"] == 3
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    hass.bus.async_fire("test", {"entity_id": "light.bowl", "filtered": True})
+    hass.bus.async_fire("test", {"entity_id": "switch.ac"})
+    hass.bus.async_fire("test", {"entity_id": ["light.kitchen"]})
+    hass.bus.async_fire("test")
+    hass.bus.async_fire("other", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in entity_calls] == ["light.kitchen"]
+    assert [event.data["entity_id"] for event in domain_calls] == [
+        "light.kitchen",
+        "switch.ac",
+    ]
+    assert [event.data["entity_id"] for event in all_calls] == [
+        "light.kitchen",
+        "light.bowl",
+        "switch.ac",
+    ]
+
+    unsub_entity()
+    unsub_domain()
+    unsub_all()
+    assert "test" not in hass.bus.async_listeners()
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    await hass.async_block_till_done()
+
+    assert len(entity_calls) == 1
+    assert len(domain_calls) == 2
+    assert len(all_calls) == 3
+
+    with pytest.raises(HomeAssistantError):
+        hass.bus.async_listen_keyed(MATCH_ALL, "light", filter)
+
+
+async def test_eventbus_keyed_listener_overlapping_keys(hass):
+    """Test a listener registered for overlapping keys runs once per event."""
+    calls = []
+
+    unsub = hass.bus.async_listen_keyed(
+        "test",
+        ["light.kitchen", "light", "LIGHT.kitchen", MATCH_ALL],
+        ha.callback(lambda event: calls.append(event)),
+    )
+    assert hass.bus.async_listeners()["test"] == 1
+
+    hass.bus.async_fire("test", {"entity_id": "light.kitchen"})
+    hass.bus.async_fire("test", {"entity_id": "switch.ac"})
+    await hass.async_block_till_done()
+    assert [event.data["entity_id"] for event in calls] == [
+        "light.kitchen",
+        "switch.ac",
+    ]
+
+    unsub()
+    assert "test" not in hass.bus.async_listeners()
+
+
 async def test_eventbus_unsubscribe_listener(hass):
     """Test unsubscribe listener from returned function."""
     calls = []
@@ -665,6 +792,34 @@ async def test_statemachine_entity_ids(hass):
     assert states == ["light.bowl", "switch.ac"]
 
 
+async def test_statemachine_domain_filter(hass):
+    """Test domain filtered lookups follow sets and removals."""
+    hass.states.async_set("light.bowl", "on", {})
+    hass.states.async_set("light.ceiling", "off", {})
+    hass.states.async_set("switch.ac", "off", {})
+
+    assert hass.states.async_entity_ids("LIGHT") == ["light.bowl", "light.ceiling"]
+    assert hass.states.async_entity_ids(["switch", "light", "switch"]) == [
+        "switch.ac",
+        "light.bowl",
+        "light.ceiling",
+    ]
+    assert hass.states.async_entity_ids_count("light") == 2
+    assert hass.states.async_entity_ids_count({"light", "switch"}) == 3
+    assert hass.states.async_entity_ids_count("sensor") == 0
+    assert hass.states.async_all("sensor") == []
+
+    hass.states.async_set("light.bowl", "off", {})
+    assert [state.state for state in hass.states.async_all("light")] == ["off", "off"]
+    assert hass.states.async_all("light")[0] is hass.states.get("light.bowl")
+
+    hass.states.async_remove("light.bowl")
+    hass.states.async_remove("switch.ac")
+    assert hass.states.async_entity_ids("light") == ["light.ceiling"]
+    assert hass.states.async_entity_ids_count("switch") == 0
+    assert hass.states.async_all(["switch"]) == []
+
+
 async def test_statemachine_remove(hass):
     """Test remove method."""
     hass.states.async_set("light.bowl", "on", {})
@@ -728,6 +883,118 @@ async def test_statemachine_force_update(hass):
     assert len(events) == 1
 
 
+async def test_statemachine_shares_unchanged_attributes(hass):
+    """Test unchanged attributes are shared between consecutive states."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    old_state = hass.states.get("light.bowl")
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 100})
+    state = hass.states.get("light.bowl")
+    assert state is not old_state
+    assert state.attributes is old_state.attributes
+
+    hass.states.async_set("light.bowl", "off", {"brightness": 50})
+    assert hass.states.get("light.bowl").attributes == {"brightness": 50}
+    assert hass.states.get("light.bowl").attributes is not state.attributes
+
+    hass.states.async_set("light.ceiling", "on")
+    hass.states.async_set("switch.ac", "on", {})
+    assert hass.states.get("light.ceiling").attributes is (
+        hass.states.get("switch.ac").attributes
+    )
+
+
+async def test_statemachine_set_many(hass):
+    """Test setting multiple states at once."""
+    hass.states.async_set("light.bowl", "on", {"brightness": 100})
+    events = async_capture_events(hass, EVENT_STATE_CHANGED)
+    bowl_events = []
+    hass.helpers.event.async_track_state_change_event(
+        "light.bowl", ha.callback(lambda event: bowl_events.append(event))
+    )
+
+    hass.states.async_set_many(
+        [
+            ("light.Bowl", "on", {"brightness": 100}),
+            ("switch.ac", "off", None),
+            ("light.ceiling", "on", {}),
+            ("light.bowl", "off", {"brightness": 0}),
+        ]
+    )
+    assert hass.states.get("light.bowl").state == "off"
+    assert hass.states.async_entity_ids("light") == ["light.bowl", "light.ceiling"]
+    await hass.async_block_till_done()
+
+    assert [event.data["entity_id"] for event in events] == [
+        "switch.ac",
+        "light.ceiling",
+        "light.bowl",
+    ]
+    assert events[2].data["old_state"].state == "on"
+    assert events[2].data["new_state"] is hass.states.get("light.bowl")
+    assert len({event.context for event in events}) == 1
+    assert len({event.time_fired for event in events}) == 1
+    assert events[0].context == events[0].data["new_state"].context
+    assert bowl_events == [events[2]]
+
+    with pytest.raises(InvalidStateError):
+        hass.states.async_set_many(
+            [("light.bowl", "on", None), ("switch.ac", "x" * 256, None)]
+        )
+    assert hass.states.get("light.bowl").state == "off"
+
+
+async def test_eventbus_fire_many(hass):
+    """Test firing a batch of events."""
+    calls = []
+    failing_calls = []
+    async_calls = []
+
+    @ha.callback
+    def listener(event):
+        """Mock listener."""
+        calls.append(event)
+
+    @ha.callback
+    def failing_listener(event):
+        """Mock listener that raises."""
+        failing_calls.append(event)
+        raise ValueError
+
+    async def async_listener(event):
+        """Mock coroutine listener."""
+        async_calls.append(event)
+
+    @ha.callback
+    def filter(event):
+        """Mock filter."""
+        return not event.data["filtered"]
+
+    hass.bus.async_listen("test", listener, event_filter=filter)
+    hass.bus.async_listen("test", failing_listener)
+    hass.bus.async_listen("test", async_listener)
+
+    with patch.object(hass.loop, "call_soon", wraps=hass.loop.call_soon) as call_soon:
+        hass.bus.async_fire_many(
+            "test",
+            [{"filtered": False, "id": 1}, {"filtered": True}, {"filtered": False}],
+        )
+    batched = [
+        call.args[1].target
+        for call in call_soon.mock_calls
+        if call.args[0] is ha._run_callback_job_events
+    ]
+    assert batched == [listener, failing_listener]
+    await hass.async_block_till_done()
+
+    assert [event.data.get("id") for event in calls] == [1, None]
+    assert len(failing_calls) == 3
+    assert len(async_calls) == 3
+
+    with pytest.raises(MaxLengthExceeded):
+        hass.bus.async_fire_many("a" * 65, [{}])
+
+
 def test_service_call_repr():
     """Test ServiceCall repr."""
     call = ha.ServiceCall("homeassistant", "start")